@@ -0,0 +1,83 @@
+"""
+Benchmark: one-by-one create() vs create_many() for catalog onboarding
+
+create() commits and refreshes per product (one fsync plus an extra SELECT
+each); create_many() inserts chunks with INSERT ... RETURNING and commits
+once. The one-by-one time for the full load is extrapolated from a sample.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bulk_create_benchmark.py [products]
+"""
+import asyncio
+import os
+import sys
+import time
+from decimal import Decimal
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from common import CATEGORIES, print_table, temp_database_path
+from domain.entities.product import Product
+from domain.value_objects.price import Price
+from domain.value_objects.stock import Stock
+from infrastructure.database.sqlalchemy.models import Base
+from infrastructure.database.sqlalchemy.repositories.product_repository_impl import ProductRepositoryImpl
+from infrastructure.database.sqlalchemy.search import create_search_index
+
+SINGLE_SAMPLE = 500
+
+
+def make_products(count: int):
+    """Unsaved products with varied names and categories"""
+    return [
+        Product(
+            id=None,
+            name=f"Product {i}",
+            price=Price(Decimal("9.99") + i % 500),
+            stock=Stock(i % 100),
+            category=CATEGORIES[i % len(CATEGORIES)],
+            description=f"Description for product {i}",
+            is_active=True,
+        )
+        for i in range(count)
+    ]
+
+
+async def timed_load(path: str, products, bulk: bool) -> float:
+    """Seconds to create `products` in a fresh database"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(create_search_index)
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    try:
+        async with factory() as session:
+            repository = ProductRepositoryImpl(session)
+            started = time.perf_counter()
+            if bulk:
+                await repository.create_many(products)
+            else:
+                for product in products:
+                    await repository.create(product)
+            return time.perf_counter() - started
+    finally:
+        await engine.dispose()
+        os.unlink(path)
+
+
+async def main(count: int) -> None:
+    single = await timed_load(temp_database_path("single"), make_products(SINGLE_SAMPLE), bulk=False)
+    bulk = await timed_load(temp_database_path("bulk"), make_products(count), bulk=True)
+    single_total = single / SINGLE_SAMPLE * count
+    print_table(
+        f"Creating {count} products (SQLite, FTS index on)",
+        ["method", "seconds", "products/s"],
+        [
+            [f"create() x{count} (extrapolated)", f"{single_total:.1f}", f"{count / single_total:.0f}"],
+            ["create_many()", f"{bulk:.1f}", f"{count / bulk:.0f}"],
+        ],
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000))
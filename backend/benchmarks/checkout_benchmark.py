@@ -0,0 +1,99 @@
+"""
+Benchmark: 20-line basket checkout, per-line transactions vs one transaction
+
+Each simulated client checks out baskets of 20 random products. The
+per-line variant is what buying several items took before: one
+decrement_stock() (UPDATE + commit) per line, so a basket can end up half
+bought. The checkout variant is decrement_stock_many(): one conditional
+UPDATE for the whole basket and a single commit, all or nothing.
+
+Both run on the application's SQLite engine profile (WAL, one writer at a
+time), so the gain comes from one statement and one commit per basket
+instead of twenty.
+
+Usage:
+    PYTHONPATH=src python benchmarks/checkout_benchmark.py [rows]
+"""
+import asyncio
+import os
+import random
+import sys
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from common import print_table, run_clients, seed_products, temp_database_path
+from infrastructure.config.settings import Settings
+from infrastructure.database.sqlalchemy.models import ProductModel
+from infrastructure.database.sqlalchemy.repositories.product_repository_impl import ProductRepositoryImpl
+from infrastructure.database.sqlalchemy.session import create_engine_for
+
+CONCURRENCY_LEVELS = [10, 50, 200]
+TOTAL_BASKETS = 400
+BASKET_LINES = 20
+
+
+async def per_line(repository: ProductRepositoryImpl, basket: dict) -> None:
+    """One transaction per line"""
+    for product_id, quantity in sorted(basket.items()):
+        await repository.decrement_stock(product_id, quantity)
+
+
+async def one_transaction(repository: ProductRepositoryImpl, basket: dict) -> None:
+    """The whole basket in one transaction"""
+    await repository.decrement_stock_many(basket)
+
+
+async def bench(path: str, rows: int, concurrency: int, checkout) -> float:
+    """Run the baskets; returns baskets per second"""
+    engine = create_engine_for(f"sqlite:///{path}", Settings())
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        # Enough stock that no basket fails
+        await conn.execute(update(ProductModel).values(stock=100000))
+    rng = random.Random(concurrency)
+    baskets = [
+        {product_id: rng.randint(1, 3) for product_id in rng.sample(range(1, rows + 1), BASKET_LINES)}
+        for _ in range(TOTAL_BASKETS)
+    ]
+    
+    async def request(i: int) -> None:
+        async with factory() as session:
+            await checkout(ProductRepositoryImpl(session), baskets[i])
+    
+    try:
+        return await run_clients(concurrency, TOTAL_BASKETS // concurrency, request)
+    finally:
+        await engine.dispose()
+
+
+async def main(rows: int) -> None:
+    results = []
+    for concurrency in CONCURRENCY_LEVELS:
+        measured = []
+        for checkout in (per_line, one_transaction):
+            path = temp_database_path("checkout")
+            seed_products(path, rows)
+            try:
+                measured.append(await bench(path, rows, concurrency, checkout))
+            finally:
+                for suffix in ("", "-wal", "-shm", "-journal"):
+                    if os.path.exists(path + suffix):
+                        os.unlink(path + suffix)
+        per_line_rate, checkout_rate = measured
+        results.append([
+            concurrency,
+            f"{per_line_rate:.0f}",
+            f"{checkout_rate:.0f}",
+            f"{checkout_rate / per_line_rate:.2f}x",
+            f"{checkout_rate * BASKET_LINES:.0f}",
+        ])
+    print_table(
+        f"{BASKET_LINES}-line baskets, {rows} products, {TOTAL_BASKETS} baskets (baskets/s)",
+        ["clients", "per-line", "checkout", "gain", "checkout lines/s"],
+        results,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5_000))
@@ -0,0 +1,84 @@
+"""
+Shared helpers for the database benchmarks
+
+Run benchmarks from the backend directory with the source tree on the path:
+    PYTHONPATH=src python benchmarks/<benchmark>.py
+"""
+import asyncio
+import os
+import random
+import tempfile
+import time
+from typing import Awaitable, Callable, List
+
+from sqlalchemy import create_engine, insert
+
+from infrastructure.database.sqlalchemy.models import Base, ProductModel
+from infrastructure.database.sqlalchemy.search import create_search_index, rebuild_search_index
+
+CATEGORIES = ["Electronics", "Home", "Sports", "Books", "Toys", "Garden", "Beauty", "Automotive"]
+
+
+def temp_database_path(prefix: str = "bench") -> str:
+    """Return the path of a fresh, empty SQLite file in the temp directory"""
+    fd, path = tempfile.mkstemp(prefix=f"{prefix}-", suffix=".db")
+    os.close(fd)
+    os.unlink(path)
+    return path
+
+
+def seed_products(path: str, rows: int, seed: int = 42) -> None:
+    """Create the schema in a SQLite file, bulk insert `rows` products and index them for search"""
+    rng = random.Random(seed)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    batch = []
+    with engine.begin() as conn:
+        for i in range(1, rows + 1):
+            batch.append({
+                "name": f"Product {i} {rng.choice(['Pro', 'Max', 'Lite', 'Plus'])}",
+                "price_cents": rng.randint(100, 200000),
+                "stock": rng.randint(0, 500),
+                "category": rng.choice(CATEGORIES),
+                "description": f"Description for product {i} " * 4,
+                "is_active": True,
+            })
+            if len(batch) == 5000:
+                conn.execute(insert(ProductModel), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(ProductModel), batch)
+        # Searches join the full-text index, as init_database() sets it up
+        create_search_index(conn)
+        rebuild_search_index(conn)
+    engine.dispose()
+
+
+async def run_clients(
+    concurrency: int,
+    requests_per_client: int,
+    request: Callable[[int], Awaitable[object]]
+) -> float:
+    """
+    Run `concurrency` clients that each await `request(i)` sequentially.
+
+    Returns:
+        Throughput in requests per second
+    """
+    async def client(client_id: int) -> None:
+        for i in range(requests_per_client):
+            await request(client_id * requests_per_client + i)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[client(c) for c in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    return concurrency * requests_per_client / elapsed
+
+
+def print_table(title: str, header: List[str], rows: List[List[object]]) -> None:
+    """Print a fixed-width results table"""
+    print(f"\n{title}")
+    widths = [max(len(str(v)) for v in [h] + [r[i] for r in rows]) + 2 for i, h in enumerate(header)]
+    print("".join(str(h).rjust(w) for h, w in zip(header, widths)))
+    for row in rows:
+        print("".join(str(v).rjust(w) for v, w in zip(row, widths)))
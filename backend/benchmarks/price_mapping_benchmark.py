@@ -0,0 +1,81 @@
+"""
+Benchmark: hydrating listing rows with Float vs integer-cents prices
+
+Maps 10k rows to Product entities the way ProductRepositoryImpl does:
+previously float -> str -> Decimal, now int cents -> Decimal (no string
+round trip). Also times repository.list() of 10k rows end to end.
+
+Usage:
+    PYTHONPATH=src python benchmarks/price_mapping_benchmark.py [rows]
+"""
+import asyncio
+import os
+import random
+import sys
+import time
+from decimal import Decimal
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from common import print_table, seed_products, temp_database_path
+from domain.value_objects.price import Price
+from infrastructure.database.sqlalchemy.models import from_minor_units
+from infrastructure.database.sqlalchemy.repositories.product_repository_impl import ProductRepositoryImpl
+
+REPEAT = 20
+
+
+def time_per_row(convert, values) -> float:
+    """Best-of-REPEAT microseconds per converted value"""
+    best = float("inf")
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        for value in values:
+            convert(value)
+        best = min(best, time.perf_counter() - started)
+    return best / len(values) * 1e6
+
+
+async def time_listing(path: str, rows: int) -> float:
+    """Milliseconds for repository.list() of `rows` products"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    try:
+        best = float("inf")
+        for _ in range(5):
+            async with factory() as session:
+                started = time.perf_counter()
+                await ProductRepositoryImpl(session).list(limit=rows)
+                best = min(best, time.perf_counter() - started)
+        return best * 1000
+    finally:
+        await engine.dispose()
+
+
+def main(rows: int) -> None:
+    rng = random.Random(42)
+    cents = [rng.randint(100, 200000) for _ in range(rows)]
+    floats = [c / 100 for c in cents]
+    
+    float_us = time_per_row(lambda v: Price(Decimal(str(v))), floats)
+    cents_us = time_per_row(lambda v: Price(from_minor_units(v)), cents)
+    print_table(
+        f"Price mapping, {rows} rows (best of {REPEAT})",
+        ["mapping", "us/row", "ms/listing"],
+        [
+            ["float -> str -> Decimal", f"{float_us:.3f}", f"{float_us * rows / 1000:.2f}"],
+            ["int cents -> Decimal", f"{cents_us:.3f}", f"{cents_us * rows / 1000:.2f}"],
+        ],
+    )
+    
+    path = temp_database_path("price")
+    seed_products(path, rows)
+    try:
+        listing_ms = asyncio.run(time_listing(path, rows))
+        print(f"\nrepository.list(limit={rows}): {listing_ms:.1f} ms")
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
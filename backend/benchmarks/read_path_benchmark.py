@@ -0,0 +1,95 @@
+"""
+Benchmark: per-row cost of a 100-item product page, ORM path vs read path
+
+Before: ORM ProductModel instances -> Product entities (Price/Stock
+validation) -> ProductResponseDTO -> response model validation and JSON
+encoding, as FastAPI does for `response_model`.
+After: Core select() of the product columns -> field dicts -> one
+pydantic_core.to_json() call (what GET /api/v1/products now does).
+
+Both include the database query; run against a local SQLite file.
+
+Usage:
+    PYTHONPATH=src python benchmarks/read_path_benchmark.py [rows]
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from common import print_table, seed_products, temp_database_path
+from application.dto.product_dto import ProductListResponseDTO
+from application.use_cases.products.list_products import PRODUCT_FIELDS
+from infrastructure.database.sqlalchemy.repositories.product_repository_impl import ProductRepositoryImpl
+from presentation.api.v1.products.router import _entity_to_response_dto, _product_list_response
+
+PAGE_SIZE = 100
+ITERATIONS = 200
+
+_response_adapter = TypeAdapter(ProductListResponseDTO)
+
+
+async def orm_page(repository: ProductRepositoryImpl) -> bytes:
+    """Entities, DTOs and response model validation (previous list endpoint)"""
+    products = await repository.list(limit=PAGE_SIZE)
+    model = ProductListResponseDTO(
+        items=[_entity_to_response_dto(product) for product in products],
+        total=None, total_mode=None, page=1, limit=PAGE_SIZE, total_pages=None
+    )
+    # FastAPI: dump the returned model, validate it against response_model, encode
+    validated = _response_adapter.validate_python(model.model_dump())
+    return json.dumps(_response_adapter.dump_python(validated, mode="json")).encode()
+
+
+async def read_path_page(repository: ProductRepositoryImpl) -> bytes:
+    """Core rows straight to JSON"""
+    rows = await repository.list(limit=PAGE_SIZE, fields=list(PRODUCT_FIELDS))
+    return _product_list_response({
+        "items": rows, "total": None, "total_mode": None, "page": 1,
+        "limit": PAGE_SIZE, "total_pages": None, "has_more": False, "next_cursor": None,
+    }).body
+
+
+async def time_page(factory, build) -> float:
+    """Best-of microseconds per row for building one page"""
+    async with factory() as session:
+        repository = ProductRepositoryImpl(session)
+        await build(repository)  # warm up
+        best = float("inf")
+        for _ in range(ITERATIONS):
+            started = time.perf_counter()
+            await build(repository)
+            best = min(best, time.perf_counter() - started)
+    return best / PAGE_SIZE * 1e6
+
+
+async def main(rows: int) -> None:
+    path = temp_database_path("read-path")
+    seed_products(path, rows)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    try:
+        async with factory() as session:
+            repository = ProductRepositoryImpl(session)
+            assert json.loads(await orm_page(repository)) == json.loads(await read_path_page(repository))
+        before = await time_page(factory, orm_page)
+        after = await time_page(factory, read_path_page)
+        print_table(
+            f"{PAGE_SIZE}-item page, best of {ITERATIONS} (us per row, query included)",
+            ["path", "us/row", "ms/page"],
+            [
+                ["ORM + entities + DTOs", f"{before:.1f}", f"{before * PAGE_SIZE / 1000:.2f}"],
+                ["Core rows -> JSON", f"{after:.1f}", f"{after * PAGE_SIZE / 1000:.2f}"],
+            ],
+        )
+    finally:
+        await engine.dispose()
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000))
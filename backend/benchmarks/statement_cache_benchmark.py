@@ -0,0 +1,88 @@
+"""
+Benchmark: Python overhead of repository list/count calls with and without
+the statement cache
+
+Queries are chosen to return few rows from a small table, so the time per
+call is dominated by Python: building the select(), generating its SQL
+cache key, executing through the ORM and mapping rows. With the statement
+cache the select() is built once per shape and its cache key is memoized,
+so only bind values change per call.
+
+Usage:
+    PYTHONPATH=src python benchmarks/statement_cache_benchmark.py [calls]
+"""
+import asyncio
+import os
+import sys
+import time
+from decimal import Decimal
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from common import CATEGORIES, print_table, seed_products, temp_database_path
+from infrastructure.database.sqlalchemy.repositories.product_repository_impl import ProductRepositoryImpl
+from infrastructure.database.statement_cache import StatementCache
+
+ROWS = 1000
+
+# (label, repository call); `i` varies the bind values between calls
+QUERIES = [
+    ("list category+price", lambda repo, i: repo.list(
+        filters={"category": CATEGORIES[i % len(CATEGORIES)], "min_price": Decimal(i % 50)}, limit=5
+    )),
+    ("list price cursor", lambda repo, i: repo.list(
+        order_by="-price", after=(Decimal(1000 + i % 100), 10_000), limit=5
+    )),
+    ("list fields", lambda repo, i: repo.list(
+        filters={"category": CATEGORIES[i % len(CATEGORIES)]}, fields=["name", "price"], limit=5
+    )),
+    ("list_with_total", lambda repo, i: repo.list_with_total(
+        filters={"category": CATEGORIES[i % len(CATEGORIES)], "max_price": Decimal(5 + i % 5)}, limit=5
+    )),
+    ("count", lambda repo, i: repo.count({"category": CATEGORIES[i % len(CATEGORIES)]})),
+]
+
+
+async def bench(factory, query, calls: int, cache) -> float:
+    """Microseconds per call"""
+    async with factory() as session:
+        repository = ProductRepositoryImpl(session, statement_cache=cache)
+        for i in range(50):  # Warm up SQLAlchemy's compiled cache
+            await query(repository, i)
+        started = time.perf_counter()
+        for i in range(calls):
+            await query(repository, i)
+        return (time.perf_counter() - started) / calls * 1e6
+
+
+async def main(calls: int) -> None:
+    path = temp_database_path("statement-cache")
+    seed_products(path, ROWS)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    try:
+        results = []
+        cache = StatementCache(max_entries=512)
+        for label, query in QUERIES:
+            uncached = await bench(factory, query, calls, None)
+            cached = await bench(factory, query, calls, cache)
+            results.append([
+                label,
+                f"{uncached:.0f}",
+                f"{cached:.0f}",
+                f"{uncached - cached:.0f}",
+                f"{uncached / cached:.2f}x",
+            ])
+        print_table(
+            f"Repository call overhead, {ROWS} rows, {calls} calls each (us/call)",
+            ["query", "rebuilt", "cached", "saved", "speedup"],
+            results,
+        )
+        print("\nStatement cache:", cache.stats())
+    finally:
+        await engine.dispose()
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
@@ -0,0 +1,107 @@
+"""
+Benchmark: read-modify-write vs conditional UPDATE stock decrements on one SKU
+
+Hundreds of concurrent buyers each take one unit of the same product, with
+more buyers than units. The read-modify-write variant is what a purchase
+did before: load the product, Product.reduce_stock() in Python, update().
+The atomic variant is ProductRepositoryImpl.decrement_stock(): a single
+`UPDATE ... SET stock = stock - 1 WHERE id = :id AND stock >= 1`.
+
+Read-modify-write lets buyers read the same stock and each "sell" a unit.
+Without a version check the later write overwrote the earlier one: the sale
+was counted but the stock only dropped once (oversold). update() now only
+applies to the version that was read, so those buyers fail with
+ProductVersionConflict instead (conflicts) and would have to retry. The
+conditional UPDATE neither loses writes nor conflicts: every sale takes
+exactly one unit and buyers past the stock get InsufficientStock.
+
+Usage:
+    PYTHONPATH=src python benchmarks/stock_contention_benchmark.py [stock]
+"""
+import asyncio
+import os
+import sys
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from common import print_table, run_clients, seed_products, temp_database_path
+from domain.exceptions.product_exceptions import InsufficientStock, ProductVersionConflict
+from domain.value_objects.stock import Stock
+from infrastructure.config.settings import Settings
+from infrastructure.database.sqlalchemy.models import ProductModel
+from infrastructure.database.sqlalchemy.repositories.product_repository_impl import ProductRepositoryImpl
+from infrastructure.database.sqlalchemy.session import create_engine_for
+
+CONCURRENCY_LEVELS = [100, 300, 500]
+BUYS_PER_CLIENT = 4
+SKU = 1
+
+
+async def read_modify_write(repository: ProductRepositoryImpl) -> None:
+    """Previous purchase path: check and decrement in Python"""
+    product = await repository.get_by_id(SKU)
+    product.reduce_stock(1)
+    await repository.update(product)
+
+
+async def conditional_update(repository: ProductRepositoryImpl) -> None:
+    """Check and decrement in one statement"""
+    await repository.decrement_stock(SKU, 1)
+
+
+async def bench(path: str, stock: int, concurrency: int, buy) -> tuple:
+    """Run the buyers; returns (req/s, sold, stock left, oversold, conflicts, errors)"""
+    engine = create_engine_for(f"sqlite:///{path}", Settings())
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    async with factory() as session:
+        await ProductRepositoryImpl(session).update_fields(SKU, {"stock": Stock(stock)})
+    sold = conflicts = errors = 0
+    
+    async def request(i: int) -> None:
+        nonlocal sold, conflicts, errors
+        async with factory() as session:
+            try:
+                await buy(ProductRepositoryImpl(session))
+                sold += 1
+            except InsufficientStock:
+                pass
+            except ProductVersionConflict:
+                conflicts += 1
+            except OperationalError:
+                errors += 1
+    
+    try:
+        throughput = await run_clients(concurrency, BUYS_PER_CLIENT, request)
+        async with factory() as session:
+            left = await session.get(ProductModel, SKU)
+            left = left.stock
+    finally:
+        await engine.dispose()
+    # Units sold beyond what actually left the stock
+    oversold = sold - (stock - left)
+    return throughput, sold, left, oversold, conflicts, errors
+
+
+async def main(stock: int) -> None:
+    results = []
+    for concurrency in CONCURRENCY_LEVELS:
+        for name, buy in (("read-modify-write", read_modify_write), ("conditional UPDATE", conditional_update)):
+            path = temp_database_path("stock-contention")
+            seed_products(path, 100)
+            try:
+                throughput, sold, left, oversold, conflicts, errors = await bench(path, stock, concurrency, buy)
+            finally:
+                for suffix in ("", "-wal", "-shm", "-journal"):
+                    if os.path.exists(path + suffix):
+                        os.unlink(path + suffix)
+            results.append([concurrency, name, f"{throughput:.0f}", sold, left, oversold, conflicts, errors])
+    print_table(
+        f"One SKU with {stock} units, {BUYS_PER_CLIENT} single-unit buys per client",
+        ["clients", "variant", "req/s", "sold", "left", "oversold", "conflicts", "errors"],
+        results,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
@@ -0,0 +1,166 @@
+"""
+Benchmark: stock hold bookkeeping and expiry release with tens of thousands of holds
+
+1. Per-request overhead: placing a hold (hold_stock()) with and without
+   scheduling it on a HoldSweeper that already tracks LIVE_HOLDS holds,
+   plus the cost of one sweeper pass when nothing is due.
+2. Expiry: releasing EXPIRED_HOLDS expired holds one DELETE/UPDATE
+   transaction per hold (a per-row sweep) vs HoldSweeper.sweep(), which
+   releases them HOLD_SWEEP_BATCH_SIZE at a time.
+
+Runs on the application's SQLite engine profile (WAL, one writer at a time).
+
+Usage:
+    PYTHONPATH=src python benchmarks/stock_hold_benchmark.py [products]
+"""
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, text, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from common import print_table, run_clients, seed_products, temp_database_path
+from infrastructure.config.settings import Settings
+from infrastructure.database.hold_sweeper import HoldSweeper
+from infrastructure.database.sqlalchemy.models import ProductModel, StockHoldModel
+from infrastructure.database.sqlalchemy.repositories.product_repository_impl import ProductRepositoryImpl
+from infrastructure.database.sqlalchemy.session import create_engine_for
+
+LIVE_HOLDS = 50_000
+EXPIRED_HOLDS = 10_000
+HOLD_REQUESTS = 2_000
+CONCURRENCY = 50
+
+
+def seed_holds(path: str, products: int, holds: int, expires_at: datetime) -> None:
+    """Insert `holds` one-unit holds spread over the products, with held_stock to match"""
+    rng = random.Random(7)
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        conn.execute(update(ProductModel).values(stock=1_000_000, held_stock=0))
+        conn.execute(insert(StockHoldModel), [
+            {"product_id": rng.randint(1, products), "quantity": 1, "expires_at": expires_at, "created_at": expires_at}
+            for _ in range(holds)
+        ])
+        conn.execute(text(
+            "UPDATE products SET held_stock = "
+            "(SELECT COUNT(*) FROM stock_holds WHERE stock_holds.product_id = products.id)"
+        ))
+    engine.dispose()
+
+
+def remove_database(path: str) -> None:
+    """Delete a SQLite file and its WAL/journal side files"""
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(path + suffix):
+            os.unlink(path + suffix)
+
+
+def tracking_overhead() -> list:
+    """Microseconds per track() and per idle due() with LIVE_HOLDS tracked holds"""
+    sweeper = HoldSweeper(None, interval_seconds=1, batch_size=500, catchup_seconds=0)
+    now = datetime.now()
+    expiries = [now + timedelta(seconds=random.randint(60, 3600)) for _ in range(LIVE_HOLDS)]
+    started = time.perf_counter()
+    for hold_id, expires_at in enumerate(expiries, 1):
+        sweeper.track(hold_id, expires_at)
+    track_us = (time.perf_counter() - started) * 1e6 / LIVE_HOLDS
+    started = time.perf_counter()
+    for _ in range(10_000):
+        sweeper.due(now, 500)
+    due_us = (time.perf_counter() - started) * 1e6 / 10_000
+    return [
+        ["track() per hold", f"{track_us:.2f}"],
+        ["idle pass (nothing due)", f"{due_us:.2f}"],
+    ]
+
+
+async def hold_rate(path: str, products: int, tracked: bool) -> float:
+    """hold_stock() requests per second, optionally scheduling each hold"""
+    engine = create_engine_for(f"sqlite:///{path}", Settings())
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    sweeper = HoldSweeper(factory, interval_seconds=1, batch_size=500, catchup_seconds=0)
+    for hold_id in range(LIVE_HOLDS):
+        sweeper.track(-hold_id, datetime.now() + timedelta(minutes=30))
+    expires_at = datetime.now() + timedelta(minutes=15)
+    
+    async def request(i: int) -> None:
+        async with factory() as session:
+            repository = ProductRepositoryImpl(session, on_hold=sweeper.track if tracked else None)
+            await repository.hold_stock(i % products + 1, 1, expires_at)
+    
+    try:
+        return await run_clients(CONCURRENCY, HOLD_REQUESTS // CONCURRENCY, request)
+    finally:
+        await engine.dispose()
+
+
+async def release_rate(path: str, batched: bool) -> float:
+    """Expired holds released per second"""
+    engine = create_engine_for(f"sqlite:///{path}", Settings())
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    sweeper = HoldSweeper(factory, interval_seconds=1, batch_size=500, catchup_seconds=0)
+    async with factory() as session:
+        hold_ids = await ProductRepositoryImpl(session).expired_hold_ids(datetime.now(), EXPIRED_HOLDS)
+    for hold_id in hold_ids:
+        sweeper.track(hold_id, datetime.now() - timedelta(seconds=1))
+    
+    started = time.perf_counter()
+    try:
+        if batched:
+            released = await sweeper.sweep()
+        else:
+            released = 0
+            for hold_id in hold_ids:
+                async with factory() as session:
+                    released += await ProductRepositoryImpl(session).release_holds([hold_id])
+        assert released == EXPIRED_HOLDS
+        return released / (time.perf_counter() - started)
+    finally:
+        await engine.dispose()
+
+
+async def main(products: int) -> None:
+    print_table(
+        f"Sweeper bookkeeping with {LIVE_HOLDS} tracked holds (microseconds)",
+        ["operation", "us"],
+        tracking_overhead(),
+    )
+    
+    rates = []
+    for tracked in (False, True):
+        path = temp_database_path("holds")
+        seed_products(path, products)
+        seed_holds(path, products, LIVE_HOLDS, datetime.now() + timedelta(minutes=30))
+        try:
+            rates.append(await hold_rate(path, products, tracked))
+        finally:
+            remove_database(path)
+    print_table(
+        f"hold_stock() with {LIVE_HOLDS} live holds, {CONCURRENCY} clients (req/s)",
+        ["untracked", "tracked", "overhead"],
+        [[f"{rates[0]:.0f}", f"{rates[1]:.0f}", f"{(rates[0] / rates[1] - 1) * 100:+.1f}%"]],
+    )
+    
+    rates = []
+    for batched in (False, True):
+        path = temp_database_path("holds")
+        seed_products(path, products)
+        seed_holds(path, products, EXPIRED_HOLDS, datetime.now() - timedelta(minutes=1))
+        try:
+            rates.append(await release_rate(path, batched))
+        finally:
+            remove_database(path)
+    print_table(
+        f"Releasing {EXPIRED_HOLDS} expired holds over {products} products (holds/s)",
+        ["per-row", "batched", "gain"],
+        [[f"{rates[0]:.0f}", f"{rates[1]:.0f}", f"{rates[1] / rates[0]:.1f}x"]],
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000))
@@ -0,0 +1,115 @@
+"""
+Benchmark: product page view counting, one UPDATE per view vs buffered increments
+
+Each simulated client records TOTAL_VIEWS page views spread over the
+catalog with a skewed (Zipf-like) distribution, as real traffic is. The
+direct variant runs `UPDATE products SET popularity = popularity + 1` and
+commits per view. The buffered variant calls ViewCounter.increment() and
+flushes every FLUSH_EVERY views (standing in for the flush interval), with
+the journal snapshot a flush does.
+
+Both run on the application's SQLite engine profile (WAL, one writer at a
+time), so the direct variant serializes a write transaction per view.
+
+Usage:
+    PYTHONPATH=src python benchmarks/view_counter_benchmark.py [rows]
+"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from common import print_table, run_clients, seed_products, temp_database_path
+from infrastructure.config.settings import Settings
+from infrastructure.database.sqlalchemy.models import ProductModel
+from infrastructure.database.sqlalchemy.session import create_engine_for
+from infrastructure.database.view_counter import ViewCounter
+
+CONCURRENCY_LEVELS = [10, 50, 200]
+TOTAL_VIEWS = 4000
+FLUSH_EVERY = 1000
+
+
+def view_stream(rows: int, seed: int) -> list:
+    """Product IDs of TOTAL_VIEWS views, most of them on a few popular products"""
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, rows + 1)]
+    return rng.choices(range(1, rows + 1), weights=weights, k=TOTAL_VIEWS)
+
+
+async def bench_direct(path: str, views: list, concurrency: int) -> float:
+    """One UPDATE and commit per view; returns views per second"""
+    engine = create_engine_for(f"sqlite:///{path}", Settings())
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    
+    async def request(i: int) -> None:
+        async with factory() as session:
+            await session.execute(
+                update(ProductModel)
+                .where(ProductModel.id == views[i])
+                .values(popularity=ProductModel.popularity + 1)
+            )
+            await session.commit()
+    
+    try:
+        return await run_clients(concurrency, TOTAL_VIEWS // concurrency, request)
+    finally:
+        await engine.dispose()
+
+
+async def bench_buffered(path: str, views: list, concurrency: int, journal_dir: str) -> float:
+    """ViewCounter increments with a batched flush every FLUSH_EVERY views; returns views per second"""
+    engine = create_engine_for(f"sqlite:///{path}", Settings())
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    counter = ViewCounter(
+        factory, flush_seconds=3600, flush_threshold=len(views) + 1, journal_seconds=1, journal_dir=journal_dir
+    )
+    
+    async def request(i: int) -> None:
+        counter.increment(views[i])
+        if (i + 1) % FLUSH_EVERY == 0:
+            await counter.flush()
+    
+    try:
+        started = time.perf_counter()
+        await run_clients(concurrency, TOTAL_VIEWS // concurrency, request)
+        await counter.flush()
+        return TOTAL_VIEWS / (time.perf_counter() - started)
+    finally:
+        await engine.dispose()
+
+
+async def main(rows: int) -> None:
+    results = []
+    for concurrency in CONCURRENCY_LEVELS:
+        views = view_stream(rows, concurrency)
+        measured = []
+        for variant in ("direct", "buffered"):
+            path = temp_database_path("views")
+            seed_products(path, rows)
+            try:
+                if variant == "direct":
+                    measured.append(await bench_direct(path, views, concurrency))
+                else:
+                    with tempfile.TemporaryDirectory() as journal_dir:
+                        measured.append(await bench_buffered(path, views, concurrency, journal_dir))
+            finally:
+                for suffix in ("", "-wal", "-shm", "-journal"):
+                    if os.path.exists(path + suffix):
+                        os.unlink(path + suffix)
+        direct, buffered = measured
+        results.append([concurrency, f"{direct:.0f}", f"{buffered:.0f}", f"{buffered / direct:.1f}x"])
+    print_table(
+        f"Page views recorded, {rows} products, {TOTAL_VIEWS} views (views/s)",
+        ["clients", "UPDATE per view", "buffered", "gain"],
+        results,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5_000))
@@ -1,17 +1,44 @@
 """
 Main application entry point
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from infrastructure.config.settings import get_settings
-from infrastructure.database.sqlalchemy.session import init_database
+from infrastructure.database.statement_cache import get_statement_cache
+from infrastructure.database.hold_sweeper import get_hold_sweeper
+from infrastructure.database.view_counter import get_view_counter
+from infrastructure.database.sqlalchemy.session import (
+    dispose_engine,
+    get_pool_stats,
+    init_database,
+    start_pool_validation,
+)
+from presentation.middleware.query_budget import QueryBudgetMiddleware
 from presentation.api.v1.products.router import router as products_router
 from presentation.api.v1.auth.router import router as auth_router
 
 # Get settings
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup/shutdown hooks"""
+    # Check idle pooled connections in the background instead of per checkout
+    start_pool_validation()
+    # Release expired stock holds in batches
+    get_hold_sweeper().start()
+    # Write buffered product views in batches (recovering crashed workers' journals)
+    get_view_counter().start()
+    yield
+    await get_view_counter().stop()
+    await get_hold_sweeper().stop()
+    # Release pooled database connections on shutdown
+    await dispose_engine()
+
+
 # Create FastAPI app with settings
 app = FastAPI(
     title=settings.API_TITLE,
@@ -19,6 +46,7 @@ app = FastAPI(
     version=settings.API_VERSION,
     docs_url="/docs" if settings.DEBUG else None,
     redoc_url="/redoc" if settings.DEBUG else None,
+    lifespan=lifespan,
 )
 
 # Configure CORS with settings
@@ -30,6 +58,9 @@ app.add_middleware(
     allow_headers=settings.CORS_ALLOW_HEADERS,
 )
 
+# Count queries per request (headers outside production, N+1 and budget checks)
+app.add_middleware(QueryBudgetMiddleware)
+
 # Include routers
 app.include_router(products_router, prefix="/api/v1")
 app.include_router(auth_router, prefix="/api/v1")
@@ -53,6 +84,31 @@ async def health_check():
         "environment": settings.ENVIRONMENT
     }
 
+@app.get("/health/db-pool", tags=["General"])
+async def db_pool_stats():
+    """
+    Database connection pool statistics for this worker.
+    
+    Use checked_out/overflow and the checkout wait histogram to size
+    DB_POOL_SIZE and DB_MAX_OVERFLOW for the number of workers.
+    """
+    return get_pool_stats()
+
+@app.get("/health/statement-cache", tags=["General"])
+async def statement_cache_stats():
+    """Hit rate of the repository statement cache per query kind, for this worker"""
+    return get_statement_cache().stats()
+
+@app.get("/health/stock-holds", tags=["General"])
+async def stock_hold_stats():
+    """Stock holds scheduled for release by this worker, and releases so far"""
+    return get_hold_sweeper().stats()
+
+@app.get("/health/view-counter", tags=["General"])
+async def view_counter_stats():
+    """Product views buffered by this worker and flushes so far"""
+    return get_view_counter().stats()
+
 if __name__ == "__main__":
     # Initialize database on startup
     print("🔧 Initializing database...")
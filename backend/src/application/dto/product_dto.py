@@ -3,7 +3,7 @@ Product Data Transfer Objects (DTOs)
 Used for communication between layers
 """
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Any, Optional
 from decimal import Decimal
 from datetime import datetime
 
@@ -26,6 +26,25 @@ class UpdateProductDTO(BaseModel):
     category: Optional[str] = Field(None, min_length=1)
     description: Optional[str] = Field(None, max_length=1000)
     is_active: Optional[bool] = None
+    version: Optional[int] = Field(None, ge=1)  # Only update this version (409 if it changed)
+
+
+class BulkCreateProductsDTO(BaseModel):
+    """DTO for bulk product creation (items are validated one by one)"""
+    items: list[dict[str, Any]] = Field(..., min_length=1)
+
+
+class BulkCreateErrorDTO(BaseModel):
+    """DTO for an item rejected by bulk creation"""
+    index: int  # Position in the request's items
+    error: str
+
+
+class BulkCreateResponseDTO(BaseModel):
+    """DTO for bulk product creation response"""
+    created: int
+    ids: list[int]  # IDs of created products, in request order
+    errors: list[BulkCreateErrorDTO]
 
 
 class ProductResponseDTO(BaseModel):
@@ -34,11 +53,14 @@ class ProductResponseDTO(BaseModel):
     name: str
     price: Decimal
     stock: int
+    held_stock: int = 0  # Units in unexpired stock holds (not included in stock)
     category: str
     description: Optional[str]
     is_active: bool
     created_at: Optional[datetime]
     updated_at: Optional[datetime]
+    version: Optional[int] = None  # Also sent as the ETag of single-product responses
+    popularity: int = 0  # Page views (flushed periodically, may lag a few seconds)
     
     class Config:
         from_attributes = True
@@ -47,10 +69,87 @@ class ProductResponseDTO(BaseModel):
 class ProductListResponseDTO(BaseModel):
     """DTO for paginated product list response"""
     items: list[ProductResponseDTO]
-    total: int
-    page: int
+    total: Optional[int]  # None when requested with include_total=false
+    total_mode: Optional[str] = None  # "exact" or "estimate"
+    page: Optional[int]  # None when paginating with a cursor
     limit: int
-    total_pages: int
+    total_pages: Optional[int]
+    has_more: bool = False
+    next_cursor: Optional[str] = None  # Pass as `cursor` to fetch the next page
+
+
+class ReserveStockDTO(BaseModel):
+    """DTO for taking stock of a product"""
+    quantity: int = Field(..., gt=0)
+
+
+class StockReservationDTO(BaseModel):
+    """DTO for a successful stock reservation"""
+    product_id: int
+    quantity: int
+    remaining_stock: int
+
+
+class StockHoldRequestDTO(BaseModel):
+    """DTO for holding stock of a product"""
+    quantity: int = Field(..., gt=0)
+    ttl_seconds: Optional[int] = Field(None, gt=0)  # Default from settings
+
+
+class StockHoldDTO(BaseModel):
+    """DTO for a stock hold"""
+    id: int
+    product_id: int
+    quantity: int
+    expires_at: datetime
+
+
+class StockShardsDTO(BaseModel):
+    """DTO for switching a product's sharded stock mode"""
+    shards: int = Field(..., ge=0)  # Stock sub-counters; 0 turns sharding off
+
+
+class CheckoutLineDTO(BaseModel):
+    """DTO for one line of a basket"""
+    product_id: int = Field(..., gt=0)
+    quantity: int = Field(..., gt=0)
+
+
+class CheckoutDTO(BaseModel):
+    """DTO for checking out a basket"""
+    items: list[CheckoutLineDTO] = Field(..., min_length=1)
+
+
+class CheckoutErrorDTO(BaseModel):
+    """DTO for a basket line that cannot be fulfilled"""
+    product_id: int
+    error: str
+
+
+class CheckoutResponseDTO(BaseModel):
+    """DTO for a completed checkout: one reservation per product"""
+    items: list[StockReservationDTO]
+
+
+class CategoryFacetDTO(BaseModel):
+    """Products in one category (ignoring the category filter)"""
+    category: str
+    count: int
+
+
+class PriceRangeFacetDTO(BaseModel):
+    """Products priced in [min_price, max_price); max_price None is open-ended"""
+    min_price: Decimal
+    max_price: Optional[Decimal]
+    count: int
+
+
+class ProductFacetsDTO(BaseModel):
+    """DTO for filter sidebar counts"""
+    total: int
+    in_stock: int
+    categories: list[CategoryFacetDTO]
+    price_ranges: list[PriceRangeFacetDTO]
 
 
 class ProductFiltersDTO(BaseModel):
@@ -59,5 +158,6 @@ class ProductFiltersDTO(BaseModel):
     min_price: Optional[Decimal] = Field(None, ge=0)
     max_price: Optional[Decimal] = Field(None, ge=0)
     search: Optional[str] = None
+    fuzzy: bool = False  # Typo-tolerant (trigram) name matching for `search`
     is_active: Optional[bool] = None
 
@@ -0,0 +1,72 @@
+"""
+Use case: Bulk Create Products
+"""
+from typing import Any, Dict, List
+from pydantic import ValidationError
+from domain.repositories.product_repository import ProductRepository
+from application.dto.product_dto import CreateProductDTO
+from application.use_cases.products.create_product import build_product
+
+
+def _describe_validation_error(error: ValidationError) -> str:
+    """Flatten pydantic errors into "field: message; ..." """
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+class BulkCreateProductsUseCase:
+    """
+    Use case for creating many products at once (catalog onboarding).
+    
+    Every item is validated on its own, like CreateProductUseCase would;
+    invalid items are reported by position and the valid ones are
+    persisted together with a single repository call.
+    """
+    
+    def __init__(self, repository: ProductRepository, max_items: int = 100000):
+        """
+        Initialize use case with repository dependency.
+        
+        Args:
+            repository: Product repository implementation
+            max_items: Maximum number of items per call
+        """
+        self._repository = repository
+        self._max_items = max_items
+    
+    async def execute(self, items: List[Dict[str, Any]]) -> dict:
+        """
+        Execute the bulk create use case.
+        
+        Args:
+            items: Raw product creation payloads (CreateProductDTO fields)
+        
+        Returns:
+            Dictionary with created products (in request order) and
+            errors as {"index", "error"} for rejected items
+        
+        Raises:
+            ValueError: If there are too many items
+            Exception: If persistence fails (nothing is created)
+        """
+        if len(items) > self._max_items:
+            raise ValueError(f"Cannot create more than {self._max_items} products at once")
+        
+        products = []
+        errors = []
+        for index, item in enumerate(items):
+            try:
+                products.append(build_product(CreateProductDTO.model_validate(item)))
+            except ValidationError as e:
+                errors.append({"index": index, "error": _describe_validation_error(e)})
+            except ValueError as e:
+                errors.append({"index": index, "error": str(e)})
+        
+        created = await self._repository.create_many(products) if products else []
+        
+        return {
+            "items": created,
+            "errors": errors
+        }
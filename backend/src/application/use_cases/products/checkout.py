@@ -0,0 +1,61 @@
+"""
+Use case: Checkout (all-or-nothing stock decrement of a basket)
+"""
+from typing import Dict, List
+from domain.repositories.product_repository import ProductRepository
+from domain.exceptions.product_exceptions import InvalidStockOperation
+from application.dto.product_dto import CheckoutLineDTO, CheckoutResponseDTO, StockReservationDTO
+
+
+class CheckoutUseCase:
+    """
+    Use case for buying a basket of products.
+    
+    The stock of every line is taken in one repository call (one
+    transaction): either the whole basket is supplied or nothing is taken
+    and each failing line is reported.
+    """
+    
+    def __init__(self, repository: ProductRepository, max_lines: int = 100):
+        """
+        Initialize use case with repository dependency.
+        
+        Args:
+            repository: Product repository implementation
+            max_lines: Maximum number of distinct products per basket
+        """
+        self._repository = repository
+        self._max_lines = max_lines
+    
+    async def execute(self, lines: List[CheckoutLineDTO]) -> CheckoutResponseDTO:
+        """
+        Execute the checkout use case.
+        
+        Lines for the same product are merged.
+        
+        Args:
+            lines: Basket lines
+        
+        Returns:
+            One reservation per product, in order of first appearance
+        
+        Raises:
+            ValueError: If the basket is empty or too large
+            InvalidStockOperation: If a quantity is not positive
+            StockUnavailable: If any product is missing or short of stock
+        """
+        quantities: Dict[int, int] = {}
+        for line in lines:
+            if line.quantity <= 0:
+                raise InvalidStockOperation("Quantity must be positive")
+            quantities[line.product_id] = quantities.get(line.product_id, 0) + line.quantity
+        if not quantities:
+            raise ValueError("Basket is empty")
+        if len(quantities) > self._max_lines:
+            raise ValueError(f"Too many products in basket (max {self._max_lines})")
+        
+        remaining = await self._repository.decrement_stock_many(quantities)
+        return CheckoutResponseDTO(items=[
+            StockReservationDTO(product_id=product_id, quantity=quantity, remaining_stock=remaining[product_id])
+            for product_id, quantity in quantities.items()
+        ])
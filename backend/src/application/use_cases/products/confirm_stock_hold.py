@@ -0,0 +1,41 @@
+"""
+Use case: Confirm Stock Hold (turn a hold into a sale)
+"""
+from domain.repositories.product_repository import ProductRepository
+from application.dto.product_dto import StockHoldDTO
+
+
+class ConfirmStockHoldUseCase:
+    """
+    Use case for confirming a stock hold: its units are sold and will not
+    return to the available stock.
+    """
+    
+    def __init__(self, repository: ProductRepository):
+        """Initialize use case with repository"""
+        self._repository = repository
+    
+    async def execute(self, hold_id: int) -> StockHoldDTO:
+        """
+        Execute the confirm stock hold use case.
+        
+        Args:
+            hold_id: Hold ID
+        
+        Returns:
+            The confirmed hold
+        
+        Raises:
+            ValueError: If hold_id is invalid
+            StockHoldNotFoundError: If the hold was confirmed, released or has expired
+        """
+        if not hold_id or hold_id <= 0:
+            raise ValueError("Hold ID must be a positive integer")
+        
+        hold = await self._repository.confirm_hold(hold_id)
+        return StockHoldDTO(
+            id=hold.id,
+            product_id=hold.product_id,
+            quantity=hold.quantity,
+            expires_at=hold.expires_at
+        )
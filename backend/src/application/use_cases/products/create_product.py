@@ -8,6 +8,27 @@ from domain.value_objects.stock import Stock
 from application.dto.product_dto import CreateProductDTO
 
 
+def build_product(dto: CreateProductDTO) -> Product:
+    """
+    Create an unsaved domain entity from a creation DTO.
+    
+    Raises:
+        ValueError: If a value object or entity rule rejects the data
+    """
+    # Value objects will validate themselves
+    return Product(
+        id=None,
+        name=dto.name.strip(),
+        price=Price(dto.price),  # Value object validates and uses Decimal
+        stock=Stock(dto.stock),   # Value object validates
+        category=dto.category.strip(),
+        description=dto.description.strip() if dto.description else None,
+        is_active=dto.is_active,
+        created_at=None,
+        updated_at=None
+    )
+
+
 class CreateProductUseCase:
     """
     Use case for creating a new product.
@@ -43,18 +64,7 @@ class CreateProductUseCase:
             Exception: If persistence fails
         """
         # Create domain entity with value objects
-        # Value objects will validate themselves
-        product = Product(
-            id=None,
-            name=dto.name.strip(),
-            price=Price(dto.price),  # Value object validates and uses Decimal
-            stock=Stock(dto.stock),   # Value object validates
-            category=dto.category.strip(),
-            description=dto.description.strip() if dto.description else None,
-            is_active=dto.is_active,
-            created_at=None,
-            updated_at=None
-        )
+        product = build_product(dto)
         
         # Persist using repository (abstract, implementation in infrastructure)
         created_product = await self._repository.create(product)
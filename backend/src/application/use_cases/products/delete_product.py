@@ -2,7 +2,6 @@
 Use case: Delete Product
 """
 from domain.repositories.product_repository import ProductRepository
-from domain.exceptions.product_exceptions import ProductNotFoundError
 
 
 class DeleteProductUseCase:
@@ -29,11 +28,6 @@ class DeleteProductUseCase:
         if not product_id or product_id <= 0:
             raise ValueError("Product ID must be a positive integer")
         
-        # Verify product exists
-        product = await self._repository.get_by_id(product_id)
-        if not product:
-            raise ProductNotFoundError(f"Product with ID {product_id} not found")
-        
-        # Soft delete via repository
+        # Soft delete via repository (raises ProductNotFoundError if missing)
         await self._repository.delete(product_id)
 
@@ -1,7 +1,7 @@
 """
 Use case: Get Product by ID
 """
-from typing import Optional
+from typing import Callable, Optional
 from domain.entities.product import Product
 from domain.repositories.product_repository import ProductRepository
 from domain.exceptions.product_exceptions import ProductNotFoundError
@@ -12,9 +12,17 @@ class GetProductUseCase:
     Use case for getting a product by ID.
     """
     
-    def __init__(self, repository: ProductRepository):
-        """Initialize use case with repository"""
+    def __init__(self, repository: ProductRepository, on_view: Optional[Callable[[int], None]] = None):
+        """
+        Initialize use case with repository dependency.
+        
+        Args:
+            repository: Product repository implementation
+            on_view: Called with the product ID of every product found
+                (page view counting)
+        """
         self._repository = repository
+        self._on_view = on_view
     
     async def execute(self, product_id: int) -> Product:
         """
@@ -40,5 +48,7 @@ class GetProductUseCase:
         if not product:
             raise ProductNotFoundError(f"Product with ID {product_id} not found")
         
+        if self._on_view is not None:
+            self._on_view(product.id)
         return product
 
@@ -0,0 +1,62 @@
+"""
+Use case: Get Product Facets (filter sidebar counts)
+"""
+from decimal import Decimal
+from typing import Optional, Sequence
+from domain.repositories.product_repository import ProductRepository
+from application.dto.product_dto import (
+    CategoryFacetDTO,
+    PriceRangeFacetDTO,
+    ProductFacetsDTO,
+    ProductFiltersDTO,
+)
+from application.use_cases.products.list_products import filters_to_dict
+
+
+class GetProductFacetsUseCase:
+    """
+    Use case for the counts behind catalog filters: per category, per price
+    range and in stock, for the same filters as a product listing.
+    """
+    
+    def __init__(self, repository: ProductRepository, price_edges: Sequence[Decimal]):
+        """
+        Initialize use case.
+        
+        Args:
+            repository: Product repository
+            price_edges: Ascending price range boundaries
+        """
+        self._repository = repository
+        self._price_edges = list(price_edges)
+    
+    async def execute(self, filters: Optional[ProductFiltersDTO] = None) -> ProductFacetsDTO:
+        """
+        Execute the get facets use case.
+        
+        Args:
+            filters: Filter criteria (as for listing)
+        
+        Returns:
+            Facet counts; categories sorted by count, then name
+        
+        Raises:
+            ValueError: If the price range boundaries are not ascending
+        """
+        if any(low >= high for low, high in zip(self._price_edges, self._price_edges[1:])):
+            raise ValueError("Price ranges must be ascending")
+        
+        facets = await self._repository.facets(filters_to_dict(filters), self._price_edges)
+        
+        lows = [Decimal("0")] + self._price_edges
+        highs = self._price_edges + [None]
+        categories = sorted(facets["categories"].items(), key=lambda item: (-item[1], item[0]))
+        return ProductFacetsDTO(
+            total=facets["total"],
+            in_stock=facets["in_stock"],
+            categories=[CategoryFacetDTO(category=name, count=count) for name, count in categories],
+            price_ranges=[
+                PriceRangeFacetDTO(min_price=low, max_price=high, count=count)
+                for low, high, count in zip(lows, highs, facets["price_buckets"])
+            ]
+        )
@@ -0,0 +1,43 @@
+"""
+Use case: Get Products by IDs
+"""
+from typing import List
+from domain.entities.product import Product
+from domain.repositories.product_repository import ProductRepository
+
+# Maximum number of IDs per call
+MAX_IDS = 100
+
+
+class GetProductsUseCase:
+    """
+    Use case for getting several products by ID in one call
+    (cart, wishlist and order pages).
+    """
+    
+    def __init__(self, repository: ProductRepository):
+        """Initialize use case with repository"""
+        self._repository = repository
+    
+    async def execute(self, product_ids: List[int]) -> List[Product]:
+        """
+        Execute the get products use case.
+        
+        Args:
+            product_ids: Product IDs to retrieve
+        
+        Returns:
+            Found products in request order (unknown IDs are omitted)
+        
+        Raises:
+            ValueError: If an ID is invalid or there are too many IDs
+        """
+        # Validate input
+        if any(product_id <= 0 for product_id in product_ids):
+            raise ValueError("Product ID must be a positive integer")
+        if len(set(product_ids)) > MAX_IDS:
+            raise ValueError(f"Cannot request more than {MAX_IDS} products at once")
+        
+        if not product_ids:
+            return []
+        return await self._repository.get_many(product_ids)
@@ -0,0 +1,70 @@
+"""
+Use case: Hold Stock (time-limited reservation)
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+
+from domain.repositories.product_repository import ProductRepository
+from domain.exceptions.product_exceptions import InvalidStockOperation
+from application.dto.product_dto import StockHoldDTO
+
+
+class HoldStockUseCase:
+    """
+    Use case for holding units of a product's stock, e.g. while they sit in
+    a cart.
+    
+    The units leave the available stock at once (with the same atomic
+    conditional decrement as ReserveStockUseCase) and come back when the
+    hold is released or expires, unless it is confirmed first.
+    """
+    
+    def __init__(self, repository: ProductRepository, default_ttl_seconds: int = 900, max_ttl_seconds: int = 3600):
+        """
+        Initialize use case with repository dependency.
+        
+        Args:
+            repository: Product repository implementation
+            default_ttl_seconds: Hold lifetime when none is requested
+            max_ttl_seconds: Longest lifetime that may be requested
+        """
+        self._repository = repository
+        self._default_ttl_seconds = default_ttl_seconds
+        self._max_ttl_seconds = max_ttl_seconds
+    
+    async def execute(self, product_id: int, quantity: int, ttl_seconds: Optional[int] = None) -> StockHoldDTO:
+        """
+        Execute the hold stock use case.
+        
+        Args:
+            product_id: Product ID
+            quantity: Units to hold
+            ttl_seconds: Hold lifetime (default from settings)
+        
+        Returns:
+            The hold, with its expiry
+        
+        Raises:
+            ValueError: If product_id or ttl_seconds is invalid
+            InvalidStockOperation: If quantity is not positive
+            ProductNotFoundError: If product doesn't exist
+            InsufficientStock: If not enough stock available
+        """
+        if not product_id or product_id <= 0:
+            raise ValueError("Product ID must be a positive integer")
+        if quantity <= 0:
+            raise InvalidStockOperation("Quantity must be positive")
+        if ttl_seconds is None:
+            ttl_seconds = self._default_ttl_seconds
+        if ttl_seconds <= 0 or ttl_seconds > self._max_ttl_seconds:
+            raise ValueError(f"Hold lifetime must be between 1 and {self._max_ttl_seconds} seconds")
+        
+        hold = await self._repository.hold_stock(
+            product_id, quantity, datetime.now() + timedelta(seconds=ttl_seconds)
+        )
+        return StockHoldDTO(
+            id=hold.id,
+            product_id=hold.product_id,
+            quantity=hold.quantity,
+            expires_at=hold.expires_at
+        )
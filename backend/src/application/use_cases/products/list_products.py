@@ -1,15 +1,102 @@
 """
 Use case: List Products with filters and pagination
 """
-from typing import List
-from domain.entities.product import Product
-from domain.repositories.product_repository import ProductRepository
+import base64
+import binascii
+import json
+from typing import List, Optional
+from domain.repositories.product_repository import ProductRepository, ProductRow
 from application.dto.product_dto import ProductFiltersDTO
 
+# Supported sort orders ("-" prefix means descending); "relevance" ranks
+# search matches (by similarity for fuzzy search) and supports
+# page/offset pagination only
+SORT_OPTIONS = (
+    "id", "price", "name", "popularity",
+    "-id", "-price", "-name", "-popularity",
+    "relevance",
+)
+
+# How the total is computed: exact count or planner statistics estimate
+TOTAL_MODES = ("exact", "estimate")
+
+# Product fields a listing can be restricted to (sparse fieldsets)
+PRODUCT_FIELDS = (
+    "id", "name", "price", "stock", "held_stock", "category", "description",
+    "is_active", "created_at", "updated_at", "version", "popularity",
+)
+
+
+def encode_cursor(sort: str, product: ProductRow) -> str:
+    """
+    Build an opaque cursor pointing just after `product` in `sort` order.
+    
+    The cursor carries the sort order, the product's sort key and its ID,
+    which is all the repository needs for a keyset seek.
+    """
+    field = sort.lstrip("-")
+    if isinstance(product, dict):
+        product_id = product["id"]
+        key = str(product[field]) if field == "price" else product[field]
+    else:
+        product_id = product.id
+        if field == "price":
+            key = str(product.price.value)
+        elif field == "name":
+            key = product.name
+        elif field == "popularity":
+            key = product.popularity
+        else:
+            key = product.id
+    payload = json.dumps({"s": sort, "k": key, "i": product_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    Decode a cursor produced by encode_cursor().
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["s"] not in SORT_OPTIONS or not isinstance(payload["i"], int):
+            raise ValueError
+        return payload
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise ValueError("Invalid pagination cursor")
+
+
+def filters_to_dict(filters: Optional[ProductFiltersDTO]) -> Optional[dict]:
+    """Convert a filters DTO to the repository's filters dict (unset filters omitted)"""
+    if not filters:
+        return None
+    filters_dict = {}
+    if filters.category:
+        filters_dict["category"] = filters.category
+    if filters.min_price is not None:
+        filters_dict["min_price"] = filters.min_price
+    if filters.max_price is not None:
+        filters_dict["max_price"] = filters.max_price
+    if filters.search:
+        filters_dict["search"] = filters.search
+        if filters.fuzzy:
+            filters_dict["fuzzy"] = True
+    if filters.is_active is not None:
+        filters_dict["is_active"] = filters.is_active
+    return filters_dict
+
 
 class ListProductsUseCase:
     """
     Use case for listing products with filters and pagination.
+    
+    Supports two pagination modes:
+    - Page/offset: `page` selects the page (cost grows with page depth)
+    - Cursor/keyset: `cursor` is the `next_cursor` of the previous page and
+      the repository seeks directly to it (constant cost per page)
     """
     
     def __init__(self, repository: ProductRepository):
@@ -20,63 +107,121 @@ class ListProductsUseCase:
         self,
         filters: ProductFiltersDTO,
         page: int = 1,
-        limit: int = 20
+        limit: int = 20,
+        sort: Optional[str] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        total_mode: str = "exact",
+        fields: Optional[List[str]] = None
     ) -> dict:
         """
         Execute the list products use case.
         
         Args:
             filters: Filter criteria
-            page: Page number (1-indexed)
+            page: Page number (1-indexed, ignored when cursor is given)
             limit: Items per page
+            sort: Sort order, one of SORT_OPTIONS (default: "relevance"
+                when searching, "id" otherwise)
+            cursor: Opaque cursor returned as next_cursor by a previous call
+            include_total: Count all matches; when False the count is
+                skipped and only has_more is reported
+            total_mode: "exact" or "estimate"; estimates come from database
+                statistics and fall back to an exact count when unavailable
+            fields: Product fields to return (sparse fieldset); only
+                those columns are loaded. None returns full entities.
         
         Returns:
             Dictionary with:
-                - items: List of Product entities
-                - total: Total count
-                - page: Current page
+                - items: List of Product entities, or of {field: value}
+                  dicts (with "id" and the requested fields) when
+                  `fields` is given
+                - total: Total count (None if include_total is False)
+                - total_mode: "exact" or "estimate" (None if include_total is False)
+                - page: Current page (None in cursor mode)
                 - limit: Items per page
-                - total_pages: Total pages
+                - total_pages: Total pages (None if include_total is False)
+                - has_more: Whether a following page exists
+                - next_cursor: Cursor for the following page, None on the last page
+        
+        Raises:
+            ValueError: If sort or a field is unsupported or cursor is invalid
         """
         # Validate pagination
         if page < 1:
             page = 1
         if limit < 1 or limit > 100:
             limit = 20
+        if sort is None:
+            sort = "relevance" if filters and filters.search else "id"
+        if sort not in SORT_OPTIONS:
+            raise ValueError(f"Sort must be one of: {', '.join(SORT_OPTIONS)}")
+        if total_mode not in TOTAL_MODES:
+            raise ValueError(f"Total mode must be one of: {', '.join(TOTAL_MODES)}")
+        if fields is not None:
+            unknown = [field for field in fields if field not in PRODUCT_FIELDS]
+            if unknown:
+                raise ValueError(f"Fields must be among: {', '.join(PRODUCT_FIELDS)}")
+        
+        after = None
+        if cursor:
+            if sort == "relevance":
+                raise ValueError("Relevance sort does not support cursor pagination")
+            position = decode_cursor(cursor)
+            if position["s"] != sort:
+                raise ValueError("Cursor does not match the requested sort order")
+            after = (position["k"], position["i"])
         
         offset = (page - 1) * limit
         
         # Convert DTO to dict for repository
-        filters_dict = None
-        if filters:
-            filters_dict = {}
-            if filters.category:
-                filters_dict["category"] = filters.category
-            if filters.min_price is not None:
-                filters_dict["min_price"] = filters.min_price
-            if filters.max_price is not None:
-                filters_dict["max_price"] = filters.max_price
-            if filters.search:
-                filters_dict["search"] = filters.search
-            if filters.is_active is not None:
-                filters_dict["is_active"] = filters.is_active
+        filters_dict = filters_to_dict(filters)
         
-        # Get products and count
-        products = await self._repository.list(
+        # Get products (one extra row tells whether a next page exists),
+        # with the total counted in the same query unless it was opted out
+        page_args = dict(
             filters=filters_dict,
-            limit=limit,
-            offset=offset
+            limit=limit + 1,
+            offset=offset,
+            order_by=sort,
+            after=after,
+            fields=fields
         )
-        total = await self._repository.count(filters=filters_dict)
+        total: Optional[int] = None
+        if include_total and total_mode == "estimate":
+            total = await self._repository.estimate_count(filters=filters_dict)
+            if total is None:
+                total_mode = "exact"
+        
+        if include_total and total is None:
+            products, total = await self._repository.list_with_total(**page_args)
+        else:
+            products = await self._repository.list(**page_args)
         
-        # Calculate total pages
-        total_pages = (total + limit - 1) // limit if total > 0 else 0
+        total_pages: Optional[int] = None
+        if total is not None:
+            # Calculate total pages
+            total_pages = (total + limit - 1) // limit if total > 0 else 0
+        
+        has_more = len(products) > limit
+        next_cursor = None
+        if has_more:
+            products = products[:limit]
+            if sort != "relevance":
+                next_cursor = encode_cursor(sort, products[-1])
+        sort_field = sort.lstrip("-")
+        if fields is not None and sort_field not in fields and sort_field in PRODUCT_FIELDS:
+            # Drop the column loaded only for the cursor
+            returned = ["id", *fields]
+            products = [{field: product[field] for field in returned} for product in products]
         
         return {
             "items": products,
             "total": total,
-            "page": page,
+            "total_mode": total_mode if include_total else None,
+            "page": None if cursor else page,
             "limit": limit,
-            "total_pages": total_pages
+            "total_pages": total_pages,
+            "has_more": has_more,
+            "next_cursor": next_cursor
         }
-
@@ -0,0 +1,33 @@
+"""
+Use case: Release Stock Hold (cancel a reservation)
+"""
+from domain.repositories.product_repository import ProductRepository
+from domain.exceptions.product_exceptions import StockHoldNotFoundError
+
+
+class ReleaseStockHoldUseCase:
+    """
+    Use case for cancelling a stock hold before it expires: its units
+    return to the available stock at once.
+    """
+    
+    def __init__(self, repository: ProductRepository):
+        """Initialize use case with repository"""
+        self._repository = repository
+    
+    async def execute(self, hold_id: int) -> None:
+        """
+        Execute the release stock hold use case.
+        
+        Args:
+            hold_id: Hold ID
+        
+        Raises:
+            ValueError: If hold_id is invalid
+            StockHoldNotFoundError: If the hold was confirmed or already released
+        """
+        if not hold_id or hold_id <= 0:
+            raise ValueError("Hold ID must be a positive integer")
+        
+        if not await self._repository.release_holds([hold_id]):
+            raise StockHoldNotFoundError(f"Stock hold with ID {hold_id} not found")
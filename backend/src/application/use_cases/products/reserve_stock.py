@@ -0,0 +1,45 @@
+"""
+Use case: Reserve Stock (atomic decrement)
+"""
+from domain.repositories.product_repository import ProductRepository
+from domain.exceptions.product_exceptions import InvalidStockOperation
+from application.dto.product_dto import StockReservationDTO
+
+
+class ReserveStockUseCase:
+    """
+    Use case for taking units of a product's stock for a purchase.
+    
+    Unlike loading the product and calling Product.reduce_stock(), the
+    availability check and the decrement happen in the database as one
+    statement, so concurrent buyers of the same product cannot oversell.
+    """
+    
+    def __init__(self, repository: ProductRepository):
+        """Initialize use case with repository"""
+        self._repository = repository
+    
+    async def execute(self, product_id: int, quantity: int) -> StockReservationDTO:
+        """
+        Execute the reserve stock use case.
+        
+        Args:
+            product_id: Product ID
+            quantity: Units to reserve
+        
+        Returns:
+            The reservation with the stock left
+        
+        Raises:
+            ValueError: If product_id is invalid
+            InvalidStockOperation: If quantity is not positive
+            ProductNotFoundError: If product doesn't exist
+            InsufficientStock: If not enough stock available
+        """
+        if not product_id or product_id <= 0:
+            raise ValueError("Product ID must be a positive integer")
+        if quantity <= 0:
+            raise InvalidStockOperation("Quantity must be positive")
+        
+        remaining = await self._repository.decrement_stock(product_id, quantity)
+        return StockReservationDTO(product_id=product_id, quantity=quantity, remaining_stock=remaining)
@@ -0,0 +1,48 @@
+"""
+Use case: Set Stock Shards (sharded stock mode for hot products)
+"""
+from domain.entities.product import Product
+from domain.repositories.product_repository import ProductRepository
+
+
+class SetStockShardsUseCase:
+    """
+    Use case for splitting a hot product's stock across sub-counters.
+    
+    Under flash-sale load every purchase of one product updates the same
+    row; with N shards concurrent purchases spread over N rows. The
+    product's stock is unchanged.
+    """
+    
+    def __init__(self, repository: ProductRepository, max_shards: int = 64):
+        """
+        Initialize use case with repository dependency.
+        
+        Args:
+            repository: Product repository implementation
+            max_shards: Maximum number of sub-counters per product
+        """
+        self._repository = repository
+        self._max_shards = max_shards
+    
+    async def execute(self, product_id: int, shards: int) -> Product:
+        """
+        Execute the set stock shards use case.
+        
+        Args:
+            product_id: Product ID
+            shards: Number of sub-counters, 0 to turn sharding off
+        
+        Returns:
+            The product
+        
+        Raises:
+            ValueError: If product_id or shards is invalid
+            ProductNotFoundError: If product doesn't exist
+        """
+        if not product_id or product_id <= 0:
+            raise ValueError("Product ID must be a positive integer")
+        if shards < 0 or shards > self._max_shards:
+            raise ValueError(f"Shards must be between 0 and {self._max_shards}")
+        
+        return await self._repository.set_stock_shards(product_id, shards)
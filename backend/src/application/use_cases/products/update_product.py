@@ -1,9 +1,11 @@
 """
 Use case: Update Product
 """
+from typing import Optional
 from domain.entities.product import Product
 from domain.repositories.product_repository import ProductRepository
-from domain.exceptions.product_exceptions import ProductNotFoundError
+from domain.value_objects.price import Price
+from domain.value_objects.stock import Stock
 from application.dto.product_dto import UpdateProductDTO
 
 
@@ -16,13 +18,20 @@ class UpdateProductUseCase:
         """Initialize use case with repository"""
         self._repository = repository
     
-    async def execute(self, product_id: int, dto: UpdateProductDTO) -> Product:
+    async def execute(
+        self,
+        product_id: int,
+        dto: UpdateProductDTO,
+        expected_version: Optional[int] = None
+    ) -> Product:
         """
         Execute the update product use case.
         
         Args:
             product_id: Product ID to update
             dto: Update data
+            expected_version: Only update this version of the product
+                (defaults to dto.version; any version if neither is set)
         
         Returns:
             Updated Product entity
@@ -30,52 +39,49 @@ class UpdateProductUseCase:
         Raises:
             ValueError: If product_id is invalid
             ProductNotFoundError: If product doesn't exist
-            ValueError: If no fields to update
+            ProductVersionConflict: If the product is at another version
+            ValueError: If no fields to update or a value is invalid
         """
         # Validate input
         if not product_id or product_id <= 0:
             raise ValueError("Product ID must be a positive integer")
         
-        # Get existing product
-        product = await self._repository.get_by_id(product_id)
-        if not product:
-            raise ProductNotFoundError(f"Product with ID {product_id} not found")
-        
-        # Update fields (only provided ones)
-        from domain.value_objects.price import Price
-        from domain.value_objects.stock import Stock
+        # Collect provided fields only (PATCH semantics); value objects validate
+        changes = {}
         
         if dto.name is not None:
-            product.name = dto.name.strip()
+            name = dto.name.strip()
+            if not name:
+                raise ValueError("Product name cannot be empty")
+            changes["name"] = name
         
         if dto.price is not None:
-            product.price = Price(dto.price)
+            changes["price"] = Price(dto.price)
         
         if dto.stock is not None:
-            product.stock = Stock(dto.stock)
+            changes["stock"] = Stock(dto.stock)
         
         if dto.category is not None:
-            product.category = dto.category.strip()
+            category = dto.category.strip()
+            if not category:
+                raise ValueError("Product category cannot be empty")
+            changes["category"] = category
         
         if dto.description is not None:
-            product.description = dto.description.strip() if dto.description else None
+            changes["description"] = dto.description.strip() if dto.description else None
         
         if dto.is_active is not None:
-            product.is_active = dto.is_active
+            changes["is_active"] = dto.is_active
         
         # Check if any field was updated
-        if not any([
-            dto.name is not None,
-            dto.price is not None,
-            dto.stock is not None,
-            dto.category is not None,
-            dto.description is not None,
-            dto.is_active is not None
-        ]):
+        if not changes:
             raise ValueError("No fields to update")
         
-        # Persist changes
-        updated_product = await self._repository.update(product)
+        # Persist changes in one statement (raises ProductNotFoundError)
+        if expected_version is None:
+            expected_version = dto.version
+        updated_product = await self._repository.update_fields(
+            product_id, changes, expected_version=expected_version
+        )
         
         return updated_product
-
@@ -33,6 +33,8 @@ class Product:
     is_active: bool
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
+    version: Optional[int] = None  # Stored version, for optimistic concurrency (None if unsaved)
+    popularity: int = 0  # Page views, as last flushed by the view counter
     
     def __post_init__(self):
         """Validate product on creation"""
@@ -62,7 +64,7 @@ class Product:
             )
         
         # Create new Stock instance (immutable)
-        self.stock = Stock(self.stock.value - quantity)
+        self.stock = self.stock - quantity
         self.updated_at = datetime.now()
     
     def increase_stock(self, quantity: int) -> None:
@@ -75,7 +77,7 @@ class Product:
         if quantity <= 0:
             raise InvalidStockOperation("Quantity must be positive")
         
-        self.stock = Stock(self.stock.value + quantity)
+        self.stock = self.stock + quantity
         self.updated_at = datetime.now()
     
     def apply_discount(self, percentage: Decimal) -> Price:
@@ -103,7 +105,7 @@ class Product:
         return Price(new_price)
     
     def is_available(self) -> bool:
-        """Business rule: Check if product is available for purchase"""
+        """Business rule: Check if product is available for purchase (held units excluded)"""
         return self.is_active and self.stock.is_available()
     
     def is_low_stock(self, threshold: int = 10) -> bool:
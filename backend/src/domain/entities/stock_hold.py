@@ -0,0 +1,25 @@
+"""
+Stock hold domain entity
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+
+@dataclass
+class StockHold:
+    """
+    Time-limited reservation of a product's stock (e.g. by a cart).
+    
+    The held units are deducted from the available stock when the hold is
+    placed. Confirming the hold sells them; releasing it, or letting it
+    expire, returns them to the available stock.
+    """
+    id: Optional[int]
+    product_id: int
+    quantity: int
+    expires_at: datetime
+    
+    def is_expired(self, now: Optional[datetime] = None) -> bool:
+        """Business rule: Check if the hold has lapsed"""
+        return self.expires_at <= (now or datetime.now())
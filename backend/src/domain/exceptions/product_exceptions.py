@@ -1,6 +1,7 @@
 """
 Product domain exceptions
 """
+from typing import Dict
 from domain.exceptions.domain_exceptions import DomainException
 
 
@@ -19,6 +20,37 @@ class InsufficientStock(DomainException):
     pass
 
 
+class StockHoldNotFoundError(DomainException):
+    """Raised when a stock hold does not exist (or was confirmed, released or expired)"""
+    pass
+
+
+class StockUnavailable(DomainException):
+    """
+    Raised when some products of a multi-product stock decrement cannot be
+    supplied (nothing is taken)
+    
+    `failures` maps each failing product ID to its InsufficientStock or
+    ProductNotFoundError.
+    """
+    
+    def __init__(self, failures: Dict[int, DomainException]):
+        self.failures = failures
+        super().__init__(f"{len(failures)} product(s) cannot be supplied")
+
+
+class ProductVersionConflict(DomainException):
+    """Raised when a product changed since the version a write expected"""
+    
+    def __init__(self, product_id: int, expected_version: int, current_version: int):
+        self.product_id = product_id
+        self.expected_version = expected_version
+        self.current_version = current_version
+        super().__init__(
+            f"Product with ID {product_id} was modified (version {current_version}, expected {expected_version})"
+        )
+
+
 class InvalidPriceError(DomainException):
     """Raised when price is invalid"""
     pass
@@ -2,8 +2,15 @@
 Product repository interface - defines contract for product persistence
 """
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 from domain.entities.product import Product
+from domain.entities.stock_hold import StockHold
+
+
+# A listed product: the entity, or a dict of selected fields
+ProductRow = Union[Product, Dict[str, Any]]
 
 
 class ProductRepository(ABC):
@@ -34,6 +41,22 @@ class ProductRepository(ABC):
         """
         pass
     
+    @abstractmethod
+    async def create_many(self, products: List[Product]) -> List[Product]:
+        """
+        Create several products in one transaction.
+        
+        Args:
+            products: Product entities to create
+        
+        Returns:
+            Created products with IDs assigned, in input order
+        
+        Raises:
+            Exception: If creation fails (nothing is created)
+        """
+        pass
+    
     @abstractmethod
     async def get_by_id(self, product_id: int) -> Optional[Product]:
         """
@@ -47,13 +70,30 @@ class ProductRepository(ABC):
         """
         pass
     
+    @abstractmethod
+    async def get_many(self, product_ids: List[int]) -> List[Product]:
+        """
+        Get several products by ID at once.
+        
+        Args:
+            product_ids: Product IDs (duplicates are ignored)
+        
+        Returns:
+            Found products in the order of product_ids; unknown IDs
+            are omitted
+        """
+        pass
+    
     @abstractmethod
     async def list(
         self,
         filters: Optional[dict] = None,
         limit: int = 20,
-        offset: int = 0
-    ) -> List[Product]:
+        offset: int = 0,
+        order_by: str = "id",
+        after: Optional[Tuple[Any, int]] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[ProductRow]:
         """
         List products with optional filters.
         
@@ -63,12 +103,46 @@ class ProductRepository(ABC):
                 - min_price: Decimal
                 - max_price: Decimal
                 - search: str
+                - fuzzy: bool (typo-tolerant name matching for search)
                 - is_active: bool
             limit: Maximum number of results
-            offset: Number of results to skip
+            offset: Number of results to skip (ignored when `after` is given)
+            order_by: Sort field, one of "id", "price", "name"; prefix
+                with "-" for descending order. Ties are broken by id.
+            after: Keyset position (last sort key, last id) of the previous
+                page. Rows are returned strictly after it in sort order,
+                without scanning skipped rows.
+            fields: Product attribute names to load (e.g. ["name", "price"]).
+                Only those columns are read; "id" and the sort field are
+                always included.
+        
+        Returns:
+            List of Product entities, or of {field: value} dicts when
+            `fields` is given
+        
+        Raises:
+            ValueError: If order_by or a field is not supported
+        """
+        pass
+    
+    @abstractmethod
+    async def list_with_total(
+        self,
+        filters: Optional[dict] = None,
+        limit: int = 20,
+        offset: int = 0,
+        order_by: str = "id",
+        after: Optional[Tuple[Any, int]] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Tuple[List[ProductRow], int]:
+        """
+        List products and count all matches in a single round trip.
+        
+        Args:
+            Same as list() method
         
         Returns:
-            List of Product entities
+            Tuple of (page of products as returned by list(), total count of matching products)
         """
         pass
     
@@ -78,13 +152,188 @@ class ProductRepository(ABC):
         Update existing product.
         
         Args:
-            product: Product entity with updated data
+            product: Product entity with updated data; if it has a version,
+                the update only applies to that version
         
         Returns:
             Updated product entity
         
         Raises:
             ProductNotFoundError: If product doesn't exist
+            ProductVersionConflict: If the product was modified since
+                `product.version`
+        """
+        pass
+    
+    @abstractmethod
+    async def update_fields(
+        self,
+        product_id: int,
+        changes: Dict[str, Any],
+        expected_version: Optional[int] = None
+    ) -> Product:
+        """
+        Partially update an active product, writing only the given fields.
+        
+        Every write increments the product's version.
+        
+        Args:
+            product_id: Product ID to update
+            changes: New values by field: name, category, description (str),
+                price (Price), stock (Stock), is_active (bool)
+            expected_version: Only update this version of the product
+                (optimistic concurrency); any version if None
+        
+        Returns:
+            Updated product entity (unchanged and not written if every
+            value already matched)
+        
+        Raises:
+            ProductNotFoundError: If no active product has this ID
+            ProductVersionConflict: If the product is not at `expected_version`
+            ValueError: If a field cannot be updated
+        """
+        pass
+    
+    @abstractmethod
+    async def decrement_stock(self, product_id: int, quantity: int) -> int:
+        """
+        Atomically take `quantity` units from an active product's stock.
+        
+        The check and the write are one conditional statement, so
+        concurrent decrements can neither oversell nor lose updates.
+        
+        Args:
+            product_id: Product ID
+            quantity: Units to take (positive)
+        
+        Returns:
+            Stock left after the decrement
+        
+        Raises:
+            ProductNotFoundError: If no active product has this ID
+            InsufficientStock: If fewer than `quantity` units are in stock
+        """
+        pass
+    
+    @abstractmethod
+    async def decrement_stock_many(self, quantities: Dict[int, int]) -> Dict[int, int]:
+        """
+        Take stock of several products in one transaction, all or nothing.
+        
+        Rows are locked in ascending product ID order, so concurrent calls
+        with overlapping products cannot deadlock.
+        
+        Args:
+            quantities: Units to take (positive) by product ID
+        
+        Returns:
+            Stock left after the decrement, by product ID
+        
+        Raises:
+            StockUnavailable: If any product is missing or short of stock;
+                no stock is taken
+        """
+        pass
+    
+    @abstractmethod
+    async def set_stock_shards(self, product_id: int, shards: int) -> Product:
+        """
+        Split a product's stock across `shards` sub-counters, or merge it
+        back with 0 (sharded stock mode for hot products).
+        
+        Decrements of a sharded product lock one sub-counter instead of the
+        product, so concurrent buyers no longer queue on a single row. The
+        product's stock stays the same, as the sum of the sub-counters.
+        
+        Args:
+            product_id: Product ID
+            shards: Number of sub-counters (0 turns sharding off)
+        
+        Returns:
+            The product, with its stock
+        
+        Raises:
+            ProductNotFoundError: If no active product has this ID
+        """
+        pass
+    
+    @abstractmethod
+    async def hold_stock(self, product_id: int, quantity: int, expires_at: datetime) -> StockHold:
+        """
+        Hold `quantity` units of an active product until `expires_at`.
+        
+        The units are atomically moved from the available stock to the
+        held stock, as decrement_stock() takes them.
+        
+        Args:
+            product_id: Product ID
+            quantity: Units to hold (positive)
+            expires_at: When the hold lapses and its units are released
+        
+        Returns:
+            The new hold
+        
+        Raises:
+            ProductNotFoundError: If no active product has this ID
+            InsufficientStock: If fewer than `quantity` units are available
+        """
+        pass
+    
+    @abstractmethod
+    async def confirm_hold(self, hold_id: int) -> StockHold:
+        """
+        Turn a hold into a sale: its units leave the held stock for good.
+        
+        Args:
+            hold_id: Hold ID
+        
+        Returns:
+            The confirmed hold
+        
+        Raises:
+            StockHoldNotFoundError: If the hold no longer exists
+        """
+        pass
+    
+    @abstractmethod
+    async def release_holds(self, hold_ids: Sequence[int]) -> int:
+        """
+        Return the units of holds to the available stock, in one transaction.
+        
+        Holds that no longer exist (confirmed, or released elsewhere) are
+        skipped.
+        
+        Args:
+            hold_ids: Hold IDs
+        
+        Returns:
+            Number of holds released
+        """
+        pass
+    
+    @abstractmethod
+    async def expired_hold_ids(self, now: datetime, limit: int) -> List[int]:
+        """
+        IDs of holds that expired at `now`, oldest first.
+        
+        Args:
+            now: Current time
+            limit: Maximum number of IDs
+        
+        Returns:
+            Hold IDs
+        """
+        pass
+    
+    @abstractmethod
+    async def record_views(self, views: Dict[int, int]) -> None:
+        """
+        Add page views to products' counters and popularity, in one
+        transaction.
+        
+        Args:
+            views: {product ID: views to add}
         """
         pass
     
@@ -97,7 +346,7 @@ class ProductRepository(ABC):
             product_id: Product ID to delete
         
         Raises:
-            ProductNotFoundError: If product doesn't exist
+            ProductNotFoundError: If no active product has this ID
         """
         pass
     
@@ -113,4 +362,40 @@ class ProductRepository(ABC):
             Total count of matching products
         """
         pass
-
+    
+    @abstractmethod
+    async def estimate_count(self, filters: Optional[dict] = None) -> Optional[int]:
+        """
+        Estimate products matching filters from database statistics.
+        
+        Much cheaper than count() on large tables, but approximate.
+        
+        Args:
+            filters: Same as list() method
+        
+        Returns:
+            Estimated count, or None if no estimate is available for
+            these filters (callers should fall back to count())
+        """
+        pass
+    
+    @abstractmethod
+    async def facets(self, filters: Optional[dict], price_edges: Sequence[Decimal]) -> Dict[str, Any]:
+        """
+        Aggregate matching products for filter sidebars.
+        
+        Category counts ignore the category filter (so every category can
+        be offered); the other facets apply all filters.
+        
+        Args:
+            filters: Same as list() method
+            price_edges: Ascending price bucket boundaries; bucket i holds
+                prices in [edge i-1, edge i), the last one prices >= the
+                last edge
+        
+        Returns:
+            {"total": int, "in_stock": int,
+             "categories": {category: count},
+             "price_buckets": [count per bucket] (len(price_edges) + 1)}
+        """
+        pass
@@ -8,8 +8,13 @@ from dataclasses import dataclass
 class Stock:
     """
     Stock value object - immutable inventory quantity
+    
+    `value` is the quantity available for purchase. Units held by time-limited
+    cart reservations are already deducted from it and counted in `held`
+    until the hold is confirmed (sold) or released.
     """
     value: int
+    held: int = 0
     
     def __post_init__(self):
         """Validate stock on creation"""
@@ -17,9 +22,16 @@ class Stock:
             raise ValueError("Stock cannot be negative")
         if self.value > 999999:
             raise ValueError("Stock exceeds maximum allowed value")
+        if self.held < 0:
+            raise ValueError("Held stock cannot be negative")
+    
+    @property
+    def on_hand(self) -> int:
+        """Units in stock, available or held"""
+        return self.value + self.held
     
     def is_available(self) -> bool:
-        """Check if stock is available"""
+        """Check if stock is available (held units are not)"""
         return self.value > 0
     
     def is_low_stock(self, threshold: int = 10) -> bool:
@@ -34,7 +46,7 @@ class Stock:
         """Add to stock"""
         if other < 0:
             raise ValueError("Cannot add negative value to stock")
-        return Stock(self.value + other)
+        return Stock(self.value + other, self.held)
     
     def __sub__(self, other: int) -> 'Stock':
         """Subtract from stock"""
@@ -43,7 +55,7 @@ class Stock:
         result = self.value - other
         if result < 0:
             raise ValueError("Stock cannot become negative")
-        return Stock(result)
+        return Stock(result, self.held)
     
     def __lt__(self, other: 'Stock') -> bool:
         """Less than comparison"""
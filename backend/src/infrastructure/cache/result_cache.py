@@ -0,0 +1,132 @@
+"""
+In-process cache for query results (counts, aggregates)
+"""
+import time
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Any, Dict, Hashable, Optional, Tuple
+from infrastructure.config.settings import get_settings
+
+
+def normalize_filters(filters: Optional[dict]) -> Tuple:
+    """
+    Build a hashable cache key from a repository filter dict.
+    
+    Unset filters are dropped and Decimals are normalized, so equivalent
+    filter dicts (e.g. min_price 10 vs 10.00) share one entry.
+    """
+    if not filters:
+        return ()
+    items = []
+    for name, value in filters.items():
+        if value is None:
+            continue
+        if isinstance(value, Decimal):
+            value = value.normalize()
+        items.append((name, value))
+    return tuple(sorted(items))
+
+
+class ResultCache:
+    """
+    Bounded LRU cache with per-entry TTL and write invalidation.
+    
+    Writers call invalidate(), which clears every entry and bumps
+    `generation`. Writes that only affect some results call
+    invalidate(scope), which clears the tuple keys starting with `scope`
+    and bumps that scope's generation alone. Readers capture
+    generation_for(key) before running their query and pass it to put(),
+    so a result computed before a write that affects it is never stored
+    after it.
+    
+    The cache is per process: with several workers, writes handled by
+    another worker are only observed once the TTL expires.
+    """
+    
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        """
+        Initialize cache.
+        
+        Args:
+            ttl_seconds: Entry lifetime in seconds (0 disables caching)
+            max_entries: Maximum number of entries kept (least recently used evicted)
+        """
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.generation = 0
+        self._scope_generations: Dict[Hashable, int] = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+    
+    @staticmethod
+    def _scope(key: Hashable) -> Optional[Hashable]:
+        """Scope of a key: the first item of a tuple key"""
+        return key[0] if isinstance(key, tuple) and key else None
+    
+    def generation_for(self, key: Hashable) -> Tuple[int, int]:
+        """Generation to capture before computing the value of `key` (see put())"""
+        return self.generation, self._scope_generations.get(self._scope(key), 0)
+    
+    def put(self, key: Hashable, value: Any, generation: Optional[Tuple[int, int]] = None) -> None:
+        """
+        Store value for key.
+        
+        Args:
+            key: Cache key
+            value: Value to store
+            generation: generation_for(key) observed before computing value;
+                the value is discarded if an invalidation covering key
+                happened since
+        """
+        if self._ttl <= 0:
+            return
+        if generation is not None and generation != self.generation_for(key):
+            return
+        self._entries[key] = (time.monotonic() + self._ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+    
+    def invalidate(self, scope: Optional[Hashable] = None) -> None:
+        """Drop all entries, or those of one scope (called after writes)"""
+        if scope is None:
+            self._entries.clear()
+            self.generation += 1
+            return
+        for key in [key for key in self._entries if self._scope(key) == scope]:
+            del self._entries[key]
+        self._scope_generations[scope] = self._scope_generations.get(scope, 0) + 1
+
+
+# Singleton instance
+_count_cache_instance: Optional[ResultCache] = None
+
+
+def get_count_cache() -> ResultCache:
+    """
+    Get singleton cache for product listing totals.
+    
+    Returns:
+        ResultCache instance configured from settings
+    """
+    global _count_cache_instance
+    if _count_cache_instance is None:
+        settings = get_settings()
+        _count_cache_instance = ResultCache(
+            ttl_seconds=settings.COUNT_CACHE_TTL_SECONDS,
+            max_entries=settings.COUNT_CACHE_MAX_ENTRIES
+        )
+    return _count_cache_instance
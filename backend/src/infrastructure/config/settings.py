@@ -22,6 +22,72 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite:///./ecommerce.db"
+    DATABASE_READ_URLS: str = ""  # Comma-separated read replicas for product reads (empty = primary only)
+    READ_YOUR_WRITES_SECONDS: float = 5  # Reads stay on the primary this long after a client writes
+    
+    # Connection pool (server databases; per worker process)
+    DB_POOL_SIZE: int = 5  # Connections kept open
+    DB_MAX_OVERFLOW: int = 10  # Extra connections opened under load, closed when returned
+    DB_POOL_TIMEOUT: float = 30  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # Reopen connections older than this (seconds; -1 disables)
+    DB_POOL_VALIDATION_INTERVAL_SECONDS: float = 30  # Background idle checks; 0 pings every checkout
+    
+    # SQLite engine profile (applied to every pooled connection)
+    SQLITE_JOURNAL_MODE: str = "WAL"  # WAL lets readers run alongside the writer
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # Safe with WAL; FULL fsyncs every commit
+    SQLITE_MMAP_SIZE: int = 268435456  # Bytes of the file read through mmap (256 MiB)
+    SQLITE_CACHE_SIZE: int = -65536  # Page cache; negative = KiB (64 MiB)
+    SQLITE_TEMP_STORE: str = "MEMORY"  # Temp tables and sort spills
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # Wait for locks instead of failing
+    SQLITE_POOL_SIZE: int = 8  # Connections kept open (one reader/writer each)
+    SQLITE_MAX_OVERFLOW: int = 8
+    
+    # Slow query log (statements at or above the threshold, with EXPLAIN plans)
+    SLOW_QUERY_THRESHOLD_MS: float = 200  # 0 disables the log
+    SLOW_QUERY_LOG_PER_MINUTE: int = 30  # Entries per minute; the rest are counted
+    SLOW_QUERY_EXPLAIN: bool = True  # Capture a plan once per distinct slow SELECT
+    SLOW_QUERY_EXPLAIN_ANALYZE: bool = False  # PostgreSQL: EXPLAIN ANALYZE (runs the query again)
+    
+    # Per-request query budget (QueryBudgetMiddleware)
+    QUERY_BUDGET_DEFAULT: int = 0  # Statements per request for routes without their own budget; 0 = none
+    QUERY_BUDGET_MODE: str = "log"  # log, or raise to fail the request (use in tests)
+    QUERY_REPEAT_THRESHOLD: int = 5  # Identical statements per request reported as likely N+1
+    
+    # Prebuilt repository statements, one per query shape (per process)
+    STATEMENT_CACHE_MAX_ENTRIES: int = 512  # 0 rebuilds every statement
+    
+    # Listing totals cache (per process, invalidated by repository writes)
+    COUNT_CACHE_TTL_SECONDS: int = 30  # 0 disables the cache
+    COUNT_CACHE_MAX_ENTRIES: int = 1024
+    
+    # Facet sidebar (GET /products/facets), cached with the listing totals
+    FACET_PRICE_EDGES: str = "25,50,100,250,500,1000"  # Price histogram bucket boundaries, ascending
+    
+    # Fuzzy (trigram) product name search
+    FUZZY_SEARCH_THRESHOLD: float = 0.3  # Minimum similarity, 0-1
+    FUZZY_SEARCH_MAX_CANDIDATES: int = 1000
+    TRIGRAM_INDEX_REFRESH_SECONDS: int = 300  # SQLite in-process index reload interval
+    
+    # Bulk product creation
+    BULK_CREATE_MAX_ITEMS: int = 100000  # Per request
+    BULK_INSERT_CHUNK_SIZE: int = 1000  # Rows per INSERT ... RETURNING
+    
+    # Checkout (all-or-nothing stock decrement of a basket)
+    CHECKOUT_MAX_LINES: int = 100  # Distinct products per basket
+    STOCK_MAX_SHARDS: int = 64  # Stock sub-counters per hot product (sharded stock mode)
+    
+    # Stock holds (cart reservations released when they expire)
+    STOCK_HOLD_TTL_SECONDS: int = 900  # Default hold lifetime
+    STOCK_HOLD_MAX_TTL_SECONDS: int = 3600  # Longest lifetime a client may ask for
+    HOLD_SWEEP_INTERVAL_SECONDS: float = 1  # How often due holds are released
+    HOLD_SWEEP_BATCH_SIZE: int = 500  # Holds released per batched UPDATE
+    HOLD_SWEEP_CATCHUP_SECONDS: float = 60  # Scan for expired holds this process did not place; 0 disables
+    
+    # Product view counter (buffered increments behind sort=popularity)
+    VIEW_COUNTER_FLUSH_SECONDS: float = 10  # How often buffered views are written to the database
+    VIEW_COUNTER_FLUSH_THRESHOLD: int = 1000  # Flush early once this many products have buffered views
+    VIEW_COUNTER_JOURNAL_SECONDS: float = 1  # How often buffered views are journaled (most a crash can lose)
+    VIEW_COUNTER_JOURNAL_DIR: str = "./data/view_counts"  # Local journal directory; empty disables journaling
     
     # API
     API_TITLE: str = "E-commerce API"
@@ -0,0 +1,61 @@
+"""
+DataLoader-style batching of key lookups
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, List, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class BatchLoader(Generic[K, V]):
+    """
+    Coalesce concurrent single-key lookups into one batch call.
+    
+    Keys requested with load() during the same event-loop iteration are
+    collected and resolved together by one `batch_fn` call, scheduled with
+    loop.call_soon() when the first key arrives. Duplicate keys share one
+    result. A lone load() still costs exactly one batch_fn call.
+    """
+    
+    def __init__(self, batch_fn: Callable[[List[K]], Awaitable[Dict[K, V]]]):
+        """
+        Initialize loader.
+        
+        Args:
+            batch_fn: Resolves a list of keys to {key: value}; keys
+                missing from the result resolve to None
+        """
+        self._batch_fn = batch_fn
+        self._pending: Dict[K, asyncio.Future] = {}
+        self.batches = 0
+    
+    async def load(self, key: K) -> Optional[V]:
+        """Resolve one key, batched with other loads of this iteration"""
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            if not self._pending:
+                loop.call_soon(self._dispatch)
+            future = loop.create_future()
+            self._pending[key] = future
+        return await future
+    
+    def _dispatch(self) -> None:
+        """Hand the collected keys to a batch task"""
+        batch, self._pending = self._pending, {}
+        self.batches += 1
+        asyncio.ensure_future(self._resolve(batch))
+    
+    async def _resolve(self, batch: Dict[K, asyncio.Future]) -> None:
+        """Run batch_fn and settle every waiting future"""
+        try:
+            results = await self._batch_fn(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(results.get(key))
@@ -0,0 +1,182 @@
+"""
+Background release of expired stock holds
+"""
+import asyncio
+import heapq
+import logging
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from infrastructure.cache.result_cache import get_count_cache
+from infrastructure.config.settings import get_settings
+from infrastructure.database.sqlalchemy.repositories.product_repository_impl import ProductRepositoryImpl
+from infrastructure.database.sqlalchemy.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class HoldSweeper:
+    """
+    Release expired stock holds in batches, off the request path.
+    
+    Holds placed by this process are pushed on an in-memory heap keyed by
+    expiry (track(), O(log n) per hold), so each pass pops exactly the due
+    holds without touching the database when none are due, and releases
+    them `batch_size` at a time with ProductRepositoryImpl.release_holds()
+    (a fixed number of statements per batch). Confirmed or cancelled holds
+    are left on the heap and skipped at release time.
+    
+    Holds the heap does not know about (placed by another worker, before a
+    restart, or in a batch whose release failed) are found every
+    `catchup_seconds` by a query on the expires_at index.
+    """
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        interval_seconds: float,
+        batch_size: int,
+        catchup_seconds: float
+    ):
+        """
+        Initialize sweeper.
+        
+        Args:
+            session_factory: Creates sessions on the primary database
+            interval_seconds: Seconds between passes
+            batch_size: Holds released per transaction
+            catchup_seconds: Seconds between database scans for expired
+                holds (0 disables them)
+        """
+        self._session_factory = session_factory
+        self._interval = interval_seconds
+        self._batch_size = batch_size
+        self._catchup_seconds = catchup_seconds
+        self._heap: List[Tuple[datetime, int]] = []
+        self._next_catchup = 0.0  # First pass catches up
+        self._task: Optional[asyncio.Task] = None
+        self.released = 0
+        self.batches = 0
+    
+    def __len__(self) -> int:
+        """Number of tracked holds (including already confirmed ones)"""
+        return len(self._heap)
+    
+    def track(self, hold_id: int, expires_at: datetime) -> None:
+        """Schedule the release of a committed hold"""
+        heapq.heappush(self._heap, (expires_at, hold_id))
+    
+    def due(self, now: datetime, limit: int) -> List[int]:
+        """Pop up to `limit` tracked holds that expired at `now`, oldest first"""
+        hold_ids = []
+        while self._heap and len(hold_ids) < limit and self._heap[0][0] <= now:
+            hold_ids.append(heapq.heappop(self._heap)[1])
+        return hold_ids
+    
+    def start(self) -> None:
+        """Start the background task on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Cancel the background task and wait for it to finish"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+    
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("Stock hold sweep failed")
+            await asyncio.sleep(self._interval)
+    
+    async def _release(self, hold_ids: List[int]) -> int:
+        """Release one batch in its own transaction"""
+        async with self._session_factory() as session:
+            released = await ProductRepositoryImpl(session, count_cache=get_count_cache()).release_holds(hold_ids)
+        self.batches += 1
+        self.released += released
+        return released
+    
+    async def sweep(self, now: Optional[datetime] = None) -> int:
+        """
+        Run one pass: release the due tracked holds, then catch up with
+        the database if it is time to.
+        
+        Returns:
+            Number of holds released
+        """
+        now = now or datetime.now()
+        released = 0
+        while True:
+            hold_ids = self.due(now, self._batch_size)
+            if not hold_ids:
+                break
+            released += await self._release(hold_ids)
+        if self._catchup_seconds > 0 and time.monotonic() >= self._next_catchup:
+            released += await self.catch_up(now)
+            self._next_catchup = time.monotonic() + self._catchup_seconds
+        return released
+    
+    async def catch_up(self, now: datetime) -> int:
+        """
+        Release every hold that expired at `now`, found in the database.
+        
+        Returns:
+            Number of holds released
+        """
+        released = 0
+        while True:
+            async with self._session_factory() as session:
+                repository = ProductRepositoryImpl(session)
+                hold_ids = await repository.expired_hold_ids(now, self._batch_size)
+            if not hold_ids:
+                break
+            released += await self._release(hold_ids)
+            if len(hold_ids) < self._batch_size:
+                break
+        if released:
+            logger.info("Released %d expired stock hold(s) found in the database", released)
+        return released
+    
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring"""
+        return {
+            "tracked": len(self._heap),
+            "next_expiry": self._heap[0][0].isoformat() if self._heap else None,
+            "released": self.released,
+            "batches": self.batches,
+        }
+
+
+# Singleton instance (one heap per process)
+_hold_sweeper_instance: Optional[HoldSweeper] = None
+
+
+def get_hold_sweeper() -> HoldSweeper:
+    """
+    Get singleton hold sweeper for this process.
+    
+    Returns:
+        HoldSweeper instance configured from settings, on the primary database
+    """
+    global _hold_sweeper_instance
+    if _hold_sweeper_instance is None:
+        settings = get_settings()
+        _hold_sweeper_instance = HoldSweeper(
+            AsyncSessionLocal,
+            interval_seconds=settings.HOLD_SWEEP_INTERVAL_SECONDS,
+            batch_size=settings.HOLD_SWEEP_BATCH_SIZE,
+            catchup_seconds=settings.HOLD_SWEEP_CATCHUP_SECONDS
+        )
+    return _hold_sweeper_instance
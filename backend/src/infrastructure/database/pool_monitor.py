@@ -0,0 +1,190 @@
+"""
+Connection pool instrumentation and background validation
+"""
+import asyncio
+import bisect
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the checkout wait histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolStats:
+    """
+    Checkout wait times and outcomes for one pool.
+    
+    Counts are cumulative for the life of the process; the gauges
+    (checked out, overflow, ...) are read live from the pool.
+    """
+    
+    def __init__(self):
+        """Initialize empty counters"""
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.validations = 0
+        self.invalidated = 0
+    
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        """Record one checkout attempt that waited `seconds`"""
+        if timed_out:
+            self.timeouts += 1
+        else:
+            self.checkouts += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+        self.wait_buckets[bisect.bisect_left(WAIT_BUCKETS_MS, seconds * 1000)] += 1
+    
+    def histogram(self) -> Dict[str, int]:
+        """Wait time histogram as {"<=1ms": n, ..., ">5000ms": n}"""
+        labels = [f"<={bound}ms" for bound in WAIT_BUCKETS_MS] + [f">{WAIT_BUCKETS_MS[-1]}ms"]
+        return dict(zip(labels, self.wait_buckets))
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that times every checkout into a PoolStats.
+    
+    _do_get() is where the pool waits for a free connection (or opens an
+    overflow one), so its duration is the time a request spent queued for
+    the database. The stats survive engine.dispose(), which recreates the
+    pool.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+    
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        self.stats.record_wait(time.perf_counter() - started)
+        return connection
+    
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+def pool_stats(engine: AsyncEngine) -> Dict[str, Any]:
+    """
+    Snapshot of an engine's pool for monitoring.
+    
+    Gauges are only reported for queue pools; checkout statistics only
+    for InstrumentedQueuePool.
+    """
+    pool = engine.pool
+    snapshot: Dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        snapshot.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+            timeout_seconds=pool.timeout(),
+        )
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        attempts = stats.checkouts + stats.timeouts
+        snapshot.update(
+            checkouts=stats.checkouts,
+            timeouts=stats.timeouts,
+            wait_ms_avg=round(stats.wait_seconds_total * 1000 / attempts, 3) if attempts else 0.0,
+            wait_ms_max=round(stats.wait_seconds_max * 1000, 3),
+            wait_ms_histogram=stats.histogram(),
+            validations=stats.validations,
+            invalidated=stats.invalidated,
+        )
+    return snapshot
+
+
+class PoolValidator:
+    """
+    Periodically validate idle pooled connections off the request path.
+    
+    Replaces pool_pre_ping, which costs a round trip on every checkout.
+    Each pass checks out the connections idle at that moment one at a time
+    (the queue pool hands them out oldest first) and runs SELECT 1 on each;
+    a broken connection raises a disconnect error, on which SQLAlchemy
+    invalidates it and every connection opened before it, so requests
+    after a database restart or failover get fresh connections.
+    """
+    
+    def __init__(self, engine: AsyncEngine, interval_seconds: float):
+        """
+        Initialize validator.
+        
+        Args:
+            engine: Engine whose pool is validated
+            interval_seconds: Seconds between passes
+        """
+        self._engine = engine
+        self._interval = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self) -> None:
+        """Start the background task on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Cancel the background task and wait for it to finish"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+    
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self.validate()
+            except Exception:
+                logger.exception("Connection pool validation failed")
+    
+    async def validate(self) -> int:
+        """
+        Run one validation pass over the idle connections.
+        
+        Returns:
+            Number of connections found broken
+        """
+        pool = self._engine.pool
+        stats = getattr(pool, "stats", None)
+        idle = pool.checkedin() if isinstance(pool, AsyncAdaptedQueuePool) else 1
+        broken = 0
+        for _ in range(idle):
+            try:
+                async with self._engine.connect() as conn:
+                    await conn.exec_driver_sql("SELECT 1")
+            except exc.DBAPIError as e:
+                if not e.connection_invalidated:
+                    raise
+                broken += 1
+            if stats is not None:
+                stats.validations += 1
+        if stats is not None:
+            stats.invalidated += broken
+        if broken:
+            logger.warning("Replaced %d broken pooled connection(s)", broken)
+        return broken
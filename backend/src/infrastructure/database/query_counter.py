@@ -0,0 +1,87 @@
+"""
+Per-request SQL statement counting
+"""
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_current_stats: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+
+class QueryStats:
+    """
+    Statements executed, and time spent in them, within one unit of work
+    (an HTTP request).
+    
+    Statements are grouped by SQL text, i.e. by shape: the same query with
+    different bind values counts as one shape, so a shape executed many
+    times in one request is a likely N+1 loop.
+    """
+    
+    def __init__(self, budget: Optional[int] = None):
+        """
+        Initialize counters.
+        
+        Args:
+            budget: Statements allowed (None for no budget)
+        """
+        self.budget = budget
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter = Counter()
+    
+    def record(self, statement: str, seconds: float) -> None:
+        """Record one executed statement"""
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[statement] += 1
+    
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes executed at least `threshold` times, most frequent first"""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+    
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.count > self.budget
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Stats of the unit of work in progress, if any is tracked"""
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries(budget: Optional[int] = None) -> Iterator[QueryStats]:
+    """Count the statements executed in this context (and tasks it starts)"""
+    stats = QueryStats(budget)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def install_query_counter(engine: Engine) -> None:
+    """
+    Record every statement run on a (sync) engine into the current
+    QueryStats. Statements outside track_queries() only cost the lookup.
+    
+    SQLAlchemy runs async engine statements in a greenlet that shares the
+    awaiting task's context, so the stats set by the request are visible.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current_stats.get() is not None:
+            conn.info.setdefault("query_counter_started", []).append(time.perf_counter())
+    
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _current_stats.get()
+        if stats is not None:
+            started = conn.info["query_counter_started"].pop()
+            stats.record(statement, time.perf_counter() - started)
@@ -0,0 +1,242 @@
+"""
+Slow query log with EXPLAIN plan capture
+"""
+import logging
+import re
+import sys
+import threading
+import time
+from typing import Any, List, Optional, Sequence, Set
+
+import greenlet
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from infrastructure.config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Modules whose methods are reported as the caller of a slow statement
+CALLER_MODULE_PREFIX = "infrastructure.database.sqlalchemy.repositories"
+
+# Statements that can be re-run under EXPLAIN without side effects
+_READ_STATEMENT = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+MAX_STATEMENT_LENGTH = 2000
+
+
+def parameter_shape(
+    parameters: Any,
+    executemany: bool = False,
+    names: Optional[Sequence[str]] = None
+) -> Any:
+    """
+    Describe bound parameters by type only ({"name": "str"}, ["int", ...]),
+    so values (search terms, emails, ...) never reach the log.
+    
+    Args:
+        parameters: Parameters as passed to the DBAPI cursor
+        executemany: True if `parameters` is a list of parameter sets
+        names: Bind names of positional parameters, if known
+    """
+    if executemany:
+        rows = list(parameters or [])
+        return {"rows": len(rows), "shape": parameter_shape(rows[0], names=names) if rows else None}
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if names is not None and len(names) == len(parameters):
+            return {name: type(value).__name__ for name, value in zip(names, parameters)}
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def calling_method() -> Optional[str]:
+    """
+    Innermost repository method on the call stack, e.g.
+    "ProductRepositoryImpl.list".
+    
+    Under the async engine the statement runs in a greenlet whose own stack
+    starts at the sync Connection.execute; the awaiting coroutines (the
+    repository method among them) are on the parent greenlet's stack.
+    """
+    current = greenlet.getcurrent()
+    frame = sys._getframe(1)
+    while True:
+        while frame is not None:
+            if frame.f_globals.get("__name__", "").startswith(CALLER_MODULE_PREFIX):
+                code = frame.f_code
+                return getattr(code, "co_qualname", code.co_name)
+            frame = frame.f_back
+        current = current.parent
+        if current is None:
+            return None
+        frame = current.gr_frame
+
+
+def _positional_names(context) -> Optional[Sequence[str]]:
+    """Bind names of a compiled statement's positional parameters"""
+    compiled = getattr(context, "compiled", None)
+    return getattr(compiled, "positiontup", None)
+
+
+class SlowQueryLog:
+    """
+    Log statements slower than a threshold, timed by cursor events.
+    
+    Each entry carries the elapsed time, the statement, the shape (not the
+    values) of its parameters and the repository method that issued it.
+    The first time a distinct read statement is slow, its plan is captured
+    on the same connection: EXPLAIN QUERY PLAN on SQLite, EXPLAIN (or
+    EXPLAIN ANALYZE, which runs the query again) on PostgreSQL.
+    
+    Entries are rate limited to `max_per_minute`; the number of suppressed
+    entries is reported with the next one logged. One instance can serve
+    several engines.
+    """
+    
+    def __init__(
+        self,
+        threshold_ms: float,
+        max_per_minute: int,
+        explain: bool = True,
+        explain_analyze: bool = False,
+        max_explained: int = 1000
+    ):
+        """
+        Initialize log.
+        
+        Args:
+            threshold_ms: Statements taking at least this long are logged
+            max_per_minute: Maximum entries logged per minute
+            explain: Capture a plan once per distinct slow read statement
+            explain_analyze: Use EXPLAIN ANALYZE on PostgreSQL
+            max_explained: Distinct statements remembered as explained
+        """
+        self._threshold = threshold_ms / 1000
+        self._max_per_minute = max_per_minute
+        self._explain = explain
+        self._explain_analyze = explain_analyze
+        self._max_explained = max_explained
+        self._explained: Set[str] = set()
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self._lock = threading.Lock()
+        self.slow = 0
+        self.suppressed = 0
+    
+    def install(self, engine: Engine) -> None:
+        """Time every statement run on a (sync) engine"""
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+    
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+    
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        if elapsed < self._threshold:
+            return
+        self.slow += 1
+        suppressed = self._acquire()
+        if suppressed is None:
+            return
+        
+        plan = None
+        if self._explain and not executemany and _READ_STATEMENT.match(statement):
+            plan = self._plan(conn, statement, parameters)
+        logger.warning(
+            "Slow query %.1f ms in %s: %s | params: %s%s%s",
+            elapsed * 1000,
+            calling_method() or "unknown caller",
+            _WHITESPACE.sub(" ", statement)[:MAX_STATEMENT_LENGTH],
+            parameter_shape(parameters, executemany, _positional_names(context)),
+            "".join(f"\n    plan: {line}" for line in plan or []),
+            f" ({suppressed} slow queries not logged)" if suppressed else "",
+        )
+    
+    def _acquire(self) -> Optional[int]:
+        """
+        Take a slot in the current one-minute window.
+        
+        Returns:
+            Entries suppressed since the last one logged, or None if this
+            entry is to be suppressed too
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= 60:
+                self._window_start, self._window_count = now, 0
+            if self._window_count >= self._max_per_minute:
+                self.suppressed += 1
+                return None
+            self._window_count += 1
+            suppressed, self.suppressed = self.suppressed, 0
+            return suppressed
+    
+    def _plan(self, conn, statement: str, parameters: Any) -> Optional[List[str]]:
+        """Plan of a statement, captured only the first time it is slow"""
+        with self._lock:
+            if statement in self._explained or len(self._explained) >= self._max_explained:
+                return None
+            self._explained.add(statement)
+        
+        dialect = conn.dialect.name
+        if dialect == "sqlite":
+            prefix = "EXPLAIN QUERY PLAN "
+        elif dialect == "postgresql":
+            prefix = "EXPLAIN ANALYZE " if self._explain_analyze else "EXPLAIN "
+        else:
+            return None
+        
+        # Raw DBAPI cursor on the same connection: no events, same transaction.
+        # On PostgreSQL a failed statement aborts the transaction, so the
+        # EXPLAIN runs inside a savepoint.
+        savepoint = dialect == "postgresql"
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            if savepoint:
+                cursor.execute("SAVEPOINT slow_query_explain")
+            cursor.execute(prefix + statement, parameters)
+            rows = cursor.fetchall()
+            if savepoint:
+                cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        except Exception as e:
+            if savepoint:
+                try:
+                    cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+                except Exception:
+                    pass
+            return [f"EXPLAIN failed: {e}"]
+        finally:
+            cursor.close()
+        if dialect == "sqlite":
+            # (id, parent, notused, detail)
+            return [row[-1] for row in rows]
+        return [row[0] for row in rows]
+
+
+# Singleton instance
+_slow_query_log_instance: Optional[SlowQueryLog] = None
+
+
+def get_slow_query_log() -> Optional[SlowQueryLog]:
+    """
+    Get singleton slow query log.
+    
+    Returns:
+        SlowQueryLog configured from settings, or None if disabled
+    """
+    global _slow_query_log_instance
+    settings = get_settings()
+    if settings.SLOW_QUERY_THRESHOLD_MS <= 0:
+        return None
+    if _slow_query_log_instance is None:
+        _slow_query_log_instance = SlowQueryLog(
+            threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+            max_per_minute=settings.SLOW_QUERY_LOG_PER_MINUTE,
+            explain=settings.SLOW_QUERY_EXPLAIN,
+            explain_analyze=settings.SLOW_QUERY_EXPLAIN_ANALYZE
+        )
+    return _slow_query_log_instance
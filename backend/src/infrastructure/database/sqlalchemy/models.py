@@ -1,38 +1,118 @@
 """
 SQLAlchemy ORM models for database persistence
 """
-from sqlalchemy import Column, Integer, String, Float, Boolean, Text, DateTime, Index
+from sqlalchemy import Column, Integer, String, Boolean, Text, DateTime, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 from datetime import datetime
+from decimal import Decimal, ROUND_CEILING, ROUND_FLOOR, ROUND_HALF_UP
 
 Base = declarative_base()
 
+# Prices are stored as integer minor units (cents)
+PRICE_DECIMALS = 2
+_MINOR_UNIT = Decimal(1).scaleb(-PRICE_DECIMALS)  # Decimal("0.01")
+
+
+def to_minor_units(amount: Decimal, rounding: str = ROUND_HALF_UP) -> int:
+    """Convert a money amount to integer minor units (19.99 -> 1999)"""
+    return int(amount.scaleb(PRICE_DECIMALS).to_integral_value(rounding))
+
+
+def from_minor_units(minor_units: int) -> Decimal:
+    """Convert integer minor units to an exact money amount (1999 -> 19.99)"""
+    # Multiplying by 0.01 is exact and cheaper than scaleb() or str parsing
+    return Decimal(minor_units) * _MINOR_UNIT
+
+
+def min_price_bound(amount: Decimal) -> int:
+    """Smallest stored price >= amount, for exact range filters"""
+    return to_minor_units(amount, ROUND_CEILING)
+
+
+def max_price_bound(amount: Decimal) -> int:
+    """Largest stored price <= amount, for exact range filters"""
+    return to_minor_units(amount, ROUND_FLOOR)
+
 
 class ProductModel(Base):
     """
     SQLAlchemy model for products table.
     
     This is the database representation of the Product entity.
-    Note: Uses Float for price (will be converted to Decimal in domain layer)
+    Note: Price is stored as integer cents (converted to Decimal in domain layer)
     """
     __tablename__ = "products"
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False, index=True)
-    price = Column(Float, nullable=False, index=True)
-    stock = Column(Integer, nullable=False, default=0)
+    price_cents = Column(Integer, nullable=False, index=True)
+    stock = Column(Integer, nullable=False, default=0)  # 0 when sharded: the stock is in the shards
+    stock_shards = Column(Integer, nullable=False, default=0, server_default="0")  # 0 = not sharded
+    held_stock = Column(Integer, nullable=False, default=0, server_default="0")  # Units in live StockHoldModel rows
     category = Column(String(100), nullable=False, index=True)
     description = Column(Text, nullable=True)
     is_active = Column(Boolean, default=True, nullable=False, index=True)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # Bumped by every write
+    popularity = Column(Integer, nullable=False, default=0, server_default="0")  # Copy of ProductCounterModel.views
     
     # Indexes for better query performance
     __table_args__ = (
         Index('idx_products_category', 'category'),
-        Index('idx_products_price', 'price'),
+        Index('idx_products_price', 'price_cents'),
         Index('idx_products_active', 'is_active'),
         Index('idx_products_category_active', 'category', 'is_active'),
+        # Composite indexes matching keyset pagination seeks: (sort_key, id)
+        Index('idx_products_active_price_id', 'is_active', 'price_cents', 'id'),
+        Index('idx_products_active_name_id', 'is_active', 'name', 'id'),
+        Index('idx_products_active_popularity_id', 'is_active', 'popularity', 'id'),
+        # Covering index for grid listings (fields=id,name,price in id order):
+        # answered from the index without touching description-heavy rows
+        Index('idx_products_active_id_grid', 'is_active', 'id', 'name', 'price_cents'),
     )
 
+
+class ProductStockShardModel(Base):
+    """
+    One sub-counter of a sharded product's stock (see ProductModel.stock_shards).
+    
+    A hot product's stock is split across `stock_shards` rows so that
+    concurrent decrements lock different rows; its stock is their sum.
+    """
+    __tablename__ = "product_stock_shards"
+    
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    stock = Column(Integer, nullable=False, default=0)
+
+
+class StockHoldModel(Base):
+    """
+    A time-limited reservation of product stock.
+    
+    Its units were moved from ProductModel.stock (or a shard) to
+    ProductModel.held_stock when the hold was placed; the row is deleted
+    when the hold is confirmed, released or expires.
+    """
+    __tablename__ = "stock_holds"
+    
+    id = Column(Integer, primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
+    quantity = Column(Integer, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)  # Expiry sweeps seek on this
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+
+class ProductCounterModel(Base):
+    """
+    Counted events of a product (page views), kept apart from the product
+    row and written only by batched upserts of buffered increments (see
+    infrastructure.database.view_counter).
+    """
+    __tablename__ = "product_counters"
+    
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    views = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
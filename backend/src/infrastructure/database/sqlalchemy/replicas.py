@@ -0,0 +1,50 @@
+"""
+Read replica routing
+"""
+import itertools
+from typing import List, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+
+def parse_read_urls(value: str) -> List[str]:
+    """Split a comma-separated DATABASE_READ_URLS value, dropping blanks"""
+    return [url.strip() for url in value.split(",") if url.strip()]
+
+
+class ReadReplicas:
+    """
+    Sessions on read replica engines, handed out in round-robin.
+    
+    Replicas lag behind the primary, so only reads that tolerate slightly
+    stale data should use them; see ProductRepositoryImpl(read_session=...)
+    and the read-your-writes window applied by the API dependencies.
+    """
+    
+    def __init__(self, engines: Sequence[AsyncEngine]):
+        """
+        Initialize replica set.
+        
+        Args:
+            engines: One engine per replica (may be empty)
+        """
+        self.engines = list(engines)
+        self._factories = [
+            async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+            for engine in self.engines
+        ]
+        self._rotation = itertools.cycle(self._factories)
+    
+    def __len__(self) -> int:
+        return len(self.engines)
+    
+    def session(self) -> AsyncSession:
+        """New session on the next replica in turn"""
+        if not self._factories:
+            raise RuntimeError("No read replicas configured")
+        return next(self._rotation)()
+    
+    async def dispose(self) -> None:
+        """Close the pooled connections of every replica"""
+        for engine in self.engines:
+            await engine.dispose()
@@ -1,17 +1,113 @@
 """
 SQLAlchemy implementation of ProductRepository
 """
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from decimal import Decimal
+import json
+import random
+from dataclasses import replace
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from sqlalchemy import (
+    Integer,
+    String,
+    and_,
+    bindparam,
+    case,
+    delete,
+    exists,
+    false,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    text,
+    tuple_,
+    update,
+)
+from decimal import Decimal, InvalidOperation
 from datetime import datetime
 
 from domain.entities.product import Product
-from domain.repositories.product_repository import ProductRepository
+from domain.entities.stock_hold import StockHold
+from domain.exceptions.product_exceptions import (
+    InsufficientStock,
+    ProductNotFoundError,
+    ProductVersionConflict,
+    StockHoldNotFoundError,
+    StockUnavailable,
+)
+from domain.repositories.product_repository import ProductRepository, ProductRow
 from domain.value_objects.price import Price
 from domain.value_objects.stock import Stock
-from infrastructure.database.sqlalchemy.models import ProductModel
+from infrastructure.cache.result_cache import ResultCache, normalize_filters
+from infrastructure.config.settings import get_settings
+from infrastructure.database.batch_loader import BatchLoader
+from infrastructure.database.statement_cache import StatementCache
+from infrastructure.database.sqlalchemy.models import (
+    ProductCounterModel,
+    ProductModel,
+    ProductStockShardModel,
+    StockHoldModel,
+    from_minor_units,
+    max_price_bound,
+    min_price_bound,
+    to_minor_units,
+)
+from infrastructure.database.sqlalchemy.search import (
+    add_search_entries,
+    apply_fuzzy_search,
+    apply_search,
+    fuzzy_rank,
+    join_search_rank,
+    search_query,
+    search_rank,
+    set_fuzzy_threshold,
+    sync_search_entry,
+)
+from infrastructure.search.trigram_index import TrigramIndex
+
+# Sortable fields for list() and their columns; each is paired with the id
+# column as tie-breaker
+SORT_FIELDS = {"id": "id", "price": "price_cents", "name": "name", "popularity": "popularity"}
+
+# Fields update_fields() can change; changes to the searchable ones
+# are mirrored into the search indexes
+UPDATABLE_FIELDS = ("name", "price", "stock", "category", "description", "is_active")
+SEARCHABLE_FIELDS = {"name", "description", "is_active"}
+
+# Core table for the read-only projection path (no ORM entities)
+PRODUCTS = ProductModel.__table__
+
+# Product fields that list(fields=...) can project, and their columns
+FIELD_COLUMNS = {
+    "id": "id",
+    "name": "name",
+    "price": "price_cents",
+    "stock": "stock",
+    "held_stock": "held_stock",
+    "category": "category",
+    "description": "description",
+    "is_active": "is_active",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+    "version": "version",
+    "popularity": "popularity",
+}
+
+# Filter shapes (see _filter_params()) that come from a search term
+SEARCH_SHAPES = {"fuzzy_ranking", "no_match", "search_query", "search_term"}
+
+# INSERT ... ON CONFLICT DO UPDATE, per dialect (others update then insert)
+UPSERT_INSERTS = {"postgresql": postgresql_insert, "sqlite": sqlite_insert}
+
+# Counter rows per upsert statement in record_views()
+COUNTER_UPSERT_CHUNK_SIZE = 500
+
+# Filters for which estimate_count() can use planner statistics
+ESTIMABLE_FILTERS = {"category"}
 
 
 class ProductRepositoryImpl(ProductRepository):
@@ -22,28 +118,220 @@ class ProductRepositoryImpl(ProductRepository):
     the interface defined in the Domain layer.
     """
     
-    def __init__(self, session: Session):
-        """Initialize repository with database session"""
+    def __init__(
+        self,
+        session: AsyncSession,
+        count_cache: Optional[ResultCache] = None,
+        trigram_index: Optional[TrigramIndex] = None,
+        read_session: Optional[AsyncSession] = None,
+        on_write: Optional[Callable[[], None]] = None,
+        statement_cache: Optional[StatementCache] = None,
+        on_hold: Optional[Callable[[int, datetime], None]] = None
+    ):
+        """
+        Initialize repository with async database session.
+        
+        Args:
+            session: Async database session (primary; all writes)
+            count_cache: Shared cache for match counts (no caching if None)
+            trigram_index: Shared in-process index backing fuzzy search on
+                backends without pg_trgm (fuzzy falls back to plain search if None)
+            read_session: Session on a read replica for get/list/count
+                queries (reads use `session` if None). Once this repository
+                has written, its reads go to the primary.
+            on_write: Called after every committed write
+            statement_cache: Shared cache of list/count statements (built
+                per call if None)
+            on_hold: Called with (hold ID, expiry) after every committed
+                stock hold, e.g. to schedule its release
+        """
         self._session = session
+        self._read_session = read_session or session
+        self._on_write = on_write
+        self._on_hold = on_hold
+        self._statement_cache = statement_cache
+        self._count_cache = count_cache
+        self._trigram_index = trigram_index
+        self._pending_trigram_updates: List[Tuple[int, Optional[str]]] = []
+        # Concurrent get_by_id() calls share one IN query
+        self._product_loader = BatchLoader(self._fetch_by_ids)
+    
+    @property
+    def _dialect(self) -> str:
+        """Name of the database dialect behind the session"""
+        return self._session.get_bind().dialect.name
+    
+    async def _sync_search(self, db_model: ProductModel) -> None:
+        """Keep the full-text search index in step with a product write"""
+        await sync_search_entry(
+            self._session,
+            db_model.id,
+            db_model.name,
+            db_model.description,
+            db_model.is_active
+        )
+        if self._trigram_index is not None:
+            # Applied once the write is committed
+            self._pending_trigram_updates.append(
+                (db_model.id, db_model.name if db_model.is_active else None)
+            )
     
-    def _to_domain_entity(self, db_model: ProductModel) -> Product:
+    async def _commit_write(self, stock_only: bool = False) -> None:
+        """
+        Commit a write and invalidate cached counts.
+        
+        Writes that only move stock (`stock_only`) leave the totals valid
+        and drop only the cached facets, whose in_stock count depends on
+        stock.
+        """
+        await self._session.commit()
+        if self._count_cache is not None:
+            self._count_cache.invalidate("facets" if stock_only else None)
+        for product_id, name in self._pending_trigram_updates:
+            if name is None:
+                self._trigram_index.remove(product_id)
+            else:
+                self._trigram_index.add(product_id, name)
+        self._pending_trigram_updates = []
+        # Read our own writes: a replica may not have them yet
+        self._read_session = self._session
+        if self._on_write is not None:
+            self._on_write()
+    
+    async def _resolve_fuzzy(self, filters: Optional[dict]) -> Optional[dict]:
+        """
+        Prepare a fuzzy search before the filters are applied.
+        
+        On PostgreSQL this sets the pg_trgm threshold for the current
+        transaction. Elsewhere the in-process trigram index produces the
+        candidates, which are returned in filters["fuzzy_ranking"]
+        (product ID -> rank, best match first). Once stale, the index is
+        rebuilt in the background.
+        """
+        if not filters or not filters.get("fuzzy") or not filters.get("search"):
+            return filters
+        settings = get_settings()
+        if self._dialect == "postgresql":
+            await set_fuzzy_threshold(self._read_session, settings.FUZZY_SEARCH_THRESHOLD)
+            return filters
+        if self._trigram_index is None:
+            return {k: v for k, v in filters.items() if k != "fuzzy"}
+        
+        if self._trigram_index.needs_refresh():
+            rows = await self._read_session.execute(
+                select(ProductModel.id, ProductModel.name).where(ProductModel.is_active == True)
+            )
+            # Built off the event loop; a stale index keeps serving meanwhile
+            rebuild = self._trigram_index.refresh(rows.all())
+            if not self._trigram_index.loaded:
+                await rebuild
+        matches = self._trigram_index.search(
+            filters["search"],
+            threshold=settings.FUZZY_SEARCH_THRESHOLD,
+            limit=settings.FUZZY_SEARCH_MAX_CANDIDATES
+        )
+        ranking = {product_id: position for position, (product_id, _) in enumerate(matches)}
+        return {**filters, "fuzzy_ranking": ranking}
+    
+    def _to_domain_entity(self, db_model: ProductModel, shard_stock: Optional[Dict[int, int]] = None) -> Product:
         """
         Map SQLAlchemy model to domain entity.
         
         Converts database representation to domain entity with value objects.
+        The stock of a sharded product is taken from `shard_stock` (see
+        _shard_stock()).
         """
+        stock = db_model.stock
+        if db_model.stock_shards:
+            stock = (shard_stock or {}).get(db_model.id, 0)
         return Product(
             id=db_model.id,
             name=db_model.name,
-            price=Price(Decimal(str(db_model.price))),  # Convert float to Decimal
-            stock=Stock(db_model.stock),
+            price=Price(from_minor_units(db_model.price_cents)),  # Exact cents to Decimal
+            stock=Stock(stock, held=db_model.held_stock or 0),
             category=db_model.category,
             description=db_model.description,
             is_active=db_model.is_active,
             created_at=db_model.created_at,
-            updated_at=db_model.updated_at
+            updated_at=db_model.updated_at,
+            version=db_model.version,
+            popularity=db_model.popularity or 0
         )
     
+    async def _shard_stock(self, product_ids: Sequence[int], session: Optional[AsyncSession] = None) -> Dict[int, int]:
+        """
+        Stock of sharded products, summed over their shards, with one
+        grouped query (none when `product_ids` is empty).
+        
+        Returns:
+            {product ID: stock} for the sharded products among `product_ids`
+        """
+        if not product_ids:
+            return {}
+        rows = await (session or self._read_session).execute(
+            select(ProductStockShardModel.product_id, func.sum(ProductStockShardModel.stock))
+            .where(ProductStockShardModel.product_id.in_(set(product_ids)))
+            .group_by(ProductStockShardModel.product_id)
+        )
+        return {product_id: int(stock) for product_id, stock in rows.all()}
+    
+    async def _to_domain_entities(
+        self,
+        db_models: Sequence[ProductModel],
+        session: Optional[AsyncSession] = None
+    ) -> List[Product]:
+        """Map models to entities, summing the shards of sharded products"""
+        shard_stock = await self._shard_stock([model.id for model in db_models if model.stock_shards], session)
+        return [self._to_domain_entity(model, shard_stock) for model in db_models]
+    
+    async def _to_field_rows(self, rows, projection: List[str]) -> List[Dict[str, Any]]:
+        """Map projected rows to {field: value}, summing the shards of sharded products"""
+        values = [self._to_fields(row, projection) for row in rows]
+        if "stock" in projection:
+            sharded = [row["id"] for row in values if row.pop("stock_shards")]
+            shard_stock = await self._shard_stock(sharded)
+            for row in values:
+                row["stock"] = shard_stock.get(row["id"], row["stock"])
+        return values
+    
+    def _projection(self, fields: Optional[Sequence[str]], order_by: str) -> Optional[List[str]]:
+        """
+        Fields to select for list(fields=...): the requested ones plus id
+        and the sort field (needed for cursors), and stock_shards with stock
+        (dropped by _to_field_rows()). None selects the entity.
+        
+        Projected queries are built on the Core table (PRODUCTS.c), so rows
+        come back as plain tuples: no ORM instances, identity map or
+        entity validation.
+        """
+        if fields is None:
+            return None
+        unknown = [field for field in fields if field not in FIELD_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unsupported field: {unknown[0]}")
+        sort_field = order_by.lstrip("-")
+        extra = [sort_field] if sort_field in FIELD_COLUMNS else []
+        projection = list(dict.fromkeys(["id", *fields, *extra]))
+        if "stock" in projection:
+            projection.append("stock_shards")
+        return projection
+    
+    def _columns(self, projection: Optional[List[str]], entity=ProductModel, labeled: bool = True) -> list:
+        """Select list for a projection over `entity` (labeled by field name)"""
+        if projection is None:
+            return [entity]
+        columns = [getattr(entity, FIELD_COLUMNS.get(field, field)) for field in projection]
+        if not labeled:
+            return columns
+        return [column.label(field) for column, field in zip(columns, projection)]
+    
+    def _to_fields(self, row, projection: List[str]) -> Dict[str, Any]:
+        """Map a projected row to {field: value}"""
+        values = dict(zip(projection, row))
+        if "price" in values:
+            values["price"] = from_minor_units(values["price"])  # Exact cents to Decimal
+        return values
+    
     def _to_db_model(self, entity: Product) -> ProductModel:
         """
         Map domain entity to SQLAlchemy model.
@@ -51,8 +339,9 @@ class ProductRepositoryImpl(ProductRepository):
         return ProductModel(
             id=entity.id,
             name=entity.name,
-            price=float(entity.price.value),  # Convert Decimal to float for DB
+            price_cents=to_minor_units(entity.price.value),  # Convert Decimal to cents for DB
             stock=entity.stock.value,
+            held_stock=entity.stock.held,
             category=entity.category,
             description=entity.description,
             is_active=entity.is_active,
@@ -62,10 +351,9 @@ class ProductRepositoryImpl(ProductRepository):
     
     async def create(self, product: Product) -> Product:
         """Create a new product"""
-        # SQLAlchemy is synchronous, but we keep async interface for compatibility
         db_model = ProductModel(
             name=product.name,
-            price=float(product.price.value),
+            price_cents=to_minor_units(product.price.value),
             stock=product.stock.value,
             category=product.category,
             description=product.description,
@@ -75,125 +363,1012 @@ class ProductRepositoryImpl(ProductRepository):
         )
         
         self._session.add(db_model)
-        self._session.commit()
-        self._session.refresh(db_model)
+        await self._session.flush()  # Assigns the ID needed by the search index
+        await self._sync_search(db_model)
+        await self._commit_write()
+        await self._session.refresh(db_model)
         
         return self._to_domain_entity(db_model)
     
-    async def get_by_id(self, product_id: int) -> Optional[Product]:
-        """Get product by ID"""
-        db_model = self._session.query(ProductModel).filter(
-            and_(
-                ProductModel.id == product_id,
-                ProductModel.is_active == True
-            )
-        ).first()
+    async def create_many(self, products: List[Product]) -> List[Product]:
+        """
+        Create products in chunks with a single commit.
         
-        if not db_model:
-            return None
+        Each chunk is one INSERT ... RETURNING executed as an executemany
+        (batched into multi-row statements by SQLAlchemy), so there is no
+        per-product round trip, flush or refresh.
+        """
+        chunk_size = get_settings().BULK_INSERT_CHUNK_SIZE
+        now = datetime.now()
+        created = []
         
-        return self._to_domain_entity(db_model)
+        for start in range(0, len(products), chunk_size):
+            chunk = products[start:start + chunk_size]
+            rows = [
+                {
+                    "name": product.name,
+                    "price_cents": to_minor_units(product.price.value),  # Convert Decimal to cents for DB
+                    "stock": product.stock.value,
+                    "category": product.category,
+                    "description": product.description,
+                    "is_active": product.is_active,
+                    "created_at": product.created_at or now,
+                    "updated_at": product.updated_at or now,
+                }
+                for product in chunk
+            ]
+            # SQLAlchemy can only guarantee RETURNING order on SQLite by
+            # inserting row by row; rowids there are assigned in insert
+            # order under the write lock, so sorting the IDs is enough
+            result = await self._session.execute(
+                insert(ProductModel.__table__).returning(
+                    ProductModel.id, sort_by_parameter_order=self._dialect != "sqlite"
+                ),
+                rows
+            )
+            ids = sorted(result.scalars().all())
+            
+            chunk_created = [
+                replace(product, id=product_id, created_at=row["created_at"], updated_at=row["updated_at"], version=1)
+                for product, product_id, row in zip(chunk, ids, rows)
+            ]
+            active = [product for product in chunk_created if product.is_active]
+            await add_search_entries(
+                self._session,
+                [(product.id, product.name, product.description) for product in active]
+            )
+            if self._trigram_index is not None:
+                self._pending_trigram_updates.extend((product.id, product.name) for product in active)
+            created.extend(chunk_created)
+        
+        await self._commit_write()
+        return created
     
-    async def list(
+    async def get_by_id(self, product_id: int) -> Optional[Product]:
+        """Get product by ID (batched with concurrent get_by_id calls)"""
+        return await self._product_loader.load(product_id)
+    
+    async def get_many(self, product_ids: List[int]) -> List[Product]:
+        """Get active products by IDs with a single IN query, in request order"""
+        found = await self._fetch_by_ids(product_ids)
+        return [found[product_id] for product_id in dict.fromkeys(product_ids) if product_id in found]
+    
+    async def _fetch_by_ids(
         self,
-        filters: Optional[dict] = None,
-        limit: int = 20,
-        offset: int = 0
-    ) -> List[Product]:
-        """List products with optional filters"""
-        query = self._session.query(ProductModel).filter(
-            ProductModel.is_active == True
-        )
+        product_ids: List[int],
+        session: Optional[AsyncSession] = None
+    ) -> Dict[int, Product]:
+        """Load active products by IDs: {id: product} for those found (from the read session by default)"""
+        if not product_ids:
+            return {}
+        db_models = (await (session or self._read_session).scalars(
+            select(ProductModel).where(
+                and_(
+                    ProductModel.id.in_(set(product_ids)),
+                    ProductModel.is_active == True
+                )
+            )
+        )).all()
+        
+        return {product.id: product for product in await self._to_domain_entities(db_models, session)}
+    
+    def _filter_params(self, filters: Optional[dict]) -> Tuple[Tuple[str, ...], Dict[str, Any]]:
+        """
+        Split list/count filters into a statement shape and bind values.
+        
+        The shape names the bind parameters the statement needs, plus
+        "fuzzy_ranking" or "no_match" (a search term without words); values
+        are converted to what the columns hold (price bounds in cents, the
+        search term in the backend's query syntax).
+        """
+        params: Dict[str, Any] = {}
+        markers = []
         
-        # Apply filters safely using SQLAlchemy (protects against SQL injection)
         if filters:
             if filters.get("category"):
-                query = query.filter(ProductModel.category == filters["category"])
+                params["category"] = filters["category"]
             
             if filters.get("min_price") is not None:
-                query = query.filter(ProductModel.price >= float(filters["min_price"]))
+                params["min_price_cents"] = min_price_bound(Decimal(filters["min_price"]))
             
             if filters.get("max_price") is not None:
-                query = query.filter(ProductModel.price <= float(filters["max_price"]))
+                params["max_price_cents"] = max_price_bound(Decimal(filters["max_price"]))
             
-            if filters.get("search"):
-                search_term = f"%{filters['search']}%"
-                query = query.filter(ProductModel.name.like(search_term))
+            if "fuzzy_ranking" in filters:
+                markers.append("fuzzy_ranking")
+            elif filters.get("search") and filters.get("fuzzy"):
+                params["search_term"] = filters["search"]
+            elif filters.get("search"):
+                query_string = search_query(self._dialect, filters["search"])
+                if query_string is None:
+                    markers.append("no_match")
+                else:
+                    params["search_query"] = query_string
             
             if filters.get("is_active") is not None:
-                query = query.filter(ProductModel.is_active == filters["is_active"])
+                params["is_active"] = bool(filters["is_active"])
+        
+        return tuple(sorted(params)) + tuple(markers), params
+    
+    def _page_params(
+        self,
+        order_by: str,
+        limit: int,
+        offset: int,
+        after: Optional[Tuple[Any, int]]
+    ) -> Tuple[Tuple[Any, ...], Dict[str, Any]]:
+        """Split ordering and offset or keyset pagination into a statement shape and bind values"""
+        params: Dict[str, Any] = {"limit": limit}
+        if after is None:
+            params["offset"] = offset
+            return (order_by, False), params
+        
+        last_key, last_id = after
+        field = order_by.lstrip("-")
+        if field == "price":
+            try:
+                last_key = to_minor_units(Decimal(str(last_key)))
+            except InvalidOperation:
+                raise ValueError("Invalid pagination cursor")
+        params["after_id"] = last_id
+        if field != "id":
+            params["after_key"] = last_key
+        return (order_by, True), params
+    
+    def _statement(self, kind: str, filter_shape: Tuple[str, ...], shape: Tuple, build: Callable[[], Any]):
+        """
+        Statement for a query shape from the statement cache, built on a miss.
+        
+        Statements with inlined fuzzy candidates are built every time.
+        """
+        if self._statement_cache is None or "fuzzy_ranking" in filter_shape:
+            return build()
+        return self._statement_cache.get_or_build(kind, (self._dialect, filter_shape, *shape), build)
+    
+    def _apply_filters(
+        self,
+        query,
+        shape: Tuple[str, ...],
+        entity=ProductModel,
+        ranking: Optional[Dict[int, int]] = None
+    ):
+        """
+        Apply list/count filters of a given shape (see _filter_params()) to a
+        select() over `entity`, with bind parameters for their values.
+        
+        `ranking` holds the trigram candidates of a "fuzzy_ranking" shape.
+        """
+        query = query.where(entity.is_active == True)
+        
+        if "category" in shape:
+            query = query.where(entity.category == bindparam("category"))
+        
+        if "min_price_cents" in shape:
+            query = query.where(entity.price_cents >= bindparam("min_price_cents"))
+        
+        if "max_price_cents" in shape:
+            query = query.where(entity.price_cents <= bindparam("max_price_cents"))
+        
+        if "fuzzy_ranking" in shape:
+            # Candidates from the in-process trigram index
+            query = query.where(entity.id.in_(ranking)) if ranking else query.where(false())
+        elif "search_term" in shape:
+            # Trigram index on name (pg_trgm)
+            query = apply_fuzzy_search(query, bindparam("search_term", type_=String), entity)
+        elif "search_query" in shape:
+            # Full-text index on name + description
+            query = apply_search(query, self._dialect, bindparam("search_query", type_=String), entity)
+        elif "no_match" in shape:
+            query = query.where(false())
+        
+        if "is_active" in shape:
+            query = query.where(entity.is_active == bindparam("is_active"))
+        
+        return query
+    
+    def _apply_page(
+        self,
+        query,
+        page_shape: Tuple[Any, ...],
+        filter_shape: Tuple[str, ...],
+        entity=ProductModel,
+        ranking: Optional[Dict[int, int]] = None
+    ):
+        """
+        Apply ordering and offset or keyset pagination of a given shape (see
+        _page_params()) to a select() over `entity`.
+        """
+        order_by, has_cursor = page_shape
+        if order_by == "relevance":
+            if not SEARCH_SHAPES.intersection(filter_shape):
+                raise ValueError("Relevance sort requires a search term")
+            if has_cursor:
+                raise ValueError("Relevance sort does not support cursor pagination")
+            if "fuzzy_ranking" in filter_shape:
+                rank = (case(ranking, value=entity.id), False) if ranking else None
+            elif "search_term" in filter_shape:
+                rank = fuzzy_rank(bindparam("search_term", type_=String), entity), True
+            elif "search_query" in filter_shape:
+                query_string = bindparam("search_query", type_=String)
+                query = join_search_rank(query, self._dialect, query_string, entity)
+                rank = search_rank(self._dialect, query_string)
+            else:
+                rank = None
+            if rank is not None:
+                expression, descending = rank
+                query = query.order_by(expression.desc() if descending else expression)
+            return query.order_by(entity.id).offset(bindparam("offset", type_=Integer)).limit(
+                bindparam("limit", type_=Integer)
+            )
         
-        # Pagination
-        query = query.limit(limit).offset(offset)
+        descending = order_by.startswith("-")
+        field = order_by.lstrip("-")
+        if field not in SORT_FIELDS:
+            raise ValueError(f"Unsupported sort field: {order_by}")
+        sort_column = getattr(entity, SORT_FIELDS[field])
         
-        # Order by ID for consistency
-        query = query.order_by(ProductModel.id)
+        # Order by sort column, then ID for a stable total order
+        if field == "id":
+            sort_key = [entity.id]
+        else:
+            sort_key = [sort_column, entity.id]
+        query = query.order_by(*[col.desc() if descending else col for col in sort_key])
         
-        db_models = query.all()
+        # Pagination: keyset seek when a position is given, offset otherwise
+        if has_cursor:
+            last_id = bindparam("after_id", type_=Integer)
+            if field == "id":
+                position, bound = entity.id, last_id
+            else:
+                last_key = bindparam("after_key", type_=sort_column.type)
+                position, bound = tuple_(sort_column, entity.id), tuple_(last_key, last_id)
+            query = query.where(position < bound if descending else position > bound)
+        else:
+            query = query.offset(bindparam("offset", type_=Integer))
         
-        return [self._to_domain_entity(model) for model in db_models]
+        return query.limit(bindparam("limit", type_=Integer))
     
+    async def list(
+        self,
+        filters: Optional[dict] = None,
+        limit: int = 20,
+        offset: int = 0,
+        order_by: str = "id",
+        after: Optional[Tuple[Any, int]] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[ProductRow]:
+        """List products with optional filters (only the given fields, if any)"""
+        projection = self._projection(fields, order_by)
+        filters = await self._resolve_fuzzy(filters)
+        filter_shape, params = self._filter_params(filters)
+        page_shape, page_params = self._page_params(order_by, limit, offset, after)
+        ranking = (filters or {}).get("fuzzy_ranking")
+        
+        def build():
+            entity = ProductModel if projection is None else PRODUCTS.c
+            query = self._apply_filters(select(*self._columns(projection, entity)), filter_shape, entity, ranking)
+            return self._apply_page(query, page_shape, filter_shape, entity, ranking)
+        
+        query = self._statement("list", filter_shape, (page_shape, projection and tuple(projection)), build)
+        rows = (await self._read_session.execute(query, {**params, **page_params})).all()
+        
+        if projection is not None:
+            return await self._to_field_rows(rows, projection)
+        return await self._to_domain_entities([row[0] for row in rows])
+    
+    async def list_with_total(
+        self,
+        filters: Optional[dict] = None,
+        limit: int = 20,
+        offset: int = 0,
+        order_by: str = "id",
+        after: Optional[Tuple[Any, int]] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Tuple[List[ProductRow], int]:
+        """
+        List a page of products together with the total match count.
+        
+        The total comes from a COUNT(*) OVER () window evaluated in the same
+        statement, so the filter predicate is scanned once per request.
+        """
+        cache_key = normalize_filters(filters)
+        cached_total = self._count_cache.get(cache_key) if self._count_cache else None
+        if cached_total is not None:
+            products = await self.list(filters, limit, offset, order_by, after, fields)
+            return products, cached_total
+        generation = self._count_cache.generation_for(cache_key) if self._count_cache else None
+        projection = self._projection(fields, order_by)
+        resolved = await self._resolve_fuzzy(filters)
+        filter_shape, params = self._filter_params(resolved)
+        page_shape, page_params = self._page_params(order_by, limit, offset, after)
+        ranking = (resolved or {}).get("fuzzy_ranking")
+        
+        def build():
+            entity = ProductModel if projection is None else PRODUCTS.c
+            total_column = func.count().over().label("total")
+            
+            if after is None:
+                matched = self._apply_filters(
+                    select(*self._columns(projection, entity), total_column), filter_shape, entity, ranking
+                )
+                return self._apply_page(matched, page_shape, filter_shape, entity, ranking)
+            
+            # The window must see every match, so seek outside of it
+            matched = self._apply_filters(
+                select(*self._columns(projection, entity, labeled=False), total_column), filter_shape, entity, ranking
+            ).subquery()
+            entity = aliased(ProductModel, matched) if projection is None else matched.c
+            return self._apply_page(
+                select(*self._columns(projection, entity), matched.c.total), page_shape, filter_shape, entity, ranking
+            )
+        
+        query = self._statement("list_with_total", filter_shape, (page_shape, projection and tuple(projection)), build)
+        rows = (await self._read_session.execute(query, {**params, **page_params})).all()
+        
+        if rows:
+            total = rows[0].total
+        elif offset == 0 and after is None:
+            total = 0
+        else:
+            # Page past the end: no row carries the window value
+            total = await self.count(filters)
+        
+        if self._count_cache is not None:
+            self._count_cache.put(cache_key, total, generation)
+        
+        if projection is not None:
+            return await self._to_field_rows([row[:-1] for row in rows], projection), total
+        return await self._to_domain_entities([row[0] for row in rows]), total
+
+
     async def update(self, product: Product) -> Product:
-        """Update existing product"""
-        db_model = self._session.query(ProductModel).filter(
-            ProductModel.id == product.id
-        ).first()
-        
-        if not db_model:
-            raise ValueError(f"Product with ID {product.id} not found")
-        
-        # Update fields
-        db_model.name = product.name
-        db_model.price = float(product.price.value)
-        db_model.stock = product.stock.value
-        db_model.category = product.category
-        db_model.description = product.description
-        db_model.is_active = product.is_active
-        db_model.updated_at = datetime.now()
-        
-        self._session.commit()
-        self._session.refresh(db_model)
+        """Update existing product (all fields, at product.version, see update_fields())"""
+        return await self.update_fields(product.id, {
+            "name": product.name,
+            "price": product.price,
+            "stock": product.stock,
+            "category": product.category,
+            "description": product.description,
+            "is_active": product.is_active,
+        }, expected_version=product.version)
+    
+    async def update_fields(
+        self,
+        product_id: int,
+        changes: Dict[str, Any],
+        expected_version: Optional[int] = None
+    ) -> Product:
+        """
+        Apply a partial update with a single UPDATE ... RETURNING.
         
-        return self._to_domain_entity(db_model)
+        The statement only matches an active product whose values differ
+        from `changes` (and at `expected_version`), so a no-op update
+        writes nothing and is not committed; only then (or when the product
+        is missing or at another version) a SELECT tells them apart.
+        """
+        unknown = set(changes) - set(UPDATABLE_FIELDS)
+        if unknown:
+            raise ValueError(f"Unsupported field: {sorted(unknown)[0]}")
+        
+        values = {}
+        for field, value in changes.items():
+            if field == "price":
+                value = to_minor_units(value.value)  # Convert Decimal to cents for DB
+            elif field == "stock":
+                value = value.value
+            values[FIELD_COLUMNS[field]] = value
+        
+        changed = or_(*[
+            getattr(ProductModel, column).is_distinct_from(value) for column, value in values.items()
+        ])
+        query = update(ProductModel).where(ProductModel.id == product_id, ProductModel.is_active == True, changed)
+        if expected_version is not None:
+            query = query.where(ProductModel.version == expected_version)
+        db_model = await self._session.scalar(
+            query
+            .values(**values, updated_at=datetime.now(), version=ProductModel.version + 1)
+            .returning(ProductModel),
+            execution_options={"populate_existing": True}
+        )
+        
+        if db_model is None:
+            current = await self._fetch_by_ids([product_id], self._session)
+            if product_id not in current:
+                raise ProductNotFoundError(f"Product with ID {product_id} not found")
+            if expected_version is not None and current[product_id].version != expected_version:
+                raise ProductVersionConflict(product_id, expected_version, current[product_id].version)
+            return current[product_id]
+        
+        shard_stock = {}
+        if db_model.stock_shards:
+            if "stock" in changes:
+                # Spread the new stock over the shards
+                shard_stock = {product_id: db_model.stock}
+                await self._write_shards(product_id, db_model.stock, db_model.stock_shards)
+            else:
+                shard_stock = await self._shard_stock([product_id], self._session)
+        if SEARCHABLE_FIELDS & set(changes):
+            await self._sync_search(db_model)
+        await self._commit_write(stock_only=set(changes) == {"stock"})
+        
+        return self._to_domain_entity(db_model, shard_stock)
+    
+    async def decrement_stock(self, product_id: int, quantity: int) -> int:
+        """
+        Take stock with a single conditional UPDATE ... RETURNING:
+        `SET stock = stock - :quantity WHERE id = :id AND stock >= :quantity`.
+        
+        See _take_stock() for sharded products and failures.
+        """
+        remaining = await self._take_stock(product_id, quantity)
+        await self._commit_write(stock_only=True)
+        return remaining
+    
+    async def _take_stock(self, product_id: int, quantity: int, hold: bool = False) -> int:
+        """
+        Take stock of one product within the current transaction, moving
+        it to the held stock if `hold`.
+        
+        When the conditional UPDATE matched no row, a SELECT tells a missing
+        product, a sharded product (taken from its shards, see
+        _take_from_shards()) and insufficient stock apart. Failures roll
+        back right away, so a failed buyer does not keep the write lock.
+        
+        A sharded product's row is only written for a hold (held_stock):
+        updating it on every decrement would serialize buyers on that row
+        again, so plain decrements leave its version alone.
+        
+        Returns:
+            Stock left
+        """
+        held = {"held_stock": ProductModel.held_stock + quantity} if hold else {}
+        remaining = await self._session.scalar(
+            update(ProductModel)
+            .where(
+                ProductModel.id == product_id,
+                ProductModel.is_active == True,
+                ProductModel.stock_shards == 0,
+                ProductModel.stock >= quantity
+            )
+            .values(
+                stock=ProductModel.stock - quantity,
+                **held,
+                updated_at=datetime.now(),
+                version=ProductModel.version + 1
+            )
+            .returning(ProductModel.stock)
+        )
+        if remaining is not None:
+            return remaining
+        
+        current = (await self._session.execute(
+            select(ProductModel.stock, ProductModel.stock_shards)
+            .where(ProductModel.id == product_id, ProductModel.is_active == True)
+        )).first()
+        available = None if current is None else current.stock
+        if current is not None and current.stock_shards:
+            taken, available = await self._take_from_shards(product_id, quantity, current.stock_shards)
+            if taken and hold:
+                await self._session.execute(
+                    update(ProductModel)
+                    .where(ProductModel.id == product_id)
+                    .values(**held, updated_at=datetime.now(), version=ProductModel.version + 1)
+                )
+            if taken:
+                return available
+        await self._session.rollback()
+        if available is None:
+            raise ProductNotFoundError(f"Product with ID {product_id} not found")
+        raise InsufficientStock(f"Only {available} items available, requested {quantity}")
+    
+    async def hold_stock(self, product_id: int, quantity: int, expires_at: datetime) -> StockHold:
+        """
+        Move stock to the held stock (see _take_stock()) and record the
+        hold with one INSERT ... RETURNING, in one transaction.
+        
+        on_hold is told about the hold once it is committed.
+        """
+        await self._take_stock(product_id, quantity, hold=True)
+        hold_id = await self._session.scalar(
+            insert(StockHoldModel)
+            .values(product_id=product_id, quantity=quantity, expires_at=expires_at, created_at=datetime.now())
+            .returning(StockHoldModel.id)
+        )
+        await self._commit_write(stock_only=True)
+        if self._on_hold is not None:
+            self._on_hold(hold_id, expires_at)
+        return StockHold(id=hold_id, product_id=product_id, quantity=quantity, expires_at=expires_at)
+    
+    async def confirm_hold(self, hold_id: int) -> StockHold:
+        """
+        Delete an unexpired hold with DELETE ... RETURNING and drop its
+        units from the held stock. An expired hold cannot be confirmed,
+        even before the sweeper has released it.
+        """
+        row = (await self._session.execute(
+            delete(StockHoldModel)
+            .where(StockHoldModel.id == hold_id, StockHoldModel.expires_at > datetime.now())
+            .returning(StockHoldModel.product_id, StockHoldModel.quantity, StockHoldModel.expires_at)
+        )).first()
+        if row is None:
+            await self._session.rollback()
+            raise StockHoldNotFoundError(f"Stock hold with ID {hold_id} not found")
+        
+        await self._session.execute(
+            update(ProductModel)
+            .where(ProductModel.id == row.product_id)
+            .values(
+                held_stock=ProductModel.held_stock - row.quantity,
+                updated_at=datetime.now(),
+                version=ProductModel.version + 1
+            )
+        )
+        await self._commit_write(stock_only=True)
+        return StockHold(id=hold_id, product_id=row.product_id, quantity=row.quantity, expires_at=row.expires_at)
+    
+    async def release_holds(self, hold_ids: Sequence[int]) -> int:
+        """
+        Release holds with a fixed number of statements, however many:
+        one DELETE ... WHERE id IN (...) RETURNING, then one CASE UPDATE
+        returning the units per product to stock (`stock_shards = 0`) and
+        taking them off held_stock. A sharded product gets its units back
+        on a random shard.
+        
+        On PostgreSQL the products are first locked in ID order, as
+        decrement_stock_many() does, so a sweep cannot deadlock with a
+        checkout.
+        """
+        if not hold_ids:
+            return 0
+        rows = (await self._session.execute(
+            delete(StockHoldModel)
+            .where(StockHoldModel.id.in_(set(hold_ids)))
+            .returning(StockHoldModel.product_id, StockHoldModel.quantity)
+        )).all()
+        if not rows:
+            await self._session.rollback()
+            return 0
+        
+        released: Dict[int, int] = {}
+        for product_id, quantity in rows:
+            released[product_id] = released.get(product_id, 0) + quantity
+        product_ids = sorted(released)
+        if self._dialect == "postgresql":
+            await self._session.execute(
+                select(ProductModel.id)
+                .where(ProductModel.id.in_(product_ids))
+                .order_by(ProductModel.id)
+                .with_for_update()
+            )
+        
+        returned = case(released, value=ProductModel.id)
+        sharded = await self._session.execute(
+            update(ProductModel)
+            .where(ProductModel.id.in_(product_ids))
+            .values(
+                stock=case((ProductModel.stock_shards == 0, ProductModel.stock + returned), else_=ProductModel.stock),
+                held_stock=ProductModel.held_stock - returned,
+                updated_at=datetime.now(),
+                version=ProductModel.version + 1
+            )
+            .returning(ProductModel.id, ProductModel.stock_shards)
+        )
+        for product_id, shards in sharded.all():
+            if shards:
+                await self._session.execute(
+                    update(ProductStockShardModel)
+                    .where(
+                        ProductStockShardModel.product_id == product_id,
+                        ProductStockShardModel.shard == random.randrange(shards)
+                    )
+                    .values(stock=ProductStockShardModel.stock + released[product_id])
+                )
+        await self._commit_write(stock_only=True)
+        return len(rows)
+    
+    async def expired_hold_ids(self, now: datetime, limit: int) -> List[int]:
+        """IDs of expired holds, seeking on the expires_at index (primary session)"""
+        rows = await self._session.scalars(
+            select(StockHoldModel.id)
+            .where(StockHoldModel.expires_at <= now)
+            .order_by(StockHoldModel.expires_at)
+            .limit(limit)
+        )
+        return list(rows.all())
+    
+    async def _take_from_shards(self, product_id: int, quantity: int, shards: int) -> Tuple[bool, int]:
+        """
+        Take stock of a sharded product within the current transaction.
+        
+        A random shard is decremented with a conditional UPDATE, so
+        concurrent buyers mostly lock different rows. If it holds too
+        little, the shards are locked in shard order and drained starting
+        from it (spill-over) with one CASE UPDATE.
+        
+        Returns:
+            (taken, stock left): nothing is taken if the shards hold less
+            than `quantity` in total
+        """
+        start = random.randrange(shards)
+        taken = await self._session.scalar(
+            update(ProductStockShardModel)
+            .where(
+                ProductStockShardModel.product_id == product_id,
+                ProductStockShardModel.shard == start,
+                ProductStockShardModel.stock >= quantity
+            )
+            .values(stock=ProductStockShardModel.stock - quantity)
+            .returning(ProductStockShardModel.shard)
+        )
+        if taken is not None:
+            return True, (await self._shard_stock([product_id], self._session)).get(product_id, 0)
+        
+        query = (
+            select(ProductStockShardModel.shard, ProductStockShardModel.stock)
+            .where(ProductStockShardModel.product_id == product_id)
+            .order_by(ProductStockShardModel.shard)
+        )
+        if self._dialect == "postgresql":
+            query = query.with_for_update()
+        rows = (await self._session.execute(query)).all()
+        available = sum(stock for _, stock in rows)
+        if available < quantity:
+            return False, available
+        
+        needed = quantity
+        drained: Dict[int, int] = {}
+        for shard, stock in sorted(rows, key=lambda row: (row.shard < start, row.shard)):
+            take = min(stock, needed)
+            if take:
+                drained[shard] = take
+                needed -= take
+            if not needed:
+                break
+        await self._session.execute(
+            update(ProductStockShardModel)
+            .where(ProductStockShardModel.product_id == product_id, ProductStockShardModel.shard.in_(drained))
+            .values(stock=ProductStockShardModel.stock - case(drained, value=ProductStockShardModel.shard))
+        )
+        return True, available - quantity
+    
+    async def _write_shards(self, product_id: int, stock: int, shards: int) -> None:
+        """Replace a product's shards with `shards` rows sharing `stock` evenly (0 removes them)"""
+        await self._session.execute(
+            delete(ProductStockShardModel).where(ProductStockShardModel.product_id == product_id)
+        )
+        await self._session.execute(
+            update(ProductModel)
+            .where(ProductModel.id == product_id)
+            .values(stock=0 if shards else stock, stock_shards=shards, version=ProductModel.version + 1)
+        )
+        if shards:
+            await self._session.execute(
+                insert(ProductStockShardModel),
+                [
+                    {"product_id": product_id, "shard": shard, "stock": stock // shards + (shard < stock % shards)}
+                    for shard in range(shards)
+                ]
+            )
+    
+    async def set_stock_shards(self, product_id: int, shards: int) -> Product:
+        """
+        Switch a product to `shards` stock sub-counters (0 turns sharding
+        off), keeping its stock. The product row is locked on PostgreSQL.
+        """
+        query = select(ProductModel).where(ProductModel.id == product_id, ProductModel.is_active == True)
+        if self._dialect == "postgresql":
+            query = query.with_for_update()
+        db_model = await self._session.scalar(query, execution_options={"populate_existing": True})
+        if db_model is None:
+            raise ProductNotFoundError(f"Product with ID {product_id} not found")
+        
+        product = (await self._to_domain_entities([db_model], self._session))[0]
+        if shards != db_model.stock_shards:
+            await self._write_shards(product_id, product.stock.value, shards)
+            await self._commit_write()
+            product.version = db_model.version  # Bumped by _write_shards()
+        return product
+    
+    async def decrement_stock_many(self, quantities: Dict[int, int]) -> Dict[int, int]:
+        """
+        Take the stock of a whole basket with one conditional UPDATE:
+        `SET stock = stock - CASE id ... END WHERE id IN (...) AND stock >=
+        CASE id ... END RETURNING id, stock`.
+        
+        On PostgreSQL the rows are first locked with SELECT ... ORDER BY id
+        FOR UPDATE, as the UPDATE itself locks rows in scan order. SQLite
+        locks the whole database on the first write, so order is moot.
+        
+        If fewer rows than products came back, a SELECT classifies the
+        rest: sharded products, which the UPDATE skips, are then taken from
+        their shards in ID order; if anything still fails, the transaction
+        is rolled back.
+        """
+        product_ids = sorted(quantities)
+        if self._dialect == "postgresql":
+            await self._session.execute(
+                select(ProductModel.id)
+                .where(ProductModel.id.in_(product_ids), ProductModel.stock_shards == 0)
+                .order_by(ProductModel.id)
+                .with_for_update()
+            )
+        
+        needed = case(quantities, value=ProductModel.id)
+        rows = await self._session.execute(
+            update(ProductModel)
+            .where(
+                ProductModel.id.in_(product_ids),
+                ProductModel.is_active == True,
+                ProductModel.stock_shards == 0,
+                ProductModel.stock >= needed
+            )
+            .values(stock=ProductModel.stock - needed, updated_at=datetime.now(), version=ProductModel.version + 1)
+            .returning(ProductModel.id, ProductModel.stock)
+        )
+        remaining = dict(rows.all())
+        missing = [product_id for product_id in product_ids if product_id not in remaining]
+        
+        if missing:
+            current = (await self._session.execute(
+                select(ProductModel.id, ProductModel.stock, ProductModel.stock_shards)
+                .where(ProductModel.id.in_(missing), ProductModel.is_active == True)
+                .order_by(ProductModel.id)
+            )).all()
+            available = {row.id: row.stock for row in current}
+            # Sharded products come after the locked rows, in ID order
+            for row in current:
+                if row.stock_shards:
+                    taken, available[row.id] = await self._take_from_shards(
+                        row.id, quantities[row.id], row.stock_shards
+                    )
+                    if taken:
+                        remaining[row.id] = available.pop(row.id)
+            missing = [product_id for product_id in missing if product_id not in remaining]
+        
+        if missing:
+            await self._session.rollback()
+            failures = {}
+            for product_id in missing:
+                if product_id not in available:
+                    failures[product_id] = ProductNotFoundError(f"Product with ID {product_id} not found")
+                else:
+                    failures[product_id] = InsufficientStock(
+                        f"Only {available[product_id]} items available, requested {quantities[product_id]}"
+                    )
+            raise StockUnavailable(failures)
+        
+        await self._commit_write(stock_only=True)
+        return remaining
+    
+    async def record_views(self, views: Dict[int, int]) -> None:
+        """
+        Upsert the counters, COUNTER_UPSERT_CHUNK_SIZE products per
+        `INSERT ... ON CONFLICT (product_id) DO UPDATE SET views = views +
+        excluded.views`, then copy the totals to products.popularity with
+        one UPDATE, and commit.
+        
+        Popularity is a statistic, not product data: the copy leaves
+        version and updated_at alone, so ETags stay valid. On PostgreSQL
+        the products are locked in ID order first, as decrement_stock_many()
+        does.
+        """
+        if not views:
+            return
+        product_ids = sorted(views)
+        now = datetime.now()
+        upsert_insert = UPSERT_INSERTS.get(self._dialect)
+        counters = ProductCounterModel.__table__
+        
+        for start in range(0, len(product_ids), COUNTER_UPSERT_CHUNK_SIZE):
+            chunk = product_ids[start:start + COUNTER_UPSERT_CHUNK_SIZE]
+            if upsert_insert is not None:
+                statement = upsert_insert(counters).values([
+                    {"product_id": product_id, "views": views[product_id], "updated_at": now}
+                    for product_id in chunk
+                ])
+                await self._session.execute(statement.on_conflict_do_update(
+                    index_elements=[counters.c.product_id],
+                    set_={"views": counters.c.views + statement.excluded.views, "updated_at": now}
+                ))
+                continue
+            existing = set((await self._session.scalars(
+                select(counters.c.product_id).where(counters.c.product_id.in_(chunk))
+            )).all())
+            if existing:
+                await self._session.execute(
+                    update(counters)
+                    .where(counters.c.product_id.in_(existing))
+                    .values(views=counters.c.views + case(views, value=counters.c.product_id), updated_at=now)
+                )
+            missing = [product_id for product_id in chunk if product_id not in existing]
+            if missing:
+                await self._session.execute(insert(counters), [
+                    {"product_id": product_id, "views": views[product_id], "updated_at": now}
+                    for product_id in missing
+                ])
+        
+        if self._dialect == "postgresql":
+            await self._session.execute(
+                select(ProductModel.id)
+                .where(ProductModel.id.in_(product_ids))
+                .order_by(ProductModel.id)
+                .with_for_update()
+            )
+        await self._session.execute(
+            update(ProductModel)
+            .where(ProductModel.id.in_(product_ids))
+            .values(
+                popularity=select(counters.c.views)
+                .where(counters.c.product_id == ProductModel.id)
+                .scalar_subquery(),
+                updated_at=ProductModel.updated_at  # Not a product change
+            )
+        )
+        await self._session.commit()
     
     async def delete(self, product_id: int) -> None:
-        """Soft delete product"""
-        db_model = self._session.query(ProductModel).filter(
-            ProductModel.id == product_id
-        ).first()
+        """Soft delete product with a single UPDATE (not found if no row matched)"""
+        result = await self._session.execute(
+            update(ProductModel)
+            .where(ProductModel.id == product_id, ProductModel.is_active == True)
+            .values(is_active=False, updated_at=datetime.now(), version=ProductModel.version + 1)
+        )
         
-        if not db_model:
-            raise ValueError(f"Product with ID {product_id} not found")
+        if result.rowcount == 0:
+            raise ProductNotFoundError(f"Product with ID {product_id} not found")
         
-        # Soft delete
-        db_model.is_active = False
-        db_model.updated_at = datetime.now()
+        await sync_search_entry(self._session, product_id, "", None, False)
+        if self._trigram_index is not None:
+            self._pending_trigram_updates.append((product_id, None))
         
-        self._session.commit()
+        await self._commit_write()
     
     async def count(self, filters: Optional[dict] = None) -> int:
-        """Count products matching filters"""
-        query = self._session.query(ProductModel).filter(
-            ProductModel.is_active == True
-        )
+        """Count products matching filters (served from the count cache when possible)"""
+        cache_key = normalize_filters(filters)
+        if self._count_cache is not None:
+            cached_total = self._count_cache.get(cache_key)
+            if cached_total is not None:
+                return cached_total
+            generation = self._count_cache.generation_for(cache_key)
+        filters = await self._resolve_fuzzy(filters)
+        filter_shape, params = self._filter_params(filters)
+        ranking = (filters or {}).get("fuzzy_ranking")
         
         # Apply same filters as list()
-        if filters:
-            if filters.get("category"):
-                query = query.filter(ProductModel.category == filters["category"])
-            
-            if filters.get("min_price") is not None:
-                query = query.filter(ProductModel.price >= float(filters["min_price"]))
-            
-            if filters.get("max_price") is not None:
-                query = query.filter(ProductModel.price <= float(filters["max_price"]))
-            
-            if filters.get("search"):
-                search_term = f"%{filters['search']}%"
-                query = query.filter(ProductModel.name.like(search_term))
-            
-            if filters.get("is_active") is not None:
-                query = query.filter(ProductModel.is_active == filters["is_active"])
+        query = self._statement(
+            "count",
+            filter_shape,
+            (),
+            lambda: self._apply_filters(
+                select(func.count()).select_from(ProductModel), filter_shape, ranking=ranking
+            )
+        )
+        total = await self._read_session.scalar(query, params)
         
-        return query.count()
-
+        if self._count_cache is not None:
+            self._count_cache.put(cache_key, total, generation)
+        return total
+    
+    async def facets(self, filters: Optional[dict], price_edges: Sequence[Decimal]) -> Dict[str, Any]:
+        """
+        Aggregate matches with one query grouped by (category, price bucket)
+        (served from the count cache when possible).
+        
+        The category filter is left out of the query and applied while
+        folding the groups, so the category counts cover every category
+        while the total, price buckets and in-stock count honour it.
+        """
+        edges = [to_minor_units(Decimal(edge)) for edge in price_edges]
+        cache_key = ("facets", tuple(edges), normalize_filters(filters))
+        if self._count_cache is not None:
+            cached = self._count_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            generation = self._count_cache.generation_for(cache_key)
+        
+        category = (filters or {}).get("category")
+        resolved = await self._resolve_fuzzy({k: v for k, v in (filters or {}).items() if k != "category"})
+        filter_shape, params = self._filter_params(resolved)
+        ranking = resolved.get("fuzzy_ranking")
+        
+        def build():
+            # Sharded products keep their stock in the shards
+            in_stock = or_(
+                ProductModel.stock > 0,
+                and_(
+                    ProductModel.stock_shards > 0,
+                    exists().where(
+                        ProductStockShardModel.product_id == ProductModel.id,
+                        ProductStockShardModel.stock > 0
+                    )
+                )
+            )
+            if edges:
+                bucket = case(
+                    *[(ProductModel.price_cents < edge, i) for i, edge in enumerate(edges)],
+                    else_=len(edges)
+                )
+            else:
+                bucket = literal(0)
+            query = select(
+                ProductModel.category,
+                bucket.label("bucket"),
+                func.count().label("count"),
+                func.sum(case((in_stock, 1), else_=0)).label("in_stock")
+            )
+            return self._apply_filters(query, filter_shape, ranking=ranking).group_by(ProductModel.category, bucket)
+        
+        query = self._statement("facets", filter_shape, (tuple(edges),), build)
+        rows = (await self._read_session.execute(query, params)).all()
+        
+        facets = {"total": 0, "in_stock": 0, "categories": {}, "price_buckets": [0] * (len(edges) + 1)}
+        for row in rows:
+            facets["categories"][row.category] = facets["categories"].get(row.category, 0) + row.count
+            if category and row.category != category:
+                continue
+            facets["total"] += row.count
+            facets["in_stock"] += row.in_stock
+            facets["price_buckets"][row.bucket] += row.count
+        
+        if self._count_cache is not None:
+            self._count_cache.put(cache_key, facets, generation)
+        return facets
+    
+    async def estimate_count(self, filters: Optional[dict] = None) -> Optional[int]:
+        """
+        Estimate matches from planner statistics instead of counting rows.
+        
+        Supported for unfiltered and single-category queries:
+        - SQLite: sqlite_stat1 (populated by ANALYZE)
+        - PostgreSQL: pg_class.reltuples, or the EXPLAIN row estimate
+          for a category
+        """
+        filters = {k: v for k, v in (filters or {}).items() if k != "is_active" or v is not True}
+        if not set(filters) <= ESTIMABLE_FILTERS:
+            return None
+        category = filters.get("category")
+        
+        dialect = self._dialect
+        if dialect == "sqlite":
+            return await self._estimate_count_sqlite(category)
+        if dialect == "postgresql":
+            return await self._estimate_count_postgresql(category)
+        return None
+    
+    async def _estimate_count_sqlite(self, category: Optional[str]) -> Optional[int]:
+        """Estimate from sqlite_stat1 ("rows avg_per_col1 avg_per_col1_col2 ...")"""
+        has_stats = await self._read_session.scalar(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+        )
+        if not has_stats:
+            return None
+        stat = await self._read_session.scalar(
+            text("SELECT stat FROM sqlite_stat1 WHERE idx = 'idx_products_category_active'")
+        )
+        if not stat:
+            return None
+        numbers = [int(n) for n in stat.split()[:3]]
+        if category is None:
+            return numbers[0]
+        # Average rows per (category, is_active) pair, as the planner assumes
+        return numbers[2] if len(numbers) > 2 else None
+    
+    async def _estimate_count_postgresql(self, category: Optional[str]) -> Optional[int]:
+        """Estimate from pg_class.reltuples or the EXPLAIN row estimate"""
+        if category is None:
+            reltuples = await self._read_session.scalar(
+                text("SELECT reltuples FROM pg_class WHERE relname = 'products'")
+            )
+            # reltuples is -1 for tables that were never vacuumed/analyzed
+            return int(reltuples) if reltuples is not None and reltuples >= 0 else None
+        plan = await self._read_session.scalar(
+            text(
+                "EXPLAIN (FORMAT JSON) SELECT id FROM products "
+                "WHERE is_active = true AND category = :category"
+            ),
+            {"category": category}
+        )
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
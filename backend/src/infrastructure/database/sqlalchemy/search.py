@@ -0,0 +1,248 @@
+"""
+Full-text search index for products (name + description)
+
+- SQLite: FTS5 virtual table `products_fts` (rowid = product id) holding
+  active products, kept in sync by ProductRepositoryImpl on every write
+- PostgreSQL: generated `search_vector` tsvector column with a GIN index,
+  maintained by the database itself
+
+Other backends fall back to LIKE matching.
+
+Fuzzy (typo-tolerant) name search uses a pg_trgm GIN index on PostgreSQL
+and the in-process TrigramIndex (infrastructure.search) elsewhere.
+"""
+import re
+from typing import List, Optional, Tuple, Union
+
+from sqlalchemy import column, delete, func, insert, literal, literal_column, or_, select, table, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from infrastructure.database.sqlalchemy.models import ProductModel
+
+# FTS5 table (SQLite); `rank` is the bm25 score, lower is more relevant
+products_fts = table(
+    "products_fts",
+    column("rowid"),
+    column("name"),
+    column("description"),
+    column("rank"),
+)
+
+# Generated tsvector column (PostgreSQL)
+search_vector = literal_column("products.search_vector")
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# A search value: a plain string or a bindparam() supplying it at execution
+SearchValue = Union[str, ColumnElement]
+
+
+def search_tokens(term: str) -> List[str]:
+    """Split user input into word tokens, dropping query syntax characters"""
+    return _TOKEN_PATTERN.findall(term.lower())
+
+
+def _fts5_query(tokens: List[str]) -> str:
+    """Every token must match as a prefix: "lap"* "pro"*"""
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def _tsquery(tokens: List[str]) -> str:
+    """Every token must match as a prefix: lap:* & pro:*"""
+    return " & ".join(f"{token}:*" for token in tokens)
+
+
+def search_query(dialect: str, term: str) -> Optional[str]:
+    """
+    Backend query string for a user search term: an FTS5 MATCH query on
+    SQLite, a tsquery on PostgreSQL, a LIKE pattern elsewhere.
+    
+    Returns:
+        The query string, or None if the term has no word characters (and
+        so matches nothing)
+    """
+    tokens = search_tokens(term)
+    if not tokens:
+        return None
+    if dialect == "sqlite":
+        return _fts5_query(tokens)
+    if dialect == "postgresql":
+        return _tsquery(tokens)
+    return f"%{term}%"
+
+
+def apply_search(query, dialect: str, query_string: SearchValue, entity=ProductModel):
+    """
+    Restrict a select() over `entity` to products matching a search_query().
+    
+    `query_string` may be a bindparam() so that one statement serves every
+    search term.
+    
+    On SQLite the matches are an `id IN (SELECT rowid ...)` list rather
+    than a join: joined, the planner walks products in index order (to
+    skip sorting) and runs the MATCH once per product, so a rare term
+    scanned the whole catalog.
+    """
+    if dialect == "sqlite":
+        matches = select(products_fts.c.rowid).where(literal_column("products_fts").op("MATCH")(query_string))
+        return query.where(entity.id.in_(matches))
+    if dialect == "postgresql":
+        return query.where(
+            search_vector.op("@@")(func.to_tsquery("simple", query_string))
+        )
+    return query.where(or_(entity.name.like(query_string), entity.description.like(query_string)))
+
+
+def join_search_rank(query, dialect: str, query_string: SearchValue, entity=ProductModel):
+    """
+    Make search_rank() available to a query built with apply_search().
+    
+    SQLite only scores rows of a query running the MATCH itself, so the
+    FTS table is joined. The unary + keeps the planner from probing it by
+    rowid once per product (a full MATCH each time): it scans the matches
+    and looks products up by primary key instead.
+    """
+    if dialect == "sqlite":
+        return query.join(products_fts, literal_column("+products_fts.rowid") == entity.id).where(
+            literal_column("products_fts").op("MATCH")(query_string)
+        )
+    return query
+
+
+def search_rank(dialect: str, query_string: SearchValue) -> Optional[Tuple[object, bool]]:
+    """
+    Relevance expression for a query built with apply_search() and
+    join_search_rank().
+    
+    Returns:
+        (expression, descending) or None if the backend cannot rank
+    """
+    if dialect == "sqlite":
+        return products_fts.c.rank, False
+    if dialect == "postgresql":
+        return func.ts_rank(search_vector, func.to_tsquery("simple", query_string)), True
+    return None
+
+
+def apply_fuzzy_search(query, term: SearchValue, entity=ProductModel):
+    """
+    Restrict a select() over `entity` to names similar to `term` (PostgreSQL).
+    
+    `term <% name` is true when word_similarity(term, name) reaches
+    pg_trgm.word_similarity_threshold and is answered from the trigram
+    GIN index; see set_fuzzy_threshold().
+    """
+    term = literal(term) if isinstance(term, str) else term
+    return query.where(term.op("<%")(entity.name))
+
+
+def fuzzy_rank(term: SearchValue, entity=ProductModel):
+    """Similarity of `term` to the product name, higher is better (PostgreSQL)"""
+    return func.word_similarity(term, entity.name)
+
+
+async def set_fuzzy_threshold(session: AsyncSession, threshold: float) -> None:
+    """Set pg_trgm's word similarity threshold for the current transaction"""
+    await session.execute(
+        select(func.set_config("pg_trgm.word_similarity_threshold", str(threshold), True))
+    )
+
+
+async def sync_search_entry(
+    session: AsyncSession,
+    product_id: int,
+    name: str,
+    description: Optional[str],
+    is_active: bool
+) -> None:
+    """
+    Mirror a product write into the SQLite FTS index.
+    
+    Inactive (soft deleted) products are removed from the index. Must run
+    inside the same transaction as the product write.
+    """
+    if session.get_bind().dialect.name != "sqlite":
+        return
+    await session.execute(delete(products_fts).where(products_fts.c.rowid == product_id))
+    if is_active:
+        await session.execute(
+            insert(products_fts).values(rowid=product_id, name=name, description=description or "")
+        )
+
+
+async def add_search_entries(
+    session: AsyncSession,
+    entries: List[Tuple[int, str, Optional[str]]]
+) -> None:
+    """
+    Add newly created products, as (id, name, description), to the SQLite
+    FTS index with a single executemany.
+    
+    Must run inside the same transaction as the product inserts.
+    """
+    if not entries or session.get_bind().dialect.name != "sqlite":
+        return
+    await session.execute(
+        insert(products_fts),
+        [
+            {"rowid": product_id, "name": name, "description": description or ""}
+            for product_id, name, description in entries
+        ]
+    )
+
+
+def create_search_index(conn) -> bool:
+    """
+    Create the search index structures if missing (sync, for run_sync).
+    
+    Returns:
+        True if the index was newly created and needs a rebuild
+    """
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'")
+        ).scalar()
+        if exists:
+            return False
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE products_fts USING fts5("
+            "name, description, tokenize = 'unicode61 remove_diacritics 2')"
+        ))
+        return True
+    if dialect == "postgresql":
+        conn.execute(text(
+            "ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            "GENERATED ALWAYS AS (to_tsvector('simple', "
+            "coalesce(name, '') || ' ' || coalesce(description, ''))) STORED"
+        ))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_products_search ON products USING GIN (search_vector)"
+        ))
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_products_name_trgm ON products "
+            "USING GIN (name gin_trgm_ops)"
+        ))
+    return False
+
+
+def rebuild_search_index(conn) -> None:
+    """Rebuild the search index from the products table (sync, for run_sync)"""
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        conn.execute(delete(products_fts))
+        conn.execute(
+            insert(products_fts).from_select(
+                ["rowid", "name", "description"],
+                select(
+                    ProductModel.id,
+                    ProductModel.name,
+                    func.coalesce(ProductModel.description, "")
+                ).where(ProductModel.is_active == True)
+            )
+        )
+        conn.execute(text("INSERT INTO products_fts(products_fts) VALUES ('optimize')"))
+    elif dialect == "postgresql":
+        conn.execute(text("REINDEX INDEX idx_products_search"))
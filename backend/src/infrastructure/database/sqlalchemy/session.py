@@ -1,70 +1,287 @@
 """
 SQLAlchemy session management
 """
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
-from typing import Generator
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from typing import Any, AsyncGenerator, Dict, Optional
+import asyncio
 import os
 
+from infrastructure.config.settings import Settings, get_settings
+from infrastructure.database.pool_monitor import InstrumentedQueuePool, PoolValidator, pool_stats
+from infrastructure.database.query_counter import install_query_counter
+from infrastructure.database.query_log import get_slow_query_log
+from infrastructure.database.sqlalchemy.replicas import ReadReplicas, parse_read_urls
+
 # Database URL from environment or default
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./ecommerce.db")
 
-# Create engine
-# For SQLite, use StaticPool to allow multiple connections
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(
-        DATABASE_URL,
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-        echo=False  # Set to True for SQL query logging
-    )
-else:
-    engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+# Async drivers used for each backend (aiosqlite for SQLite, asyncpg for PostgreSQL)
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def to_async_url(url: str) -> str:
+    """
+    Rewrite a database URL so it uses the async driver for its backend.
+    
+    URLs that already name an async driver, or backends without a known
+    async driver, are returned unchanged.
+    """
+    scheme, separator, rest = url.partition("://")
+    if scheme in ASYNC_DRIVERS.values():
+        return url
+    backend = scheme.split("+", 1)[0]
+    if backend not in ASYNC_DRIVERS:
+        return url
+    return f"{ASYNC_DRIVERS[backend]}{separator}{rest}"
+
+
+ASYNC_DATABASE_URL = to_async_url(DATABASE_URL)
+
+# Accepted values for the string PRAGMAs (interpolated into the statement)
+SQLITE_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SQLITE_SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+SQLITE_TEMP_STORES = {"DEFAULT", "FILE", "MEMORY"}
+
+
+def is_sqlite_memory_url(url: str) -> bool:
+    """True for in-memory SQLite URLs (sqlite://, sqlite:///:memory:)"""
+    database = url.partition("://")[2].lstrip("/")
+    return database in ("", ":memory:") or "mode=memory" in database
+
+
+def sqlite_pragmas(settings: Settings) -> Dict[str, object]:
+    """
+    PRAGMAs applied to every new SQLite connection, in order.
+    
+    journal_mode comes first: synchronous=NORMAL is only crash safe in WAL
+    mode, and busy_timeout must be set before the first statement that can
+    hit a lock.
+    
+    Raises:
+        ValueError: If a string setting is not a valid PRAGMA value
+    """
+    journal_mode = settings.SQLITE_JOURNAL_MODE.upper()
+    synchronous = settings.SQLITE_SYNCHRONOUS.upper()
+    temp_store = settings.SQLITE_TEMP_STORE.upper()
+    if journal_mode not in SQLITE_JOURNAL_MODES:
+        raise ValueError(f"Invalid SQLITE_JOURNAL_MODE: {settings.SQLITE_JOURNAL_MODE}")
+    if synchronous not in SQLITE_SYNCHRONOUS_MODES:
+        raise ValueError(f"Invalid SQLITE_SYNCHRONOUS: {settings.SQLITE_SYNCHRONOUS}")
+    if temp_store not in SQLITE_TEMP_STORES:
+        raise ValueError(f"Invalid SQLITE_TEMP_STORE: {settings.SQLITE_TEMP_STORE}")
+    return {
+        "journal_mode": journal_mode,
+        "busy_timeout": int(settings.SQLITE_BUSY_TIMEOUT_MS),
+        "synchronous": synchronous,
+        "cache_size": int(settings.SQLITE_CACHE_SIZE),
+        "mmap_size": int(settings.SQLITE_MMAP_SIZE),
+        "temp_store": temp_store,
+        "foreign_keys": "ON",
+    }
+
+
+def install_sqlite_pragmas(engine: AsyncEngine, pragmas: Dict[str, object]) -> None:
+    """Run `pragmas` on every connection the engine's pool opens"""
+    statements = [f"PRAGMA {name} = {value}" for name, value in pragmas.items()]
+    
+    @event.listens_for(engine.sync_engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+def create_engine_for(url: str, settings: Optional[Settings] = None) -> AsyncEngine:
+    """
+    Create the async engine for a database URL.
+    
+    Server databases get a pool sized from the DB_POOL_* settings. Idle
+    connections are checked by a PoolValidator in the background rather
+    than pinged on every checkout, unless the validation interval is 0.
+    
+    SQLite files get a queue pool of long-lived connections, each served by
+    its own aiosqlite thread, so with WAL readers run alongside the writer
+    instead of opening a fresh connection (and thread) per session as the
+    driver's default NullPool does. In-memory databases keep the driver's
+    single shared connection.
+    
+    Queue pools are InstrumentedQueuePool; see pool_stats().
+    
+    Args:
+        url: Database URL (sync or async driver)
+        settings: Engine tuning; defaults to get_settings()
+    """
+    settings = settings or get_settings()
+    async_url = to_async_url(url)
+    if not url.startswith("sqlite"):
+        return create_async_engine(
+            async_url,
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_VALIDATION_INTERVAL_SECONDS <= 0,
+        )
+    
+    options = {
+        "connect_args": {"check_same_thread": False},
+        "echo": False,  # Set to True for SQL query logging
+    }
+    if not is_sqlite_memory_url(url):
+        options.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.SQLITE_POOL_SIZE,
+            max_overflow=settings.SQLITE_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+    sqlite_engine = create_async_engine(async_url, **options)
+    install_sqlite_pragmas(sqlite_engine, sqlite_pragmas(settings))
+    return sqlite_engine
+
+
+# Create async engine
+# Queries are awaited on the event loop, so a slow statement no longer
+# blocks every other in-flight request on the worker
+engine = create_engine_for(DATABASE_URL)
+
+# Optional read replicas (DATABASE_READ_URLS) for product reads
+read_replicas = ReadReplicas(
+    [create_engine_for(url) for url in parse_read_urls(get_settings().DATABASE_READ_URLS)]
+)
+
+# Per-request statement counts and the slow query log cover every engine
+slow_query_log = get_slow_query_log()
+for instrumented_engine in [engine, *read_replicas.engines]:
+    install_query_counter(instrumented_engine.sync_engine)
+    if slow_query_log is not None:
+        slow_query_log.install(instrumented_engine.sync_engine)
+
+# Background validation of idle connections (server databases only; a
+# local SQLite file has no connection to lose)
+_validation_interval = get_settings().DB_POOL_VALIDATION_INTERVAL_SECONDS
+pool_validators = [
+    PoolValidator(server_engine, _validation_interval)
+    for server_engine in [engine, *read_replicas.engines]
+    if server_engine.dialect.name != "sqlite" and _validation_interval > 0
+]
 
 # Session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False keeps loaded attributes usable after commit
+# without triggering implicit (blocking) lazy loads
+AsyncSessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
 
 
-def get_db_session() -> Generator[Session, None, None]:
+async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency injection for database session.
-    Yields a session and ensures it's closed after use.
+    Yields an async session and ensures it's closed after use.
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+async def get_read_db_session() -> AsyncGenerator[Optional[AsyncSession], None]:
+    """
+    Dependency injection for a read replica session.
+    
+    Yields a session on the next replica in round-robin, or None when no
+    replicas are configured (reads then use the primary session).
+    """
+    if not read_replicas:
+        yield None
+        return
+    async with read_replicas.session() as db:
+        yield db
+
+
+def start_pool_validation() -> None:
+    """Start background pool validation (called on application startup)"""
+    for validator in pool_validators:
+        validator.start()
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Live statistics of the application's connection pool (and replicas')"""
+    stats = pool_stats(engine)
+    if read_replicas:
+        stats["replicas"] = [pool_stats(replica) for replica in read_replicas.engines]
+    return stats
+
+
+async def dispose_engine() -> None:
+    """Close all pooled connections (called on application shutdown)"""
+    for validator in pool_validators:
+        await validator.stop()
+    await engine.dispose()
+    await read_replicas.dispose()
 
 
 def init_database():
     """
     Initialize database tables.
     Creates all tables defined in models and inserts sample data.
+    
+    Synchronous entry point for scripts (main.py, docker-entrypoint.sh);
+    must not be called from inside a running event loop. Runs on its own
+    engine, disposed before that loop closes: the application's engine
+    must make its first connections on the server's event loop.
     """
+    asyncio.run(_init_database())
+
+
+async def _init_database():
+    """Async implementation of init_database()"""
+    init_engine = create_engine_for(DATABASE_URL)
+    try:
+        await _populate_database(init_engine)
+    finally:
+        # Connections are bound to this event loop; drop them before it closes
+        await init_engine.dispose()
+
+
+async def _populate_database(init_engine: AsyncEngine) -> None:
+    """Create missing tables and indexes, then insert sample data if empty"""
     from infrastructure.database.sqlalchemy.models import Base, ProductModel
-    from sqlalchemy import text
+    from infrastructure.database.sqlalchemy.migrations import run_migrations
+    from infrastructure.database.sqlalchemy.search import create_search_index, rebuild_search_index
+    from sqlalchemy import func, select
     
     # Create all tables
-    Base.metadata.create_all(bind=engine)
-    
-    # Enable foreign keys for SQLite
-    if DATABASE_URL.startswith("sqlite"):
-        with engine.connect() as conn:
-            conn.execute(text("PRAGMA foreign_keys = ON"))
-            conn.commit()
+    async with init_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        # Bring tables created by older versions up to date
+        await conn.run_sync(run_migrations)
+        # create_all skips existing tables, so add indexes introduced later
+        for index in ProductModel.__table__.indexes:
+            await conn.run_sync(index.create, checkfirst=True)
+        # Full-text search index, populated from existing rows when new
+        if await conn.run_sync(create_search_index):
+            await conn.run_sync(rebuild_search_index)
     
     # Insert sample data if table is empty
-    session = SessionLocal()
+    session = async_sessionmaker(bind=init_engine, class_=AsyncSession, expire_on_commit=False)()
     try:
-        count = session.query(ProductModel).count()
+        count = await session.scalar(select(func.count()).select_from(ProductModel))
         if count == 0:
             print("📦 Inserting sample products...")
             sample_products = [
                 ProductModel(
                     name="Laptop HP Pavilion",
-                    price=899.99,
+                    price_cents=89999,
                     stock=10,
                     category="Electronics",
                     description="High performance laptop perfect for work and entertainment",
@@ -72,7 +289,7 @@ def init_database():
                 ),
                 ProductModel(
                     name="iPhone 15 Pro",
-                    price=999.99,
+                    price_cents=99999,
                     stock=5,
                     category="Electronics",
                     description="Latest iPhone model with advanced camera system",
@@ -80,7 +297,7 @@ def init_database():
                 ),
                 ProductModel(
                     name="Coffee Maker Deluxe",
-                    price=159.99,
+                    price_cents=15999,
                     stock=15,
                     category="Home",
                     description="Premium coffee maker for the perfect morning brew",
@@ -88,7 +305,7 @@ def init_database():
                 ),
                 ProductModel(
                     name="Running Shoes Pro",
-                    price=129.99,
+                    price_cents=12999,
                     stock=20,
                     category="Sports",
                     description="Comfortable running shoes for professional athletes",
@@ -96,7 +313,7 @@ def init_database():
                 ),
                 ProductModel(
                     name="Wireless Headphones",
-                    price=79.99,
+                    price_cents=7999,
                     stock=25,
                     category="Electronics",
                     description="Premium sound quality with noise cancellation",
@@ -104,7 +321,7 @@ def init_database():
                 ),
                 ProductModel(
                     name="Smart Watch",
-                    price=249.99,
+                    price_cents=24999,
                     stock=12,
                     category="Electronics",
                     description="Track your fitness and stay connected",
@@ -112,8 +329,34 @@ def init_database():
                 ),
             ]
             session.add_all(sample_products)
-            session.commit()
+            await session.commit()
+            async with init_engine.begin() as conn:
+                await conn.run_sync(rebuild_search_index)
             print(f"✅ Inserted {len(sample_products)} sample products")
     finally:
-        session.close()
+        await session.close()
+
 
+def rebuild_search_index():
+    """
+    Rebuild the product full-text search index from the products table.
+    
+    Use after bulk loads that bypass the repository, or if the index is
+    suspected to be out of sync:
+        python -c "from infrastructure.database.sqlalchemy.session import rebuild_search_index; rebuild_search_index()"
+    """
+    asyncio.run(_rebuild_search_index())
+
+
+async def _rebuild_search_index():
+    """Async implementation of rebuild_search_index()"""
+    from infrastructure.database.sqlalchemy import search
+    
+    rebuild_engine = create_engine_for(DATABASE_URL)
+    try:
+        async with rebuild_engine.begin() as conn:
+            await conn.run_sync(search.create_search_index)
+            await conn.run_sync(search.rebuild_search_index)
+    finally:
+        # Same as init_database(): never touch the application's engine here
+        await rebuild_engine.dispose()
@@ -0,0 +1,88 @@
+"""
+Cache of parameterized SQL statements keyed by query shape
+"""
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, Hashable, Optional
+from infrastructure.config.settings import get_settings
+
+
+class StatementCache:
+    """
+    Bounded LRU cache of prebuilt select() statements.
+    
+    A statement is built once per query shape (which filters are present,
+    sort order, projection, pagination mode, dialect) with bindparam()
+    placeholders for every value, and then executed with per-request bind
+    values. Besides skipping statement construction, a reused statement
+    object memoizes its SQLAlchemy cache key, so the compiled SQL is found
+    in the engine's compiled cache without re-walking the expression tree.
+    
+    Statements are immutable and shared by every repository in the process.
+    Hits and misses are counted per query kind (list, count, ...).
+    """
+    
+    def __init__(self, max_entries: int):
+        """
+        Initialize cache.
+        
+        Args:
+            max_entries: Maximum number of statements kept (0 disables caching)
+        """
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits: Dict[str, int] = defaultdict(int)
+        self.misses: Dict[str, int] = defaultdict(int)
+    
+    def get_or_build(self, kind: str, shape: Hashable, build: Callable[[], Any]) -> Any:
+        """
+        Return the statement for (kind, shape), building it on a miss.
+        
+        Args:
+            kind: Query kind, used for per-kind statistics
+            shape: Everything the statement's SQL depends on (not bind values)
+            build: Builds the statement
+        """
+        key = (kind, shape)
+        statement = self._entries.get(key)
+        if statement is not None:
+            self._entries.move_to_end(key)
+            self.hits[kind] += 1
+            return statement
+        self.misses[kind] += 1
+        statement = build()
+        if self._max_entries > 0:
+            self._entries[key] = statement
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return statement
+    
+    def stats(self) -> Dict[str, Any]:
+        """Entry count and hit rate per query kind"""
+        kinds = {}
+        for kind in sorted(set(self.hits) | set(self.misses)):
+            hits, misses = self.hits[kind], self.misses[kind]
+            kinds[kind] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 4),
+            }
+        return {"entries": len(self._entries), "max_entries": self._max_entries, "kinds": kinds}
+
+
+# Singleton instance
+_statement_cache_instance: Optional[StatementCache] = None
+
+
+def get_statement_cache() -> StatementCache:
+    """
+    Get singleton cache for repository statements.
+    
+    Returns:
+        StatementCache instance configured from settings
+    """
+    global _statement_cache_instance
+    if _statement_cache_instance is None:
+        _statement_cache_instance = StatementCache(
+            max_entries=get_settings().STATEMENT_CACHE_MAX_ENTRIES
+        )
+    return _statement_cache_instance
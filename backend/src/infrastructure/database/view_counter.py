@@ -0,0 +1,272 @@
+"""
+Write-coalescing product view counter
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from infrastructure.config.settings import get_settings
+from infrastructure.database.sqlalchemy.repositories.product_repository_impl import ProductRepositoryImpl
+from infrastructure.database.sqlalchemy.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Journal file of one process, views-<pid>.json, or one being claimed by
+# another process, views-<pid>.json.claimed-<claimer pid>
+_JOURNAL_NAME = re.compile(r"^views-(\d+)\.json(?:\.claimed-(\d+))?$")
+
+
+def _process_alive(pid: int) -> bool:
+    """True if a process with this ID runs (always assumed elsewhere than POSIX)"""
+    if os.name != "posix":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ViewCounter:
+    """
+    Aggregate product page views in memory and write them in batches.
+    
+    increment() only adds to a dict, so a page view costs no database
+    write. Every `flush_seconds`, or as soon as `flush_threshold` products
+    have buffered views, the deltas are written by
+    ProductRepositoryImpl.record_views(): chunked upserts into
+    product_counters and one UPDATE of products.popularity.
+    
+    Every `journal_seconds` the unwritten deltas are snapshotted to a local
+    journal (views-<pid>.json in `journal_dir`, replaced atomically), so a
+    crash loses at most that interval of views. On start the journals of
+    processes that no longer run are claimed and their views flushed with
+    the next batch. A crash between a flush's commit and the journal
+    rewrite that follows counts that batch twice.
+    """
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        flush_seconds: float,
+        flush_threshold: int,
+        journal_seconds: float,
+        journal_dir: Optional[str] = None
+    ):
+        """
+        Initialize counter.
+        
+        Args:
+            session_factory: Creates sessions on the primary database
+            flush_seconds: Seconds between database flushes
+            flush_threshold: Buffered products that trigger an early flush
+            journal_seconds: Seconds between journal snapshots
+            journal_dir: Directory of the local journals (no journal if None)
+        """
+        self._session_factory = session_factory
+        self._flush_seconds = flush_seconds
+        self._flush_threshold = flush_threshold
+        self._journal_seconds = journal_seconds
+        self._journal_dir = journal_dir
+        self._journal_path = os.path.join(journal_dir, f"views-{os.getpid()}.json") if journal_dir else None
+        self._pending: Dict[int, int] = {}
+        self._in_flight: Dict[int, int] = {}
+        self._journal_stale = False
+        self._threshold_reached = asyncio.Event()
+        self._next_flush = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self.flushes = 0
+        self.flushed_views = 0
+        self.recovered_views = 0
+    
+    def increment(self, product_id: int, count: int = 1) -> None:
+        """Count `count` views of a product"""
+        self._pending[product_id] = self._pending.get(product_id, 0) + count
+        self._journal_stale = True
+        if len(self._pending) >= self._flush_threshold:
+            self._threshold_reached.set()
+    
+    def pending(self) -> Dict[int, int]:
+        """Views not yet committed to the database (buffered or being flushed)"""
+        unwritten = dict(self._in_flight)
+        for product_id, count in self._pending.items():
+            unwritten[product_id] = unwritten.get(product_id, 0) + count
+        return unwritten
+    
+    async def flush(self) -> int:
+        """
+        Write the buffered views to the database, then update the journal.
+        
+        On failure the views go back into the buffer for the next flush.
+        
+        Returns:
+            Number of views written
+        """
+        self._next_flush = time.monotonic() + self._flush_seconds
+        if not self._pending:
+            return 0
+        self._in_flight, self._pending = self._pending, {}
+        try:
+            async with self._session_factory() as session:
+                await ProductRepositoryImpl(session).record_views(self._in_flight)
+        except Exception:
+            for product_id, count in self._in_flight.items():
+                self._pending[product_id] = self._pending.get(product_id, 0) + count
+            raise
+        finally:
+            batch, self._in_flight = self._in_flight, {}
+        written = sum(batch.values())
+        self.flushes += 1
+        self.flushed_views += written
+        self._journal_stale = True
+        await self.write_journal()
+        return written
+    
+    async def write_journal(self) -> None:
+        """Snapshot the unwritten views to the journal, if they changed since the last one"""
+        if self._journal_path is None or not self._journal_stale:
+            return
+        self._journal_stale = False
+        await asyncio.to_thread(self._write_journal_file, self.pending())
+    
+    def _write_journal_file(self, views: Dict[int, int]) -> None:
+        """Replace the journal with `views` (write, fsync, rename); remove it when empty"""
+        if not views:
+            if os.path.exists(self._journal_path):
+                os.unlink(self._journal_path)
+            return
+        temporary_path = f"{self._journal_path}.tmp"
+        with open(temporary_path, "w") as journal:
+            json.dump({str(product_id): count for product_id, count in views.items()}, journal)
+            journal.flush()
+            os.fsync(journal.fileno())
+        os.replace(temporary_path, self._journal_path)
+    
+    def recover(self) -> int:
+        """
+        Claim this process's journal and those of processes that no longer
+        run, and buffer their views for the next flush.
+        
+        A journal is claimed by renaming it, so two starting workers never
+        both take the same one.
+        
+        Returns:
+            Number of views recovered
+        """
+        if self._journal_dir is None:
+            return 0
+        os.makedirs(self._journal_dir, exist_ok=True)
+        recovered = 0
+        claimed = []
+        for name in sorted(os.listdir(self._journal_dir)):
+            match = _JOURNAL_NAME.match(name)
+            if match is None:
+                continue
+            pid = int(match.group(2) or match.group(1))  # The claimer owns a claimed journal
+            if pid != os.getpid() and _process_alive(pid):
+                continue
+            path = os.path.join(self._journal_dir, name)
+            claimed_path = f"{path.split('.claimed-')[0]}.claimed-{os.getpid()}"
+            try:
+                os.rename(path, claimed_path)
+            except FileNotFoundError:
+                continue  # Claimed by another worker
+            try:
+                with open(claimed_path) as journal:
+                    views = json.load(journal)
+            except (OSError, ValueError):
+                logger.exception("Unreadable view counter journal %s", claimed_path)
+                continue
+            for product_id, count in views.items():
+                self.increment(int(product_id), int(count))
+                recovered += int(count)
+            claimed.append(claimed_path)
+        if claimed:
+            # The views are in our journal before the claimed ones go
+            self._journal_stale = True
+            self._write_journal_file(self.pending())
+            for path in claimed:
+                os.unlink(path)
+            logger.info("Recovered %d buffered product view(s) from %d journal(s)", recovered, len(claimed))
+        self.recovered_views += recovered
+        return recovered
+    
+    def start(self) -> None:
+        """Recover journals and start the background task on the running event loop"""
+        if self._task is None:
+            self.recover()
+            self._next_flush = time.monotonic() + self._flush_seconds
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Cancel the background task, then flush what is left"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Final view counter flush failed")
+            await self.write_journal()
+    
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._threshold_reached.wait(), self._journal_seconds)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                if self._threshold_reached.is_set() or time.monotonic() >= self._next_flush:
+                    self._threshold_reached.clear()
+                    await self.flush()
+                else:
+                    await self.write_journal()
+            except Exception:
+                logger.exception("View counter flush failed")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring"""
+        return {
+            "buffered_products": len(self._pending),
+            "buffered_views": sum(self._pending.values()),
+            "flushes": self.flushes,
+            "flushed_views": self.flushed_views,
+            "recovered_views": self.recovered_views,
+        }
+
+
+# Singleton instance (one buffer per process)
+_view_counter_instance: Optional[ViewCounter] = None
+
+
+def get_view_counter() -> ViewCounter:
+    """
+    Get singleton view counter for this process.
+    
+    Returns:
+        ViewCounter instance configured from settings, on the primary database
+    """
+    global _view_counter_instance
+    if _view_counter_instance is None:
+        settings = get_settings()
+        _view_counter_instance = ViewCounter(
+            AsyncSessionLocal,
+            flush_seconds=settings.VIEW_COUNTER_FLUSH_SECONDS,
+            flush_threshold=settings.VIEW_COUNTER_FLUSH_THRESHOLD,
+            journal_seconds=settings.VIEW_COUNTER_JOURNAL_SECONDS,
+            journal_dir=settings.VIEW_COUNTER_JOURNAL_DIR or None
+        )
+    return _view_counter_instance
@@ -0,0 +1,201 @@
+"""
+In-process trigram index for typo-tolerant product name search
+
+Used on SQLite, which has no trigram index of its own (PostgreSQL uses
+pg_trgm instead). Trigrams follow pg_trgm: each lower-cased word is padded
+with two leading spaces and one trailing space, so "shoe" yields
+"  s", " sh", "sho", "hoe", "oe ".
+"""
+import asyncio
+import logging
+import math
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from infrastructure.config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def trigrams(text: str) -> Set[str]:
+    """Extract the pg_trgm-style trigram set of a text"""
+    result = set()
+    for word in _WORD_PATTERN.findall(text.lower()):
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            result.add(padded[i:i + 3])
+    return result
+
+
+class TrigramIndex:
+    """
+    Trigram posting lists (trigram -> product IDs) over product names.
+    
+    Similarity is the fraction of the query's trigrams found in the name,
+    like pg_trgm's word_similarity, so "hedphones" still finds
+    "Wireless Headphones". Candidate generation uses prefix filtering: a
+    name reaching the threshold must appear in at least one of the
+    (|query| - needed + 1) shortest posting lists, so only those lists are
+    scanned and the rest are used for membership checks. Work depends on
+    how selective the query's trigrams are, not on the catalog size.
+    
+    refresh() rebuilds the index in a worker thread; searches use the
+    previous contents until the new ones are swapped in.
+    """
+    
+    def __init__(self, refresh_seconds: float = 300):
+        """
+        Initialize an empty index.
+        
+        Args:
+            refresh_seconds: Age after which needs_refresh() asks for a
+                reload (picks up writes made by other processes)
+        """
+        self._refresh_seconds = refresh_seconds
+        self._postings: Dict[str, Set[int]] = {}
+        self._entries: Dict[int, Tuple[str, ...]] = {}
+        self._loaded_at: Optional[float] = None
+        self._rebuild: Optional[asyncio.Task] = None
+        # add()/remove() calls made while a rebuild runs, replayed on its result
+        self._replay: Optional[List[Tuple[int, Optional[str]]]] = None
+    
+    def __len__(self) -> int:
+        """Number of indexed products"""
+        return len(self._entries)
+    
+    @property
+    def loaded(self) -> bool:
+        """Whether the index has contents to serve"""
+        return self._loaded_at is not None
+    
+    def needs_refresh(self) -> bool:
+        """Whether the index was never loaded or is older than the refresh interval, and no rebuild is running"""
+        if self._rebuild is not None:
+            return False
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self._refresh_seconds
+    
+    def load(self, rows: Iterable[Tuple[int, str]]) -> None:
+        """Replace the index contents with (product_id, name) rows"""
+        self._postings, self._entries = self._build(rows)
+        self._loaded_at = time.monotonic()
+    
+    def refresh(self, rows: List[Tuple[int, str]]) -> asyncio.Task:
+        """
+        Rebuild the index from (product_id, name) rows off the event loop.
+        
+        Returns:
+            The rebuild task; await it when the index is not loaded yet,
+            otherwise searches keep using the current contents meanwhile
+        """
+        self._replay = []
+        self._rebuild = asyncio.create_task(self._run_rebuild(rows))
+        return self._rebuild
+    
+    async def _run_rebuild(self, rows: List[Tuple[int, str]]) -> None:
+        try:
+            postings, entries = await asyncio.to_thread(self._build, rows)
+            replay, self._replay = self._replay, None
+            self._postings, self._entries = postings, entries
+            for product_id, name in replay:
+                if name is None:
+                    self.remove(product_id)
+                else:
+                    self.add(product_id, name)
+            self._loaded_at = time.monotonic()
+        except Exception:
+            logger.exception("Trigram index rebuild failed")
+            raise
+        finally:
+            self._rebuild = None
+            self._replay = None
+    
+    @staticmethod
+    def _build(rows: Iterable[Tuple[int, str]]) -> Tuple[Dict[str, Set[int]], Dict[int, Tuple[str, ...]]]:
+        """Posting lists and entries for (product_id, name) rows"""
+        index = TrigramIndex()
+        for product_id, name in rows:
+            index.add(product_id, name)
+        return index._postings, index._entries
+    
+    def add(self, product_id: int, name: str) -> None:
+        """Index (or re-index) a product name"""
+        if self._replay is not None:
+            self._replay.append((product_id, name))
+        self._discard(product_id)
+        grams = tuple(trigrams(name))
+        self._entries[product_id] = grams
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(product_id)
+    
+    def remove(self, product_id: int) -> None:
+        """Drop a product from the index (no-op if absent)"""
+        if self._replay is not None:
+            self._replay.append((product_id, None))
+        self._discard(product_id)
+    
+    def _discard(self, product_id: int) -> None:
+        grams = self._entries.pop(product_id, None)
+        if not grams:
+            return
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(product_id)
+                if not posting:
+                    del self._postings[gram]
+    
+    def search(self, query: str, threshold: float = 0.3, limit: int = 1000) -> List[Tuple[int, float]]:
+        """
+        Find names similar to query.
+        
+        Args:
+            query: User input, possibly misspelled
+            threshold: Minimum similarity (0-1)
+            limit: Maximum number of results
+        
+        Returns:
+            (product_id, similarity) pairs, most similar first
+        """
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+        
+        needed = max(1, math.ceil(threshold * len(query_grams)))
+        postings = sorted(
+            (self._postings.get(gram, set()) for gram in query_grams),
+            key=len
+        )
+        probe = postings[:len(query_grams) - needed + 1]
+        candidates = set().union(*probe)
+        
+        scored = []
+        for product_id in candidates:
+            shared = sum(1 for posting in postings if product_id in posting)
+            similarity = shared / len(query_grams)
+            if similarity >= threshold:
+                # Prefer names with fewer unrelated trigrams on ties
+                jaccard = shared / (len(query_grams) + len(self._entries[product_id]) - shared)
+                scored.append((-similarity, -jaccard, product_id))
+        scored.sort()
+        
+        return [(product_id, -similarity) for similarity, _, product_id in scored[:limit]]
+
+
+# Singleton instance
+_trigram_index_instance: Optional[TrigramIndex] = None
+
+
+def get_trigram_index() -> TrigramIndex:
+    """
+    Get singleton trigram index for this process.
+    
+    Returns:
+        TrigramIndex instance configured from settings
+    """
+    global _trigram_index_instance
+    if _trigram_index_instance is None:
+        settings = get_settings()
+        _trigram_index_instance = TrigramIndex(refresh_seconds=settings.TRIGRAM_INDEX_REFRESH_SECONDS)
+    return _trigram_index_instance
@@ -1,17 +1,41 @@
 """
 Dependency injection for FastAPI
 """
-from fastapi import Depends
-from sqlalchemy.orm import Session
-from infrastructure.database.sqlalchemy.session import get_db_session
+import math
+import time
+from typing import Optional
+from fastapi import Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from infrastructure.config.settings import get_settings
+from infrastructure.database.sqlalchemy.session import get_db_session, get_read_db_session
 from domain.repositories.product_repository import ProductRepository
+from infrastructure.cache.result_cache import get_count_cache
+from infrastructure.database.hold_sweeper import get_hold_sweeper
+from infrastructure.database.statement_cache import get_statement_cache
+from infrastructure.search.trigram_index import get_trigram_index
 from infrastructure.database.sqlalchemy.repositories.product_repository_impl import (
     ProductRepositoryImpl
 )
 
 
+# Cookie holding the time (epoch seconds) until which a client that wrote
+# reads from the primary; a cookie works across workers without shared state
+READ_YOUR_WRITES_COOKIE = "primary_reads_until"
+
+
+def _reads_pinned_to_primary(request: Request) -> bool:
+    """True if the client wrote within the read-your-writes window"""
+    try:
+        return float(request.cookies.get(READ_YOUR_WRITES_COOKIE, "0")) > time.time()
+    except ValueError:
+        return False
+
+
 def get_product_repository(
-    session: Session = Depends(get_db_session)
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_db_session),
+    read_session: Optional[AsyncSession] = Depends(get_read_db_session)
 ) -> ProductRepository:
     """
     Dependency injection: Returns ProductRepository implementation.
@@ -19,11 +43,42 @@ def get_product_repository(
     This function is used by FastAPI's dependency injection system.
     Can be easily swapped for a different implementation (e.g., for testing).
     
+    With read replicas configured, reads go to a replica unless the client
+    wrote within READ_YOUR_WRITES_SECONDS; every write (re)starts that
+    window through a cookie on the response.
+    
     Args:
-        session: Database session (injected by FastAPI)
+        request: Incoming request (read-your-writes cookie)
+        response: Outgoing response (injected by FastAPI)
+        session: Async database session (injected by FastAPI)
+        read_session: Read replica session, None without replicas
     
     Returns:
         ProductRepository implementation
     """
-    return ProductRepositoryImpl(session)
+    on_write = None
+    window = get_settings().READ_YOUR_WRITES_SECONDS
+    if read_session is not None:
+        if _reads_pinned_to_primary(request):
+            read_session = None
+        
+        def on_write() -> None:
+            if window > 0:
+                response.set_cookie(
+                    READ_YOUR_WRITES_COOKIE,
+                    f"{time.time() + window:.3f}",
+                    max_age=math.ceil(window),
+                    httponly=True,
+                    samesite="lax"
+                )
+    
+    return ProductRepositoryImpl(
+        session,
+        count_cache=get_count_cache(),
+        trigram_index=get_trigram_index(),
+        read_session=read_session,
+        on_write=on_write,
+        statement_cache=get_statement_cache(),
+        on_hold=get_hold_sweeper().track
+    )
 
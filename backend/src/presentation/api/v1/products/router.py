@@ -2,26 +2,57 @@
 Products API router - Presentation layer
 Only handles HTTP concerns, delegates to use cases
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query
+from fastapi.responses import Response
+from pydantic_core import to_json
 from typing import Optional
 from decimal import Decimal
 
 from application.use_cases.products.create_product import CreateProductUseCase
+from application.use_cases.products.bulk_create_products import BulkCreateProductsUseCase
 from application.use_cases.products.get_product import GetProductUseCase
-from application.use_cases.products.list_products import ListProductsUseCase
+from application.use_cases.products.get_products import GetProductsUseCase
+from application.use_cases.products.get_product_facets import GetProductFacetsUseCase
+from application.use_cases.products.list_products import PRODUCT_FIELDS, ListProductsUseCase
 from application.use_cases.products.update_product import UpdateProductUseCase
+from application.use_cases.products.reserve_stock import ReserveStockUseCase
+from application.use_cases.products.checkout import CheckoutUseCase
+from application.use_cases.products.set_stock_shards import SetStockShardsUseCase
+from application.use_cases.products.hold_stock import HoldStockUseCase
+from application.use_cases.products.confirm_stock_hold import ConfirmStockHoldUseCase
+from application.use_cases.products.release_stock_hold import ReleaseStockHoldUseCase
 from application.use_cases.products.delete_product import DeleteProductUseCase
 from application.dto.product_dto import (
+    BulkCreateProductsDTO,
+    BulkCreateResponseDTO,
+    CheckoutDTO,
+    CheckoutErrorDTO,
+    CheckoutResponseDTO,
     CreateProductDTO,
     UpdateProductDTO,
     ProductResponseDTO,
     ProductListResponseDTO,
-    ProductFiltersDTO
+    ProductFacetsDTO,
+    ProductFiltersDTO,
+    ReserveStockDTO,
+    StockHoldDTO,
+    StockHoldRequestDTO,
+    StockReservationDTO,
+    StockShardsDTO
 )
 from domain.repositories.product_repository import ProductRepository
-from domain.exceptions.product_exceptions import ProductNotFoundError
+from domain.exceptions.product_exceptions import (
+    InsufficientStock,
+    InvalidStockOperation,
+    ProductNotFoundError,
+    ProductVersionConflict,
+    StockHoldNotFoundError,
+    StockUnavailable
+)
+from infrastructure.config.settings import get_settings
+from infrastructure.database.view_counter import get_view_counter
 from presentation.api.dependencies import get_product_repository
+from presentation.middleware.query_budget import query_budget
 
 router = APIRouter(prefix="/products", tags=["Products"])
 
@@ -33,15 +64,47 @@ def _entity_to_response_dto(product) -> ProductResponseDTO:
         name=product.name,
         price=product.price.value,
         stock=product.stock.value,
+        held_stock=product.stock.held,
         category=product.category,
         description=product.description,
         is_active=product.is_active,
         created_at=product.created_at,
-        updated_at=product.updated_at
+        updated_at=product.updated_at,
+        version=product.version,
+        popularity=product.popularity
     )
 
 
-@router.post("/", status_code=status.HTTP_201_CREATED, response_model=ProductResponseDTO)
+def _etag(version: int) -> str:
+    """ETag of a product version"""
+    return f'"{version}"'
+
+
+def _parse_if_match(value: str) -> Optional[int]:
+    """
+    Version required by an If-Match header: "3" or W/"3"; None for *.
+    
+    Raises:
+        ValueError: If the header does not name a single product version
+    """
+    value = value.strip()
+    if value == "*":
+        return None
+    if value.startswith("W/"):
+        value = value[2:]
+    if len(value) < 3 or value[0] != '"' or value[-1] != '"' or not value[1:-1].isdigit():
+        raise ValueError("If-Match must be a single product ETag")
+    return int(value[1:-1])
+
+
+# Query budgets: statements on each route's longest path (bulk create and
+# checkout scale with the number of items and have none)
+@router.post(
+    "/",
+    status_code=status.HTTP_201_CREATED,
+    response_model=ProductResponseDTO,
+    dependencies=[Depends(query_budget(4))]  # INSERT, search index sync, reload
+)
 async def create_product(
     dto: CreateProductDTO,
     repository: ProductRepository = Depends(get_product_repository)
@@ -68,18 +131,154 @@ async def create_product(
         )
 
 
-@router.get("/{product_id}", response_model=ProductResponseDTO)
+@router.post("/bulk", status_code=status.HTTP_201_CREATED, response_model=BulkCreateResponseDTO)
+async def bulk_create_products(
+    dto: BulkCreateProductsDTO,
+    repository: ProductRepository = Depends(get_product_repository)
+):
+    """
+    Create many products in one request.
+    
+    Each item is validated independently: invalid items are listed in
+    `errors` (by position) and all valid items are inserted in a single
+    transaction. Fails with 400 if no item is valid.
+    """
+    use_case = BulkCreateProductsUseCase(repository, max_items=get_settings().BULK_CREATE_MAX_ITEMS)
+    
+    try:
+        result = await use_case.execute(dto.items)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+    
+    if not result["items"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"message": "No valid products to create", "errors": result["errors"]}
+        )
+    
+    return BulkCreateResponseDTO(
+        created=len(result["items"]),
+        ids=[product.id for product in result["items"]],
+        errors=result["errors"]
+    )
+
+
+@router.post("/checkout", response_model=CheckoutResponseDTO)
+async def checkout(
+    dto: CheckoutDTO,
+    repository: ProductRepository = Depends(get_product_repository)
+):
+    """
+    Take the stock of a whole basket in one transaction.
+    
+    Either every line is supplied or nothing is taken: fails with 400 and
+    the failing lines in `errors` (missing product or insufficient stock).
+    """
+    use_case = CheckoutUseCase(repository, max_lines=get_settings().CHECKOUT_MAX_LINES)
+    
+    try:
+        return await use_case.execute(dto.items)
+    except StockUnavailable as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "message": str(e),
+                "errors": [
+                    CheckoutErrorDTO(product_id=product_id, error=str(error)).model_dump()
+                    for product_id, error in e.failures.items()
+                ]
+            }
+        )
+    except (ValueError, InvalidStockOperation) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.get(
+    "/facets",
+    response_model=ProductFacetsDTO,
+    dependencies=[Depends(query_budget(2))]  # Trigram index load, grouped facet query
+)
+async def get_product_facets(
+    category: Optional[str] = Query(None, description="Filter by category"),
+    min_price: Optional[Decimal] = Query(None, ge=0, description="Minimum price"),
+    max_price: Optional[Decimal] = Query(None, ge=0, description="Maximum price"),
+    search: Optional[str] = Query(None, description="Full-text search in product name and description"),
+    fuzzy: bool = Query(False, description="Typo-tolerant search on product name, ranked by similarity"),
+    is_active: Optional[bool] = Query(None, description="Filter by active status"),
+    repository: ProductRepository = Depends(get_product_repository)
+):
+    """
+    Facet counts for a product listing: takes the same filters as GET /products.
+    
+    Category counts ignore the `category` filter (so the sidebar can offer
+    the other categories); the total, price ranges and in-stock count
+    apply every filter. Results are cached per filter combination until
+    the next product write.
+    """
+    filters = ProductFiltersDTO(
+        category=category,
+        min_price=min_price,
+        max_price=max_price,
+        search=search,
+        fuzzy=fuzzy,
+        is_active=is_active
+    )
+    
+    try:
+        price_edges = [
+            Decimal(edge.strip()) for edge in get_settings().FACET_PRICE_EDGES.split(",") if edge.strip()
+        ]
+        use_case = GetProductFacetsUseCase(repository, price_edges)
+        return await use_case.execute(filters)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.get(
+    "/{product_id}",
+    response_model=ProductResponseDTO,
+    dependencies=[Depends(query_budget(2))]  # Product, shard stock SUM if sharded
+)
 async def get_product(
     product_id: int,
+    response: Response,
     repository: ProductRepository = Depends(get_product_repository)
 ):
     """
     Get a single product by ID.
+    
+    The ETag header carries the product's version, for If-Match on updates.
+    Each call counts as a page view towards the product's popularity.
     """
-    use_case = GetProductUseCase(repository)
+    use_case = GetProductUseCase(repository, on_view=get_view_counter().increment)
     
     try:
         product = await use_case.execute(product_id)
+        response.headers["ETag"] = _etag(product.version)
         return _entity_to_response_dto(product)
     except ValueError as e:
         raise HTTPException(
@@ -98,20 +297,117 @@ async def get_product(
         )
 
 
-@router.get("/", response_model=ProductListResponseDTO)
+def _product_list_response(result: dict) -> Response:
+    """
+    Encode a listing whose items are field dicts (read-only path).
+    
+    Rows come straight from the database, so they skip entity and
+    response model validation and are encoded in one pass by pydantic's
+    serializer (Decimal as string, datetime as ISO 8601, like
+    ProductListResponseDTO).
+    """
+    payload = {
+        "items": result["items"],
+        "total": result["total"],
+        "total_mode": result["total_mode"],
+        "page": result["page"],
+        "limit": result["limit"],
+        "total_pages": result["total_pages"],
+        "has_more": result["has_more"],
+        "next_cursor": result["next_cursor"],
+    }
+    return Response(to_json(payload), media_type="application/json")
+
+
+def _parse_ids(ids: str) -> list[int]:
+    """Parse "1,2,3" into product IDs"""
+    try:
+        return [int(value) for value in ids.split(",") if value.strip()]
+    except ValueError:
+        raise ValueError("ids must be a comma-separated list of integers")
+
+
+async def _get_products_by_ids(ids: str, repository: ProductRepository) -> ProductListResponseDTO:
+    """Handle GET /products?ids=..."""
+    use_case = GetProductsUseCase(repository)
+    
+    try:
+        product_ids = _parse_ids(ids)
+        products = await use_case.execute(product_ids)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+    
+    return ProductListResponseDTO(
+        items=[_entity_to_response_dto(product) for product in products],
+        total=len(products),
+        total_mode="exact",
+        page=None,  # Not paginated, like cursor pages
+        limit=len(product_ids),
+        total_pages=None
+    )
+
+
+@router.get(
+    "/",
+    response_model=ProductListResponseDTO,
+    # Estimate (2 on SQLite) or trigram index load, page, shard stock SUM or count past the end
+    dependencies=[Depends(query_budget(4))]
+)
 async def list_products(
     category: Optional[str] = Query(None, description="Filter by category"),
     min_price: Optional[Decimal] = Query(None, ge=0, description="Minimum price"),
     max_price: Optional[Decimal] = Query(None, ge=0, description="Maximum price"),
-    search: Optional[str] = Query(None, description="Search in product name"),
+    search: Optional[str] = Query(None, description="Full-text search in product name and description"),
+    fuzzy: bool = Query(False, description="Typo-tolerant search on product name, ranked by similarity"),
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
+    ids: Optional[str] = Query(
+        None,
+        description="Comma-separated product IDs to fetch in one call "
+                    "(other filters and pagination are ignored)"
+    ),
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(20, ge=1, le=100, description="Items per page"),
+    sort: Optional[str] = Query(
+        None,
+        description="Sort order: id, price, name, popularity (prefix '-' for descending) or relevance "
+                    "(default: relevance when searching, id otherwise)"
+    ),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page"),
+    include_total: bool = Query(True, description="Count all matches (false skips the count)"),
+    total_mode: str = Query("exact", description="Total computation: exact or estimate"),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return, e.g. id,name,price (default: all)"
+    ),
     repository: ProductRepository = Depends(get_product_repository)
 ):
     """
     List products with optional filters and pagination.
+    
+    Deep pages should be fetched with `cursor` (keyset pagination):
+    its cost does not grow with the page number, unlike `page`.
+    Clients that only need "load more" can pass `include_total=false`
+    to skip counting and rely on `has_more`. `total_mode=estimate` returns
+    a statistics-based total for unfiltered or category-only queries;
+    the response's `total_mode` tells which one was used.
+    `fuzzy=true` matches misspelled names ("hedphones") by trigram
+    similarity instead of full-text search.
+    `ids=1,2,3` fetches those products with a single query, in the given
+    order; unknown or inactive IDs are omitted.
+    `fields=id,name,price` returns only those fields (plus id): the other
+    columns, such as the long `description`, are not read at all.
     """
+    if ids is not None:
+        return await _get_products_by_ids(ids, repository)
+    
     use_case = ListProductsUseCase(repository)
     
     # Build filters DTO
@@ -120,21 +416,24 @@ async def list_products(
         min_price=min_price,
         max_price=max_price,
         search=search,
+        fuzzy=fuzzy,
         is_active=is_active
     )
     
     try:
-        result = await use_case.execute(filters, page, limit)
-        
-        # Convert entities to DTOs
-        items = [_entity_to_response_dto(product) for product in result["items"]]
+        field_list = list(PRODUCT_FIELDS)
+        if fields is not None:
+            field_list = [field.strip() for field in fields.split(",") if field.strip()]
+        result = await use_case.execute(
+            filters, page, limit, sort=sort, cursor=cursor,
+            include_total=include_total, total_mode=total_mode, fields=field_list
+        )
         
-        return ProductListResponseDTO(
-            items=items,
-            total=result["total"],
-            page=result["page"],
-            limit=result["limit"],
-            total_pages=result["total_pages"]
+        return _product_list_response(result)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
     except Exception as e:
         raise HTTPException(
@@ -143,20 +442,40 @@ async def list_products(
         )
 
 
-@router.put("/{product_id}", response_model=ProductResponseDTO)
+@router.put(
+    "/{product_id}",
+    response_model=ProductResponseDTO,
+    dependencies=[Depends(query_budget(3))]  # UPDATE ... RETURNING, search index sync
+)
 async def update_product(
     product_id: int,
     dto: UpdateProductDTO,
+    response: Response,
+    if_match: Optional[str] = Header(None, description="ETag of the version to update"),
     repository: ProductRepository = Depends(get_product_repository)
 ):
     """
     Update an existing product.
+    
+    Concurrent edits are detected without locks: with `If-Match` (the ETag
+    of GET /products/{id}) the update only applies to that version and
+    fails with 412 otherwise; a `version` in the body fails with 409
+    instead. Without either, the given fields are written whatever the
+    version.
     """
     use_case = UpdateProductUseCase(repository)
     
     try:
-        product = await use_case.execute(product_id, dto)
+        expected_version = _parse_if_match(if_match) if if_match is not None else None
+        product = await use_case.execute(product_id, dto, expected_version=expected_version)
+        response.headers["ETag"] = _etag(product.version)
         return _entity_to_response_dto(product)
+    except ProductVersionConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED if expected_version else status.HTTP_409_CONFLICT,
+            detail=str(e),
+            headers={"ETag": _etag(e.current_version)}
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -174,7 +493,11 @@ async def update_product(
         )
 
 
-@router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete(
+    "/{product_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(query_budget(2))]  # Soft delete, search index removal
+)
 async def delete_product(
     product_id: int,
     repository: ProductRepository = Depends(get_product_repository)
@@ -203,3 +526,197 @@ async def delete_product(
             detail="Internal server error"
         )
 
+
+
+@router.post(
+    "/{product_id}/stock/reserve",
+    response_model=StockReservationDTO,
+    # Conditional UPDATE; SELECT, shard UPDATE, then SUM or shard locks and drain if sharded
+    dependencies=[Depends(query_budget(5))]
+)
+async def reserve_stock(
+    product_id: int,
+    dto: ReserveStockDTO,
+    repository: ProductRepository = Depends(get_product_repository)
+):
+    """
+    Take `quantity` units of a product's stock.
+    
+    The availability check and the decrement are a single conditional
+    UPDATE, so concurrent buyers of the same product never oversell.
+    Responds 400 when fewer units are in stock than requested.
+    """
+    use_case = ReserveStockUseCase(repository)
+    
+    try:
+        return await use_case.execute(product_id, dto.quantity)
+    except (ValueError, InvalidStockOperation, InsufficientStock) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except ProductNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.post(
+    "/{product_id}/stock/holds",
+    status_code=status.HTTP_201_CREATED,
+    response_model=StockHoldDTO,
+    # Conditional UPDATE, INSERT; SELECT, shard UPDATE, SUM or shard locks and drain, held UPDATE if sharded
+    dependencies=[Depends(query_budget(7))]
+)
+async def hold_stock(
+    product_id: int,
+    dto: StockHoldRequestDTO,
+    repository: ProductRepository = Depends(get_product_repository)
+):
+    """
+    Hold `quantity` units of a product's stock for `ttl_seconds`.
+    
+    The units are taken from the available stock at once, as by
+    /stock/reserve, and return to it when the hold expires unless it is
+    confirmed first. Responds 400 when fewer units are in stock than
+    requested.
+    """
+    settings = get_settings()
+    use_case = HoldStockUseCase(
+        repository,
+        default_ttl_seconds=settings.STOCK_HOLD_TTL_SECONDS,
+        max_ttl_seconds=settings.STOCK_HOLD_MAX_TTL_SECONDS
+    )
+    
+    try:
+        return await use_case.execute(product_id, dto.quantity, dto.ttl_seconds)
+    except (ValueError, InvalidStockOperation, InsufficientStock) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except ProductNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.post(
+    "/stock/holds/{hold_id}/confirm",
+    response_model=StockHoldDTO,
+    dependencies=[Depends(query_budget(2))]  # DELETE ... RETURNING, held stock UPDATE
+)
+async def confirm_stock_hold(
+    hold_id: int,
+    repository: ProductRepository = Depends(get_product_repository)
+):
+    """
+    Confirm a stock hold: its units are sold. Responds 404 once the hold
+    has expired, even if it has not been swept yet.
+    """
+    use_case = ConfirmStockHoldUseCase(repository)
+    
+    try:
+        return await use_case.execute(hold_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except StockHoldNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.delete(
+    "/stock/holds/{hold_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    # DELETE ... RETURNING, row locks (PostgreSQL), UPDATE, shard UPDATE if sharded
+    dependencies=[Depends(query_budget(4))]
+)
+async def release_stock_hold(
+    hold_id: int,
+    repository: ProductRepository = Depends(get_product_repository)
+):
+    """
+    Release a stock hold before it expires: its units return to stock.
+    """
+    use_case = ReleaseStockHoldUseCase(repository)
+    
+    try:
+        await use_case.execute(hold_id)
+        return None
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except StockHoldNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.put(
+    "/{product_id}/stock/shards",
+    response_model=ProductResponseDTO,
+    # Product, shard stock SUM if sharded, shard DELETE, product UPDATE, shard INSERT
+    dependencies=[Depends(query_budget(5))]
+)
+async def set_stock_shards(
+    product_id: int,
+    dto: StockShardsDTO,
+    repository: ProductRepository = Depends(get_product_repository)
+):
+    """
+    Split a hot product's stock across `shards` sub-counters (0 merges it back).
+    
+    Purchases of a sharded product decrement a random sub-counter, spilling
+    over to the others when it runs short, so flash-sale buyers do not all
+    wait on one row. The product's stock is unchanged.
+    """
+    use_case = SetStockShardsUseCase(repository, max_shards=get_settings().STOCK_MAX_SHARDS)
+    
+    try:
+        product = await use_case.execute(product_id, dto.shards)
+        return _entity_to_response_dto(product)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except ProductNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
@@ -7,6 +7,7 @@ from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from domain.exceptions.product_exceptions import (
     ProductNotFoundError,
+    ProductVersionConflict,
     InvalidStockOperation,
     InsufficientStock
 )
@@ -22,6 +23,12 @@ async def domain_exception_handler(request: Request, exc: Exception):
             content={"detail": str(exc)}
         )
     
+    if isinstance(exc, ProductVersionConflict):
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={"detail": str(exc)}
+        )
+    
     if isinstance(exc, (InvalidStockOperation, InsufficientStock)):
         return JSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -0,0 +1,101 @@
+"""
+Per-request query count, time and budget middleware
+"""
+import logging
+from typing import Callable, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from infrastructure.config.settings import Settings, get_settings
+from infrastructure.database.query_counter import QueryStats, current_query_stats, track_queries
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+QUERY_TIME_HEADER = "X-DB-Query-Time-Ms"
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when a request runs more statements than its budget allows"""
+    pass
+
+
+def query_budget(max_queries: int) -> Callable:
+    """
+    Route dependency setting the statement budget of a request.
+    
+    Usage:
+        @router.put("/{product_id}", dependencies=[Depends(query_budget(3))])
+    """
+    async def set_budget() -> None:
+        stats = current_query_stats()
+        if stats is not None:
+            stats.budget = max_queries
+    
+    return set_budget
+
+
+class QueryBudgetMiddleware:
+    """
+    Count SQL statements and database time per HTTP request.
+    
+    - Outside production, X-DB-Query-Count and X-DB-Query-Time-Ms
+      response headers report them
+    - A statement shape executed QUERY_REPEAT_THRESHOLD times or more in
+      one request is logged as a likely N+1
+    - A request over its budget (query_budget() on the route, else
+      QUERY_BUDGET_DEFAULT) is logged, or with QUERY_BUDGET_MODE=raise
+      fails with QueryBudgetExceeded (use in tests)
+    
+    Checks run when the response starts, after the endpoint has returned.
+    """
+    
+    def __init__(self, app: ASGIApp, settings: Optional[Settings] = None):
+        """
+        Initialize middleware.
+        
+        Args:
+            app: Wrapped ASGI application
+            settings: Budget and header settings; defaults to get_settings()
+        """
+        self.app = app
+        settings = settings or get_settings()
+        self._headers = settings.ENVIRONMENT != "production"
+        self._default_budget = settings.QUERY_BUDGET_DEFAULT or None
+        self._raise = settings.QUERY_BUDGET_MODE == "raise"
+        self._repeat_threshold = settings.QUERY_REPEAT_THRESHOLD
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        with track_queries(self._default_budget) as stats:
+            async def send_with_stats(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    self._check(scope, stats)
+                    if self._headers:
+                        headers = MutableHeaders(scope=message)
+                        headers[QUERY_COUNT_HEADER] = str(stats.count)
+                        headers[QUERY_TIME_HEADER] = f"{stats.seconds * 1000:.2f}"
+                await send(message)
+            
+            await self.app(scope, receive, send_with_stats)
+    
+    def _check(self, scope: Scope, stats: QueryStats) -> None:
+        """Flag likely N+1 shapes and enforce the budget"""
+        route = scope.get("route")
+        name = f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+        
+        for statement, executions in stats.repeated(self._repeat_threshold):
+            logger.warning(
+                "Possible N+1 in %s: statement executed %d times: %s",
+                name, executions, " ".join(statement.split())[:500]
+            )
+        
+        if stats.over_budget:
+            message = f"{name} ran {stats.count} queries (budget {stats.budget})"
+            if self._raise:
+                raise QueryBudgetExceeded(message)
+            logger.warning("Query budget exceeded: %s", message)
@@ -2,6 +2,7 @@
 Pytest configuration and shared fixtures
 """
 import pytest
+import pytest_asyncio
 from unittest.mock import Mock, AsyncMock
 from typing import Generator
 from decimal import Decimal
@@ -48,11 +49,24 @@ def mock_product_repository():
     """Mock ProductRepository for testing use cases"""
     repository = Mock(spec=ProductRepository)
     repository.create = AsyncMock()
+    repository.create_many = AsyncMock()
     repository.get_by_id = AsyncMock()
+    repository.get_many = AsyncMock()
     repository.list = AsyncMock()
+    repository.list_with_total = AsyncMock()
     repository.update = AsyncMock()
+    repository.update_fields = AsyncMock()
+    repository.decrement_stock = AsyncMock()
+    repository.decrement_stock_many = AsyncMock()
+    repository.set_stock_shards = AsyncMock()
+    repository.hold_stock = AsyncMock()
+    repository.confirm_hold = AsyncMock()
+    repository.release_holds = AsyncMock()
+    repository.expired_hold_ids = AsyncMock()
     repository.delete = AsyncMock()
     repository.count = AsyncMock()
+    repository.estimate_count = AsyncMock()
+    repository.facets = AsyncMock()
     return repository
 
 
@@ -101,3 +115,22 @@ def sample_user_payload():
         "role": "user",
     }
 
+
+
+@pytest_asyncio.fixture
+async def db_session():
+    """Async session bound to a fresh in-memory SQLite database"""
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from infrastructure.database.sqlalchemy.models import Base
+    from infrastructure.database.sqlalchemy.search import create_search_index
+    
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(create_search_index)
+    
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        yield session
+    
+    await engine.dispose()
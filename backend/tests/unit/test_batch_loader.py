@@ -0,0 +1,48 @@
+"""
+Unit tests for BatchLoader
+"""
+import asyncio
+import pytest
+from infrastructure.database.batch_loader import BatchLoader
+
+
+class TestBatchLoader:
+    """Test cases for DataLoader-style batching"""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_loads_share_one_batch(self):
+        """Test loads in the same iteration are resolved by one call"""
+        calls = []
+        
+        async def batch_fn(keys):
+            calls.append(sorted(keys))
+            return {key: key * 10 for key in keys if key != 3}
+        
+        loader = BatchLoader(batch_fn)
+        results = await asyncio.gather(loader.load(1), loader.load(2), loader.load(2), loader.load(3))
+        
+        assert results == [10, 20, 20, None]
+        assert calls == [[1, 2, 3]]
+    
+    @pytest.mark.asyncio
+    async def test_sequential_loads_are_separate_batches(self):
+        """Test awaited loads do not wait for each other"""
+        async def batch_fn(keys):
+            return {key: key for key in keys}
+        
+        loader = BatchLoader(batch_fn)
+        
+        assert await loader.load(1) == 1
+        assert await loader.load(2) == 2
+        assert loader.batches == 2
+    
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_caller(self):
+        """Test a failing batch fails all of its loads"""
+        async def batch_fn(keys):
+            raise RuntimeError("boom")
+        
+        loader = BatchLoader(batch_fn)
+        results = await asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+        
+        assert all(isinstance(result, RuntimeError) for result in results)
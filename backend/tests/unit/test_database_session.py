@@ -0,0 +1,175 @@
+"""
+Unit tests for the database engine setup
+"""
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+from infrastructure.config.settings import Settings
+from infrastructure.database.pool_monitor import PoolStats, PoolValidator, pool_stats
+from infrastructure.database.sqlalchemy.replicas import ReadReplicas, parse_read_urls
+from infrastructure.database.sqlalchemy.session import (
+    create_engine_for,
+    is_sqlite_memory_url,
+    sqlite_pragmas,
+)
+
+
+class TestSQLiteEngineProfile:
+    """Test cases for the SQLite connection profile"""
+    
+    @pytest.mark.asyncio
+    async def test_pragmas_applied_to_every_connection(self, tmp_path):
+        """Test each pooled connection runs the configured PRAGMAs"""
+        settings = Settings(SQLITE_CACHE_SIZE=-2048, SQLITE_BUSY_TIMEOUT_MS=1234)
+        engine = create_engine_for(f"sqlite:///{tmp_path / 'profile.db'}", settings)
+        try:
+            async with engine.connect() as first, engine.connect() as second:
+                for conn in (first, second):
+                    assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+                    assert (await conn.execute(text("PRAGMA synchronous"))).scalar() == 1
+                    assert (await conn.execute(text("PRAGMA cache_size"))).scalar() == -2048
+                    assert (await conn.execute(text("PRAGMA busy_timeout"))).scalar() == 1234
+                    assert (await conn.execute(text("PRAGMA temp_store"))).scalar() == 2
+                    assert (await conn.execute(text("PRAGMA foreign_keys"))).scalar() == 1
+        finally:
+            await engine.dispose()
+    
+    @pytest.mark.asyncio
+    async def test_file_database_uses_queue_pool(self, tmp_path):
+        """Test SQLite files keep a pool of connections sized from settings"""
+        settings = Settings(SQLITE_POOL_SIZE=3, SQLITE_MAX_OVERFLOW=2)
+        engine = create_engine_for(f"sqlite:///{tmp_path / 'pool.db'}", settings)
+        try:
+            assert isinstance(engine.pool, AsyncAdaptedQueuePool)
+            assert engine.pool.size() == 3
+            assert engine.pool._max_overflow == 2
+        finally:
+            await engine.dispose()
+    
+    @pytest.mark.asyncio
+    async def test_memory_database_keeps_single_connection(self):
+        """Test in-memory SQLite is not split across pooled connections"""
+        engine = create_engine_for("sqlite:///:memory:", Settings())
+        try:
+            assert isinstance(engine.pool, StaticPool)
+        finally:
+            await engine.dispose()
+    
+    def test_memory_url_detection(self):
+        """Test in-memory URLs are told apart from files"""
+        assert is_sqlite_memory_url("sqlite://")
+        assert is_sqlite_memory_url("sqlite+aiosqlite:///:memory:")
+        assert not is_sqlite_memory_url("sqlite:///./ecommerce.db")
+    
+    def test_invalid_pragma_value_raises_error(self):
+        """Test string settings are validated before reaching SQL"""
+        with pytest.raises(ValueError, match="SQLITE_JOURNAL_MODE"):
+            sqlite_pragmas(Settings(SQLITE_JOURNAL_MODE="wal; DROP TABLE products"))
+
+
+class TestPoolMonitor:
+    """Test cases for pool statistics and background validation"""
+    
+    @pytest.mark.asyncio
+    async def test_stats_report_checkouts_and_gauges(self, tmp_path):
+        """Test live gauges and checkout counts are reported"""
+        engine = create_engine_for(f"sqlite:///{tmp_path / 'stats.db'}", Settings(SQLITE_POOL_SIZE=2))
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                stats = pool_stats(engine)
+                assert stats["checked_out"] == 1
+                assert stats["size"] == 2
+            
+            stats = pool_stats(engine)
+            assert stats["checked_out"] == 0
+            assert stats["checked_in"] == 1
+            assert stats["checkouts"] == 1
+            assert sum(stats["wait_ms_histogram"].values()) == 1
+        finally:
+            await engine.dispose()
+    
+    @pytest.mark.asyncio
+    async def test_timeouts_are_counted(self, tmp_path):
+        """Test a checkout that gives up waiting is recorded as a timeout"""
+        settings = Settings(SQLITE_POOL_SIZE=1, SQLITE_MAX_OVERFLOW=0)
+        engine = create_engine_for(f"sqlite:///{tmp_path / 'timeout.db'}", settings)
+        engine.pool._timeout = 0.05
+        try:
+            async with engine.connect():
+                with pytest.raises(exc.TimeoutError):
+                    await engine.connect()
+            stats = pool_stats(engine)
+            assert stats["timeouts"] == 1
+            assert stats["wait_ms_max"] >= 50
+        finally:
+            await engine.dispose()
+    
+    @pytest.mark.asyncio
+    async def test_stats_survive_dispose(self, tmp_path):
+        """Test engine.dispose() keeps the accumulated statistics"""
+        engine = create_engine_for(f"sqlite:///{tmp_path / 'dispose.db'}", Settings())
+        async with engine.connect():
+            pass
+        await engine.dispose()
+        
+        assert pool_stats(engine)["checkouts"] == 1
+        await engine.dispose()
+    
+    @pytest.mark.asyncio
+    async def test_validator_checks_each_idle_connection(self, tmp_path):
+        """Test a validation pass touches every idle connection once"""
+        engine = create_engine_for(f"sqlite:///{tmp_path / 'validate.db'}", Settings())
+        try:
+            async with engine.connect(), engine.connect(), engine.connect():
+                pass
+            
+            assert await PoolValidator(engine, interval_seconds=60).validate() == 0
+            stats = pool_stats(engine)
+            assert stats["validations"] == 3
+            assert stats["checked_in"] == 3
+        finally:
+            await engine.dispose()
+    
+    def test_histogram_buckets(self):
+        """Test waits land in the bucket of their upper bound"""
+        stats = PoolStats()
+        stats.record_wait(0.0005)
+        stats.record_wait(0.001)
+        stats.record_wait(0.007)
+        stats.record_wait(60)
+        
+        histogram = stats.histogram()
+        assert histogram["<=1ms"] == 2
+        assert histogram["<=10ms"] == 1
+        assert histogram[">5000ms"] == 1
+
+
+class TestReadReplicas:
+    """Test cases for read replica sessions"""
+    
+    @pytest.mark.asyncio
+    async def test_sessions_rotate_round_robin(self, tmp_path):
+        """Test each new session goes to the next replica"""
+        engines = [create_engine_for(f"sqlite:///{tmp_path / f'replica{i}.db'}", Settings()) for i in range(2)]
+        replicas = ReadReplicas(engines)
+        try:
+            binds = [replicas.session().bind for _ in range(4)]
+            
+            assert len(replicas) == 2
+            assert binds == [engines[0], engines[1], engines[0], engines[1]]
+        finally:
+            await replicas.dispose()
+    
+    def test_no_replicas(self):
+        """Test an empty replica set is falsy and hands out no sessions"""
+        replicas = ReadReplicas([])
+        
+        assert not replicas
+        with pytest.raises(RuntimeError):
+            replicas.session()
+    
+    def test_parse_read_urls(self):
+        """Test comma-separated URLs are split and blanks dropped"""
+        assert parse_read_urls("") == []
+        assert parse_read_urls(" sqlite:///a.db, ,sqlite:///b.db ") == ["sqlite:///a.db", "sqlite:///b.db"]
@@ -0,0 +1,151 @@
+"""
+Unit tests for HoldSweeper (expired stock hold release)
+"""
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta
+from decimal import Decimal
+from domain.entities.product import Product
+from domain.value_objects.price import Price
+from domain.value_objects.stock import Stock
+from infrastructure.database.hold_sweeper import HoldSweeper
+from infrastructure.database.sqlalchemy.repositories.product_repository_impl import ProductRepositoryImpl
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    """Session factory on a fresh in-memory SQLite database shared by its sessions"""
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import StaticPool
+    from infrastructure.database.sqlalchemy.models import Base
+    from infrastructure.database.sqlalchemy.search import create_search_index
+    
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(create_search_index)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def _create_product(session_factory, stock: int) -> int:
+    """Create a product and return its ID"""
+    async with session_factory() as session:
+        product = await ProductRepositoryImpl(session).create(Product(
+            id=None,
+            name="Console",
+            price=Price(Decimal("10.00")),
+            stock=Stock(stock),
+            category="electronics",
+            description=None,
+            is_active=True,
+        ))
+    return product.id
+
+
+async def _stock(session_factory, product_id: int) -> Stock:
+    """Current stock of a product"""
+    async with session_factory() as session:
+        return (await ProductRepositoryImpl(session).get_by_id(product_id)).stock
+
+
+class TestHoldSweeper:
+    """Test cases for HoldSweeper"""
+    
+    def test_due_pops_expired_holds_in_expiry_order(self):
+        """Test only expired holds are popped, oldest first and at most `limit`"""
+        sweeper = HoldSweeper(None, interval_seconds=1, batch_size=10, catchup_seconds=0)
+        now = datetime.now()
+        for hold_id, offset in [(1, 5), (2, -3), (3, -1), (4, -2)]:
+            sweeper.track(hold_id, now + timedelta(seconds=offset))
+        
+        assert sweeper.due(now, limit=2) == [2, 4]
+        assert sweeper.due(now, limit=2) == [3]
+        assert sweeper.due(now, limit=2) == []
+        assert len(sweeper) == 1
+    
+    @pytest.mark.asyncio
+    async def test_sweep_releases_tracked_holds_in_batches(self, session_factory):
+        """Test due holds are released batch_size at a time and confirmed ones skipped"""
+        sweeper = HoldSweeper(session_factory, interval_seconds=1, batch_size=2, catchup_seconds=0)
+        product_id = await _create_product(session_factory, stock=10)
+        expires_at = datetime.now() + timedelta(seconds=30)
+        async with session_factory() as session:
+            repository = ProductRepositoryImpl(session, on_hold=sweeper.track)
+            holds = [await repository.hold_stock(product_id, 1, expires_at) for _ in range(5)]
+            await repository.confirm_hold(holds[0].id)
+        
+        assert await sweeper.sweep(datetime.now()) == 0
+        assert await sweeper.sweep(expires_at) == 4
+        
+        assert sweeper.batches == 3
+        assert await _stock(session_factory, product_id) == Stock(9)
+        assert (await _stock(session_factory, product_id)).held == 0
+        assert sweeper.stats()["tracked"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_catch_up_releases_untracked_holds(self, session_factory):
+        """Test holds placed by another process are found through the database"""
+        sweeper = HoldSweeper(session_factory, interval_seconds=1, batch_size=2, catchup_seconds=60)
+        product_id = await _create_product(session_factory, stock=10)
+        async with session_factory() as session:
+            repository = ProductRepositoryImpl(session)
+            for _ in range(3):
+                await repository.hold_stock(product_id, 2, datetime.now() - timedelta(seconds=1))
+        
+        assert await sweeper.sweep() == 3
+        assert (await _stock(session_factory, product_id)).value == 10
+        
+        # The next scan is catchup_seconds away
+        async with session_factory() as session:
+            await ProductRepositoryImpl(session).hold_stock(product_id, 2, datetime.now() - timedelta(seconds=1))
+        assert await sweeper.sweep() == 0
+    
+    def test_first_pass_runs_alongside_requests_after_init_database(self, tmp_path, monkeypatch):
+        """Test the startup pass and the first requests share a fresh engine after init_database()"""
+        import asyncio
+        import threading
+        from contextlib import asynccontextmanager
+        import httpx
+        from fastapi import FastAPI
+        from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+        from infrastructure.config.settings import Settings
+        from infrastructure.database.sqlalchemy import session as db
+        from presentation.api.v1.products.router import router as products_router
+        
+        url = f"sqlite:///{tmp_path / 'app.db'}"
+        app_engine = db.create_engine_for(url, Settings())
+        monkeypatch.setattr(db, "DATABASE_URL", url)
+        monkeypatch.setattr(db, "engine", app_engine)
+        monkeypatch.setattr(db, "AsyncSessionLocal", async_sessionmaker(
+            bind=app_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+        ))
+        db.init_database()
+        
+        @asynccontextmanager
+        async def lifespan(app: FastAPI):
+            # As in main.py: the sweeper's first pass starts with the server
+            sweeper = HoldSweeper(db.AsyncSessionLocal, interval_seconds=60, batch_size=10, catchup_seconds=60)
+            sweeper.start()
+            yield
+            await sweeper.stop()
+            await app_engine.dispose()
+        
+        app = FastAPI(lifespan=lifespan)
+        app.include_router(products_router, prefix="/api/v1")
+        
+        async def serve() -> list:
+            async with lifespan(app):
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    responses = await asyncio.gather(*[client.get(f"/api/v1/products/{i}") for i in (1, 2)])
+            return [response.status_code for response in responses]
+        
+        # A deadlock blocks the loop's thread, so wait on a thread rather than the loop
+        status_codes = []
+        server = threading.Thread(target=lambda: status_codes.extend(asyncio.run(serve())), daemon=True)
+        server.start()
+        server.join(timeout=30)
+        
+        assert not server.is_alive(), "requests hung after init_database()"
+        assert status_codes == [200, 200]
@@ -0,0 +1,980 @@
+"""
+Unit tests for ProductRepositoryImpl (in-memory SQLite via aiosqlite)
+"""
+import asyncio
+import sqlite3
+import pytest
+import pytest_asyncio
+from decimal import Decimal
+from sqlalchemy import event, text
+from domain.entities.product import Product
+from domain.exceptions.product_exceptions import (
+    InsufficientStock,
+    ProductNotFoundError,
+    ProductVersionConflict,
+    StockHoldNotFoundError,
+    StockUnavailable,
+)
+from domain.value_objects.price import Price
+from domain.value_objects.stock import Stock
+from infrastructure.cache.result_cache import ResultCache
+from infrastructure.database.sqlalchemy.repositories.product_repository_impl import ProductRepositoryImpl
+from infrastructure.database.statement_cache import StatementCache
+from infrastructure.search.trigram_index import TrigramIndex
+
+
+def _product(name: str, price: str = "10.00", category: str = "electronics", stock: int = 5) -> Product:
+    """Build an unsaved Product entity"""
+    return Product(
+        id=None,
+        name=name,
+        price=Price(Decimal(price)),
+        stock=Stock(stock),
+        category=category,
+        description=f"{name} description",
+        is_active=True,
+    )
+
+
+class TestProductRepositoryImpl:
+    """Test cases for the async SQLAlchemy repository"""
+    
+    @pytest.mark.asyncio
+    async def test_create_and_get_by_id(self, db_session):
+        """Test created product can be read back"""
+        repository = ProductRepositoryImpl(db_session)
+        
+        created = await repository.create(_product("Laptop", "899.99"))
+        fetched = await repository.get_by_id(created.id)
+        
+        assert created.id is not None
+        assert fetched.name == "Laptop"
+        assert fetched.price.value == Decimal("899.99")
+        assert fetched.stock.value == 5
+    
+    @pytest.mark.asyncio
+    async def test_get_by_id_missing_returns_none(self, db_session):
+        """Test unknown ID returns None"""
+        repository = ProductRepositoryImpl(db_session)
+        
+        assert await repository.get_by_id(999) is None
+    
+    @pytest.mark.asyncio
+    async def test_list_and_count_with_filters(self, db_session):
+        """Test list() and count() apply the same filters"""
+        repository = ProductRepositoryImpl(db_session)
+        await repository.create(_product("Phone", "500.00"))
+        await repository.create(_product("Headphones", "80.00"))
+        await repository.create(_product("Coffee Maker", "150.00", category="home"))
+        
+        filters = {"category": "electronics", "max_price": Decimal("100")}
+        products = await repository.list(filters=filters)
+        
+        assert [p.name for p in products] == ["Headphones"]
+        assert await repository.count(filters=filters) == 1
+        assert await repository.count() == 3
+    
+    @pytest.mark.asyncio
+    async def test_update_and_delete(self, db_session):
+        """Test update persists changes and delete hides the product"""
+        repository = ProductRepositoryImpl(db_session)
+        product = await repository.create(_product("Watch", "249.99"))
+        
+        product.stock = Stock(1)
+        updated = await repository.update(product)
+        await repository.delete(product.id)
+        
+        assert updated.stock.value == 1
+        assert await repository.get_by_id(product.id) is None
+    
+    @pytest.mark.asyncio
+    async def test_keyset_pagination_by_price(self, db_session):
+        """Test seeking after (price, id) walks pages without gaps or repeats"""
+        repository = ProductRepositoryImpl(db_session)
+        for name, price in [("A", "30.00"), ("B", "10.00"), ("C", "20.00"), ("D", "10.00"), ("E", "40.00")]:
+            await repository.create(_product(name, price))
+        
+        first = await repository.list(limit=2, order_by="price")
+        last = first[-1]
+        second = await repository.list(limit=2, order_by="price", after=(str(last.price.value), last.id))
+        descending = await repository.list(limit=2, order_by="-price", after=("30.00", 1))
+        
+        assert [p.name for p in first] == ["B", "D"]
+        assert [p.name for p in second] == ["C", "A"]
+        assert [p.name for p in descending] == ["C", "D"]
+    
+    @pytest.mark.asyncio
+    async def test_list_unsupported_sort_raises_error(self, db_session):
+        """Test unknown sort field raises ValueError"""
+        repository = ProductRepositoryImpl(db_session)
+        
+        with pytest.raises(ValueError):
+            await repository.list(order_by="stock")
+    
+    @pytest.mark.asyncio
+    async def test_list_with_total_counts_all_matches(self, db_session):
+        """Test the window total covers every match, not just the page"""
+        repository = ProductRepositoryImpl(db_session)
+        for name in ["A", "B", "C", "D"]:
+            await repository.create(_product(name))
+        await repository.create(_product("Other", category="home"))
+        filters = {"category": "electronics"}
+        
+        page, total = await repository.list_with_total(filters=filters, limit=2)
+        after_page, after_total = await repository.list_with_total(
+            filters=filters, limit=2, order_by="name", after=("B", 2)
+        )
+        empty, empty_total = await repository.list_with_total(filters=filters, limit=2, offset=10)
+        
+        assert [p.name for p in page] == ["A", "B"]
+        assert total == 4
+        assert [p.name for p in after_page] == ["C", "D"]
+        assert after_total == 4
+        assert empty == [] and empty_total == 4
+    
+    @pytest.mark.asyncio
+    async def test_count_cache_invalidated_by_writes(self, db_session):
+        """Test cached totals are reused until a write goes through the repository"""
+        cache = ResultCache(ttl_seconds=60, max_entries=10)
+        repository = ProductRepositoryImpl(db_session, count_cache=cache)
+        await repository.create(_product("A"))
+        
+        assert await repository.count() == 1
+        assert await repository.count() == 1
+        assert cache.hits == 1
+        
+        await repository.create(_product("B"))
+        _, total = await repository.list_with_total()
+        
+        assert total == 2
+        assert await repository.count() == 2
+        assert cache.hits == 2
+    
+    @pytest.mark.asyncio
+    async def test_writes_increment_version(self, db_session):
+        """Test every write bumps the version, no-op updates do not"""
+        repository = ProductRepositoryImpl(db_session)
+        product = await repository.create(_product("Phone"))
+        
+        renamed = await repository.update_fields(product.id, {"name": "Tablet"})
+        unchanged = await repository.update_fields(product.id, {"name": "Tablet"})
+        await repository.decrement_stock(product.id, 1)
+        
+        assert product.version == 1
+        assert renamed.version == unchanged.version == 2
+        assert (await repository.get_by_id(product.id)).version == 3
+        assert await repository.list(fields=["version"]) == [{"id": product.id, "version": 3}]
+    
+    @pytest.mark.asyncio
+    async def test_update_conflicts_with_concurrent_write(self, db_session):
+        """Test an update of a stale version fails and writes nothing"""
+        repository = ProductRepositoryImpl(db_session)
+        product = await repository.create(_product("Phone", stock=5))
+        stale = await repository.get_by_id(product.id)
+        await repository.update_fields(product.id, {"name": "Tablet"}, expected_version=1)
+        
+        stale.stock = Stock(1)
+        with pytest.raises(ProductVersionConflict) as conflict:
+            await repository.update(stale)
+        with pytest.raises(ProductVersionConflict):
+            await repository.update_fields(product.id, {"name": "Tablet"}, expected_version=1)
+        
+        assert conflict.value.current_version == 2
+        current = await repository.get_by_id(product.id)
+        assert (current.name, current.stock.value, current.version) == ("Tablet", 5, 2)
+    
+    @pytest.mark.asyncio
+    async def test_decrement_stock(self, db_session):
+        """Test decrements are conditional on the stock left"""
+        repository = ProductRepositoryImpl(db_session)
+        product = await repository.create(_product("Phone", stock=5))
+        
+        assert await repository.decrement_stock(product.id, 3) == 2
+        with pytest.raises(InsufficientStock, match="Only 2 items available, requested 3"):
+            await repository.decrement_stock(product.id, 3)
+        assert (await repository.get_by_id(product.id)).stock.value == 2
+    
+    @pytest.mark.asyncio
+    async def test_decrement_stock_missing_or_inactive(self, db_session):
+        """Test unknown or deleted products are not found"""
+        repository = ProductRepositoryImpl(db_session)
+        product = await repository.create(_product("Phone"))
+        await repository.delete(product.id)
+        
+        for product_id in [product.id, 999]:
+            with pytest.raises(ProductNotFoundError):
+                await repository.decrement_stock(product_id, 1)
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_decrements_do_not_oversell(self, tmp_path):
+        """Test concurrent buyers on separate connections take exactly the stock"""
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        from infrastructure.database.sqlalchemy.models import Base
+        from infrastructure.database.sqlalchemy.search import create_search_index
+        
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'stock.db'}", connect_args={"timeout": 30})
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(create_search_index)
+        factory = async_sessionmaker(engine, expire_on_commit=False)
+        async with factory() as session:
+            product = await ProductRepositoryImpl(session).create(_product("Console", stock=10))
+        
+        async def buy() -> bool:
+            async with factory() as session:
+                try:
+                    await ProductRepositoryImpl(session).decrement_stock(product.id, 1)
+                    return True
+                except InsufficientStock:
+                    return False
+        
+        results = await asyncio.gather(*[buy() for _ in range(25)])
+        async with factory() as session:
+            left = (await ProductRepositoryImpl(session).get_by_id(product.id)).stock.value
+        await engine.dispose()
+        
+        assert results.count(True) == 10
+        assert left == 0
+    
+    @pytest.mark.asyncio
+    async def test_decrement_stock_many(self, db_session):
+        """Test a basket is taken whole, or not at all with per-product failures"""
+        repository = ProductRepositoryImpl(db_session)
+        phone = await repository.create(_product("Phone", stock=5))
+        cable = await repository.create(_product("Cable", stock=2))
+        
+        remaining = await repository.decrement_stock_many({cable.id: 1, phone.id: 5})
+        with pytest.raises(StockUnavailable) as failed:
+            await repository.decrement_stock_many({phone.id: 1, cable.id: 1, 999: 1})
+        
+        assert remaining == {phone.id: 0, cable.id: 1}
+        assert set(failed.value.failures) == {phone.id, 999}
+        assert isinstance(failed.value.failures[phone.id], InsufficientStock)
+        assert isinstance(failed.value.failures[999], ProductNotFoundError)
+        assert (await repository.get_by_id(cable.id)).stock.value == 1
+    
+    @pytest.mark.asyncio
+    async def test_sharded_stock_reads_sum_shards(self, db_session):
+        """Test sharding keeps the stock, as read by entities, projections and facets"""
+        repository = ProductRepositoryImpl(db_session)
+        product = await repository.create(_product("Console", stock=10))
+        await repository.create(_product("Cable", stock=0))
+        
+        sharded = await repository.set_stock_shards(product.id, 4)
+        shards = (await db_session.execute(text(
+            "SELECT stock FROM product_stock_shards WHERE product_id = :id ORDER BY shard"
+        ), {"id": product.id})).scalars().all()
+        
+        assert sharded.stock.value == 10
+        assert shards == [3, 3, 2, 2]
+        assert (await repository.get_by_id(product.id)).stock.value == 10
+        assert (await repository.list())[0].stock.value == 10
+        assert (await repository.list(fields=["stock"]))[0] == {"id": product.id, "stock": 10}
+        assert (await repository.facets(None, []))["in_stock"] == 1
+        
+        updated = await repository.update_fields(product.id, {"stock": Stock(6)})
+        merged = await repository.set_stock_shards(product.id, 0)
+        
+        assert updated.stock.value == 6
+        assert merged.stock.value == 6
+        assert (await repository.get_by_id(product.id)).stock.value == 6
+    
+    @pytest.mark.asyncio
+    async def test_sharded_stock_decrements(self, db_session):
+        """Test sharded decrements spill over across shards, never oversell and leave the product row alone"""
+        repository = ProductRepositoryImpl(db_session)
+        product = await repository.create(_product("Console", stock=10))
+        other = await repository.create(_product("Cable", stock=5))
+        sharded = await repository.set_stock_shards(product.id, 4)
+        
+        assert await repository.decrement_stock(product.id, 1) == 9
+        assert await repository.decrement_stock(product.id, 7) == 2  # More than any one shard
+        with pytest.raises(InsufficientStock, match="Only 2 items available"):
+            await repository.decrement_stock(product.id, 3)
+        with pytest.raises(StockUnavailable) as failed:
+            await repository.decrement_stock_many({product.id: 3, other.id: 1})
+        remaining = await repository.decrement_stock_many({product.id: 2, other.id: 1})
+        
+        assert set(failed.value.failures) == {product.id}
+        assert remaining == {product.id: 0, other.id: 4}
+        product = await repository.get_by_id(product.id)
+        assert product.is_available() is False
+        assert product.version == sharded.version
+    
+    @pytest.mark.asyncio
+    async def test_stock_holds(self, db_session):
+        """Test holds move stock to held stock until confirmed or released"""
+        from datetime import datetime, timedelta
+        
+        scheduled = []
+        repository = ProductRepositoryImpl(db_session, on_hold=lambda *hold: scheduled.append(hold))
+        product = await repository.create(_product("Console", stock=5))
+        expires_at = datetime.now() + timedelta(minutes=5)
+        
+        first = await repository.hold_stock(product.id, 2, expires_at)
+        second = await repository.hold_stock(product.id, 3, expires_at)
+        with pytest.raises(InsufficientStock, match="Only 0 items available"):
+            await repository.hold_stock(product.id, 1, expires_at)
+        held = await repository.get_by_id(product.id)
+        
+        assert (held.stock.value, held.stock.held, held.is_available()) == (0, 5, False)
+        assert await repository.list(fields=["held_stock"]) == [{"id": product.id, "held_stock": 5}]
+        assert scheduled == [(first.id, expires_at), (second.id, expires_at)]
+        
+        await repository.confirm_hold(first.id)
+        assert await repository.release_holds([first.id, second.id, 999]) == 1
+        with pytest.raises(StockHoldNotFoundError):
+            await repository.confirm_hold(second.id)
+        product = await repository.get_by_id(product.id)
+        
+        assert (product.stock.value, product.stock.held) == (3, 0)
+    
+    @pytest.mark.asyncio
+    async def test_release_expired_holds_in_one_batch(self, db_session):
+        """Test expired holds of several products, sharded ones included, are released together"""
+        from datetime import datetime, timedelta
+        
+        repository = ProductRepositoryImpl(db_session)
+        lamp = await repository.create(_product("Lamp", stock=10))
+        console = await repository.create(_product("Console", stock=10))
+        await repository.set_stock_shards(console.id, 4)
+        past, future = datetime.now() - timedelta(seconds=1), datetime.now() + timedelta(minutes=5)
+        expired = [
+            (await repository.hold_stock(product_id, 2, past)).id
+            for product_id in (lamp.id, lamp.id, console.id)
+        ]
+        live = await repository.hold_stock(console.id, 1, future)
+        
+        with pytest.raises(StockHoldNotFoundError):
+            await repository.confirm_hold(expired[0])
+        assert await repository.expired_hold_ids(datetime.now(), 10) == expired
+        
+        statements = []
+        event.listen(db_session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+        assert await repository.release_holds(expired) == 3
+        assert len(statements) == 3  # DELETE, CASE UPDATE, one shard UPDATE
+        products = {product.id: product for product in await repository.get_many([lamp.id, console.id])}
+        
+        assert (products[lamp.id].stock.value, products[lamp.id].stock.held) == (10, 0)
+        assert (products[console.id].stock.value, products[console.id].stock.held) == (9, 1)
+        assert await repository.expired_hold_ids(datetime.now(), 10) == []
+        assert (await repository.confirm_hold(live.id)).quantity == 1
+    
+    @pytest.mark.asyncio
+    async def test_record_views_and_sort_by_popularity(self, db_session):
+        """Test views accumulate across flushes and drive the popularity sort"""
+        repository = ProductRepositoryImpl(db_session)
+        lamp, desk, chair = [await repository.create(_product(name)) for name in ("Lamp", "Desk", "Chair")]
+        
+        await repository.record_views({desk.id: 3, chair.id: 1})
+        await repository.record_views({chair.id: 4, lamp.id: 1})
+        first = await repository.list(limit=2, order_by="-popularity")
+        rest = await repository.list(limit=2, order_by="-popularity", after=(first[-1].popularity, first[-1].id))
+        views = (await db_session.execute(text("SELECT product_id, views FROM product_counters"))).all()
+        
+        assert [(p.name, p.popularity) for p in first + rest] == [("Chair", 5), ("Desk", 3), ("Lamp", 1)]
+        assert sorted(views) == [(lamp.id, 1), (desk.id, 3), (chair.id, 5)]
+        assert (await repository.get_by_id(chair.id)).version == chair.version  # Not a product change
+        assert await repository.list(fields=["name"], order_by="popularity") == [
+            {"id": lamp.id, "name": "Lamp", "popularity": 1},
+            {"id": desk.id, "name": "Desk", "popularity": 3},
+            {"id": chair.id, "name": "Chair", "popularity": 5},
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_facets(self, db_session):
+        """Test facet counts; category counts ignore the category filter"""
+        repository = ProductRepositoryImpl(db_session)
+        await repository.create(_product("Phone", "500.00"))
+        await repository.create(_product("Cable", "9.99", stock=0))
+        await repository.create(_product("Headphones", "50.00"))
+        await repository.create(_product("Coffee Maker", "150.00", category="home"))
+        edges = [Decimal("50"), Decimal("100")]
+        
+        everything = await repository.facets(None, edges)
+        electronics = await repository.facets({"category": "electronics", "max_price": Decimal("100")}, edges)
+        
+        assert everything == {
+            "total": 4,
+            "in_stock": 3,
+            "categories": {"electronics": 3, "home": 1},
+            "price_buckets": [1, 1, 2],
+        }
+        assert electronics == {
+            "total": 2,
+            "in_stock": 1,
+            "categories": {"electronics": 2},
+            "price_buckets": [1, 1, 0],
+        }
+        assert (await repository.facets({"search": "coffee"}, []))["price_buckets"] == [1]
+    
+    @pytest.mark.asyncio
+    async def test_facets_cached_until_write(self, db_session):
+        """Test facets are cached per filters and invalidated by writes"""
+        cache = ResultCache(ttl_seconds=60, max_entries=10)
+        repository = ProductRepositoryImpl(db_session, count_cache=cache)
+        await repository.create(_product("A"))
+        
+        first = await repository.facets({"category": "electronics"}, [Decimal("20")])
+        again = await repository.facets({"category": "electronics"}, [Decimal("20.00")])
+        await repository.create(_product("B", "30.00"))
+        after_write = await repository.facets({"category": "electronics"}, [Decimal("20")])
+        
+        assert again == first and cache.hits == 1
+        assert after_write["price_buckets"] == [1, 1]
+    
+    @pytest.mark.asyncio
+    async def test_stock_writes_keep_cached_totals(self, db_session):
+        """Test stock writes only invalidate the stock-dependent facets"""
+        cache = ResultCache(ttl_seconds=60, max_entries=10)
+        repository = ProductRepositoryImpl(db_session, count_cache=cache)
+        product = await repository.create(_product("A"))
+        
+        await repository.count()
+        await repository.facets({}, [])
+        await repository.decrement_stock(product.id, 5)
+        hits = cache.hits
+        total = await repository.count()
+        facets = await repository.facets({}, [])
+        
+        assert total == 1 and cache.hits == hits + 1
+        assert facets["in_stock"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_estimate_count_sqlite(self, db_session):
+        """Test estimates come from sqlite_stat1 and only for simple filters"""
+        repository = ProductRepositoryImpl(db_session)
+        for name in ["A", "B", "C"]:
+            await repository.create(_product(name))
+        await repository.create(_product("D", category="home"))
+        
+        assert await repository.estimate_count() is None  # no statistics yet
+        
+        await db_session.execute(text("ANALYZE"))
+        
+        assert await repository.estimate_count() == 4
+        assert await repository.estimate_count({"category": "home"}) == 2
+        assert await repository.estimate_count({"search": "A"}) is None
+    
+    @pytest.mark.asyncio
+    async def test_full_text_search_name_and_description(self, db_session):
+        """Test search uses the FTS index over name and description, ranked"""
+        repository = ProductRepositoryImpl(db_session)
+        await repository.create(_product("Wireless Headphones"))
+        await repository.create(_product("Speaker"))
+        await repository.create(_product("Headphones Stand"))
+        
+        by_prefix = await repository.list(filters={"search": "headph"})
+        by_description = await repository.list(filters={"search": "speaker description"})
+        ranked = await repository.list(filters={"search": "headphones"}, order_by="relevance")
+        
+        assert [p.name for p in by_prefix] == ["Wireless Headphones", "Headphones Stand"]
+        assert [p.name for p in by_description] == ["Speaker"]
+        assert len(ranked) == 2
+        assert await repository.count({"search": "headphones"}) == 2
+        assert await repository.list(filters={"search": "*\"()"}) == []
+    
+    @pytest.mark.asyncio
+    async def test_search_index_follows_updates_and_deletes(self, db_session):
+        """Test renamed products are reindexed and soft-deleted ones leave the index"""
+        repository = ProductRepositoryImpl(db_session)
+        renamed = await repository.create(_product("Laptop"))
+        deleted = await repository.create(_product("Laptop Bag"))
+        
+        renamed.name = "Notebook"
+        await repository.update(renamed)
+        await repository.delete(deleted.id)
+        
+        # "Laptop" still matches the renamed product through its description
+        assert [p.name for p in await repository.list(filters={"search": "laptop"})] == ["Notebook"]
+        assert [p.name for p in await repository.list(filters={"search": "notebook"})] == ["Notebook"]
+        assert await repository.list(filters={"search": "bag"}) == []
+    
+    @pytest.mark.asyncio
+    async def test_rebuild_search_index(self, db_session):
+        """Test rebuild indexes rows written without the repository"""
+        from infrastructure.database.sqlalchemy.models import ProductModel
+        from infrastructure.database.sqlalchemy.search import rebuild_search_index
+        
+        db_session.add(ProductModel(name="Camera", price_cents=1000, stock=1, category="photo", is_active=True))
+        await db_session.commit()
+        repository = ProductRepositoryImpl(db_session)
+        
+        assert await repository.list(filters={"search": "camera"}) == []
+        
+        connection = await db_session.connection()
+        await connection.run_sync(rebuild_search_index)
+        
+        assert [p.name for p in await repository.list(filters={"search": "camera"})] == ["Camera"]
+    
+    @pytest.mark.asyncio
+    async def test_fuzzy_search_matches_typos(self, db_session):
+        """Test fuzzy search finds misspelled names, ranked by similarity"""
+        repository = ProductRepositoryImpl(db_session, trigram_index=TrigramIndex())
+        await repository.create(_product("Phone Case"))
+        await repository.create(_product("Wireless Headphones"))
+        await repository.create(_product("Coffee Maker", category="home"))
+        
+        filters = {"search": "hedphones", "fuzzy": True}
+        products, total = await repository.list_with_total(filters=filters, order_by="relevance")
+        
+        # "Phone Case" shares the "phone" trigrams and ranks below
+        assert [p.name for p in products] == ["Wireless Headphones", "Phone Case"]
+        assert total == 2
+        assert await repository.list(filters={"search": "hedphones"}) == []
+    
+    @pytest.mark.asyncio
+    async def test_fuzzy_search_follows_writes(self, db_session):
+        """Test the trigram index is updated on commit"""
+        index = TrigramIndex()
+        repository = ProductRepositoryImpl(db_session, trigram_index=index)
+        phone = await repository.create(_product("Phone"))
+        await repository.list(filters={"search": "phnoe", "fuzzy": True})
+        
+        await repository.delete(phone.id)
+        await repository.create(_product("Smart Phone"))
+        products = await repository.list(filters={"search": "phnoe", "fuzzy": True}, order_by="relevance")
+        
+        assert [p.name for p in products] == ["Smart Phone"]
+        assert await repository.count(filters={"search": "phnoe", "fuzzy": True, "category": "home"}) == 0
+    
+    @pytest.mark.asyncio
+    async def test_create_many(self, db_session):
+        """Test bulk insert assigns IDs in input order and indexes the products"""
+        repository = ProductRepositoryImpl(db_session, trigram_index=TrigramIndex())
+        await repository.create(_product("Existing"))
+        
+        created = await repository.create_many([_product(f"Bulk Item {i}") for i in range(5)])
+        
+        assert [p.name for p in created] == [f"Bulk Item {i}" for i in range(5)]
+        assert [p.id for p in created] == [2, 3, 4, 5, 6]
+        assert all(p.created_at is not None for p in created)
+        assert (await repository.get_by_id(created[3].id)).name == "Bulk Item 3"
+        assert await repository.count(filters={"search": "bulk"}) == 5
+        assert await repository.count(filters={"search": "bulk itme", "fuzzy": True}) == 5
+    
+    @pytest.mark.asyncio
+    async def test_get_many(self, db_session):
+        """Test batch fetch keeps request order and skips unknown or deleted IDs"""
+        repository = ProductRepositoryImpl(db_session)
+        first = await repository.create(_product("First"))
+        second = await repository.create(_product("Second"))
+        deleted = await repository.create(_product("Deleted"))
+        await repository.delete(deleted.id)
+        
+        products = await repository.get_many([second.id, 999, first.id, deleted.id, second.id])
+        
+        assert [p.name for p in products] == ["Second", "First"]
+        assert await repository.get_many([]) == []
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_get_by_id_is_one_query(self, db_session):
+        """Test get_by_id calls in the same loop iteration are coalesced"""
+        repository = ProductRepositoryImpl(db_session)
+        first = await repository.create(_product("First"))
+        second = await repository.create(_product("Second"))
+        statements = []
+        
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+        
+        sync_engine = db_session.get_bind()
+        event.listen(sync_engine, "before_cursor_execute", record)
+        try:
+            products = await asyncio.gather(
+                repository.get_by_id(first.id),
+                repository.get_by_id(second.id),
+                repository.get_by_id(999),
+            )
+        finally:
+            event.remove(sync_engine, "before_cursor_execute", record)
+        
+        assert [p.name if p else None for p in products] == ["First", "Second", None]
+        assert len(statements) == 1
+    
+    @pytest.mark.asyncio
+    async def test_price_is_exact(self, db_session):
+        """Test prices round-trip exactly and range filters compare exact cents"""
+        repository = ProductRepositoryImpl(db_session)
+        await repository.create(_product("Cheap", "0.10"))
+        await repository.create(_product("Edge", "0.30"))
+        await repository.create(_product("Pricey", "0.31"))
+        
+        filters = {"min_price": Decimal("0.1") + Decimal("0.2"), "max_price": Decimal("0.30")}
+        products = await repository.list(filters=filters)
+        
+        assert [(p.name, p.price.value) for p in products] == [("Edge", Decimal("0.30"))]
+        assert str((await repository.get_by_id(1)).price.value) == "0.10"
+        assert await repository.count(filters={"min_price": Decimal("0.305")}) == 1
+
+
+    @pytest.mark.asyncio
+    async def test_list_fields_projects_columns(self, db_session):
+        """Test fields= selects only the requested columns"""
+        repository = ProductRepositoryImpl(db_session)
+        await repository.create(_product("Lamp", "19.99"))
+        await repository.create(_product("Desk", "120.00"))
+        statements = []
+        
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+        
+        sync_engine = db_session.get_bind()
+        event.listen(sync_engine, "before_cursor_execute", record)
+        try:
+            rows = await repository.list(fields=["name", "price"], order_by="-price")
+        finally:
+            event.remove(sync_engine, "before_cursor_execute", record)
+        
+        assert rows == [
+            {"id": 2, "name": "Desk", "price": Decimal("120.00")},
+            {"id": 1, "name": "Lamp", "price": Decimal("19.99")},
+        ]
+        assert "description" not in statements[0]
+    
+    @pytest.mark.asyncio
+    async def test_list_with_total_fields_and_keyset(self, db_session):
+        """Test projected pages seek by the sort field, which is always loaded"""
+        repository = ProductRepositoryImpl(db_session)
+        for name in ["A", "B", "C"]:
+            await repository.create(_product(name))
+        statements = []
+        
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+        
+        sync_engine = db_session.get_bind()
+        event.listen(sync_engine, "before_cursor_execute", record)
+        try:
+            rows, total = await repository.list_with_total(
+                fields=["stock"], order_by="name", after=("A", 1)
+            )
+        finally:
+            event.remove(sync_engine, "before_cursor_execute", record)
+        
+        assert rows == [{"id": 2, "stock": 5, "name": "B"}, {"id": 3, "stock": 5, "name": "C"}]
+        assert total == 3
+        assert len(statements) == 1  # No shard query without sharded products
+        with pytest.raises(ValueError):
+            await repository.list(fields=["secret"])
+    
+    @pytest.mark.asyncio
+    async def test_list_fields_bypasses_orm(self, db_session):
+        """Test projected listings load no ORM instances"""
+        repository = ProductRepositoryImpl(db_session)
+        await repository.create(_product("Lamp"))
+        db_session.expunge_all()
+        
+        rows, total = await repository.list_with_total(fields=["name", "description"])
+        
+        assert rows == [{"id": 1, "name": "Lamp", "description": "Lamp description"}]
+        assert total == 1
+        assert len(db_session.identity_map) == 0
+    
+    @pytest.mark.asyncio
+    async def test_update_fields_single_statement(self, db_session):
+        """Test a partial update is one UPDATE ... RETURNING plus the commit"""
+        repository = ProductRepositoryImpl(db_session)
+        product = await repository.create(_product("Lamp", "19.99"))
+        statements = []
+        
+        def record(conn, cursor, statement, *args):
+            statements.append(statement.split()[0])
+        
+        sync_engine = db_session.get_bind()
+        event.listen(sync_engine, "before_cursor_execute", record)
+        try:
+            changes = {"stock": Stock(2), "price": Price(Decimal("17.50"))}
+            updated = await repository.update_fields(product.id, changes)
+        finally:
+            event.remove(sync_engine, "before_cursor_execute", record)
+        
+        assert statements == ["UPDATE"]
+        assert (updated.stock.value, updated.price.value, updated.name) == (2, Decimal("17.50"), "Lamp")
+        assert (await repository.get_by_id(product.id)).stock.value == 2
+    
+    @pytest.mark.asyncio
+    async def test_update_fields_noop_skips_commit(self, db_session):
+        """Test unchanged values write nothing and return the current product"""
+        repository = ProductRepositoryImpl(db_session)
+        product = await repository.create(_product("Lamp"))
+        commits = []
+        
+        def record(session):
+            commits.append(session)
+        
+        event.listen(db_session.sync_session, "after_commit", record)
+        try:
+            unchanged = await repository.update_fields(product.id, {"name": "Lamp", "stock": Stock(5)})
+        finally:
+            event.remove(db_session.sync_session, "after_commit", record)
+        
+        assert unchanged.name == "Lamp"
+        assert unchanged.updated_at == product.updated_at
+        assert commits == []
+    
+    @pytest.mark.asyncio
+    async def test_update_and_delete_missing_raise_not_found(self, db_session):
+        """Test unknown or soft deleted products are reported as not found"""
+        from domain.exceptions.product_exceptions import ProductNotFoundError
+        
+        repository = ProductRepositoryImpl(db_session)
+        product = await repository.create(_product("Lamp"))
+        await repository.delete(product.id)
+        
+        with pytest.raises(ProductNotFoundError):
+            await repository.update_fields(product.id, {"name": "Desk"})
+        with pytest.raises(ProductNotFoundError):
+            await repository.delete(product.id)
+        with pytest.raises(ProductNotFoundError):
+            await repository.delete(999)
+
+@pytest.mark.asyncio
+async def test_migrate_float_price_to_cents():
+    """Test the migration converts a legacy Float price column to cents"""
+    from sqlalchemy import inspect
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from infrastructure.database.sqlalchemy.migrations import migrate_price_to_minor_units
+    
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text(
+                "CREATE TABLE products (id INTEGER PRIMARY KEY, name VARCHAR(255), price FLOAT NOT NULL)"
+            ))
+            await conn.execute(text("CREATE INDEX idx_products_price ON products (price)"))
+            await conn.execute(text("INSERT INTO products (name, price) VALUES ('a', 19.99), ('b', 0.3)"))
+            
+            assert await conn.run_sync(migrate_price_to_minor_units)
+            assert not await conn.run_sync(migrate_price_to_minor_units)
+            
+            columns = await conn.run_sync(
+                lambda sync_conn: [c["name"] for c in inspect(sync_conn).get_columns("products")]
+            )
+            prices = (await conn.execute(text("SELECT price_cents FROM products ORDER BY id"))).scalars().all()
+        
+        assert "price" not in columns
+        assert prices == [1999, 30]
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_add_stock_shards_column():
+    """Test the migration adds the sharded stock flag to existing products"""
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from infrastructure.database.sqlalchemy.migrations import add_stock_shards_column
+    
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE products (id INTEGER PRIMARY KEY, stock INTEGER NOT NULL)"))
+            await conn.execute(text("INSERT INTO products (stock) VALUES (3)"))
+            
+            assert await conn.run_sync(add_stock_shards_column)
+            assert not await conn.run_sync(add_stock_shards_column)
+            shards = (await conn.execute(text("SELECT stock_shards FROM products"))).scalar()
+        
+        assert shards == 0
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_add_version_column():
+    """Test the migration starts existing products at version 1"""
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from infrastructure.database.sqlalchemy.migrations import add_version_column
+    
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE products (id INTEGER PRIMARY KEY, stock INTEGER NOT NULL)"))
+            await conn.execute(text("INSERT INTO products (stock) VALUES (3)"))
+            
+            assert await conn.run_sync(add_version_column)
+            assert not await conn.run_sync(add_version_column)
+            version = (await conn.execute(text("SELECT version FROM products"))).scalar()
+        
+        assert version == 1
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_add_held_stock_column():
+    """Test the migration starts existing products with nothing held"""
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from infrastructure.database.sqlalchemy.migrations import add_held_stock_column
+    
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE products (id INTEGER PRIMARY KEY, stock INTEGER NOT NULL)"))
+            await conn.execute(text("INSERT INTO products (stock) VALUES (3)"))
+            
+            assert await conn.run_sync(add_held_stock_column)
+            assert not await conn.run_sync(add_held_stock_column)
+            held = (await conn.execute(text("SELECT held_stock FROM products"))).scalar()
+        
+        assert held == 0
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_add_popularity_column():
+    """Test the migration starts existing products with no views"""
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from infrastructure.database.sqlalchemy.migrations import add_popularity_column
+    
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE products (id INTEGER PRIMARY KEY, stock INTEGER NOT NULL)"))
+            await conn.execute(text("INSERT INTO products (stock) VALUES (3)"))
+            
+            assert await conn.run_sync(add_popularity_column)
+            assert not await conn.run_sync(add_popularity_column)
+            popularity = (await conn.execute(text("SELECT popularity FROM products"))).scalar()
+        
+        assert popularity == 0
+    finally:
+        await engine.dispose()
+
+
+class TestReadReplicaRouting:
+    """Test cases for reads served from a replica (a second SQLite file)"""
+    
+    @pytest_asyncio.fixture
+    async def databases(self, tmp_path):
+        """(primary session, replica session, refresh) on two SQLite files"""
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        from infrastructure.database.sqlalchemy.models import Base
+        from infrastructure.database.sqlalchemy.search import create_search_index
+        
+        primary_path, replica_path = tmp_path / "primary.db", tmp_path / "replica.db"
+        primary = create_async_engine(f"sqlite+aiosqlite:///{primary_path}")
+        replica = create_async_engine(f"sqlite+aiosqlite:///{replica_path}")
+        async with primary.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(create_search_index)
+        
+        def refresh():
+            """Bring the replica up to date (stands in for replication)"""
+            source, target = sqlite3.connect(primary_path), sqlite3.connect(replica_path)
+            try:
+                source.backup(target)
+            finally:
+                source.close()
+                target.close()
+        
+        refresh()
+        async with async_sessionmaker(primary, expire_on_commit=False)() as primary_session, \
+                async_sessionmaker(replica, expire_on_commit=False)() as replica_session:
+            yield primary_session, replica_session, refresh
+        await primary.dispose()
+        await replica.dispose()
+    
+    @pytest.mark.asyncio
+    async def test_reads_use_replica(self, databases):
+        """Test get/list/count see the replica, which lags until refreshed"""
+        primary_session, replica_session, refresh = databases
+        product = await ProductRepositoryImpl(primary_session).create(_product("Laptop"))
+        
+        repository = ProductRepositoryImpl(primary_session, read_session=replica_session)
+        assert await repository.get_by_id(product.id) is None
+        assert await repository.list() == []
+        assert await repository.count() == 0
+        
+        refresh()
+        await replica_session.rollback()  # End the snapshot of the previous reads
+        assert (await repository.get_by_id(product.id)).name == "Laptop"
+        assert await repository.count() == 1
+    
+    @pytest.mark.asyncio
+    async def test_reads_follow_own_writes(self, databases):
+        """Test reads switch to the primary once the repository has written"""
+        primary_session, replica_session, _ = databases
+        writes = []
+        repository = ProductRepositoryImpl(
+            primary_session, read_session=replica_session, on_write=lambda: writes.append(1)
+        )
+        
+        product = await repository.create(_product("Laptop"))
+        await repository.update_fields(product.id, {"name": "Desk"})
+        
+        assert (await repository.get_by_id(product.id)).name == "Desk"
+        assert [p.name for p in await repository.list()] == ["Desk"]
+        assert writes == [1, 1]
+    
+    @pytest.mark.asyncio
+    async def test_update_checks_existence_on_primary(self, databases):
+        """Test a write does not trust a lagging replica about missing rows"""
+        primary_session, replica_session, _ = databases
+        product = await ProductRepositoryImpl(primary_session).create(_product("Laptop"))
+        repository = ProductRepositoryImpl(primary_session, read_session=replica_session)
+        
+        # No-op update: the product exists on the primary only
+        unchanged = await repository.update_fields(product.id, {"name": "Laptop"})
+        
+        assert unchanged.id == product.id
+
+
+class TestStatementCaching:
+    """Test cases for list/count statements reused across calls"""
+    
+    @pytest.mark.asyncio
+    async def test_values_share_one_statement(self, db_session):
+        """Test different filter values reuse the statement of their shape"""
+        cache = StatementCache(max_entries=100)
+        repository = ProductRepositoryImpl(db_session, statement_cache=cache)
+        for name, price, category in [("Laptop", "900.00", "electronics"), ("Lamp", "30.00", "home")]:
+            await repository.create(_product(name, price, category))
+        
+        electronics = await repository.list(filters={"category": "electronics", "min_price": Decimal("10")})
+        home = await repository.list(filters={"category": "home", "min_price": Decimal("10.001")})
+        
+        assert [p.name for p in electronics] == ["Laptop"]
+        assert [p.name for p in home] == ["Lamp"]
+        assert cache.stats()["kinds"]["list"] == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+    
+    @pytest.mark.asyncio
+    async def test_cached_statements_match_uncached_results(self, db_session):
+        """Test searches, cursors, projections and totals through the cache"""
+        cache = StatementCache(max_entries=100)
+        cached = ProductRepositoryImpl(db_session, statement_cache=cache)
+        uncached = ProductRepositoryImpl(db_session)
+        for i in range(6):
+            await cached.create(_product(f"Phone {i}", f"{10 + i}.00"))
+        await cached.create(_product("Desk", "99.00", "home"))
+        
+        calls = [
+            dict(filters={"search": "phone"}, order_by="relevance", limit=3),
+            dict(filters={"search": "phone"}, order_by="relevance", limit=3, offset=3),
+            dict(filters={"search": "!!"}, limit=3),
+            dict(order_by="-price", after=(Decimal("14.00"), 5), limit=2),
+            dict(order_by="name", after=("Phone 1", 2), fields=["name"]),
+        ]
+        for _ in range(2):
+            for call in calls:
+                assert await cached.list(**call) == await uncached.list(**call)
+                assert await cached.list_with_total(**call) == await uncached.list_with_total(**call)
+        for filters in [None, {"category": "home"}, {"search": "desk"}]:
+            assert await cached.count(filters) == await uncached.count(filters)
+        
+        # The two relevance pages differ only in their offset value
+        kinds = cache.stats()["kinds"]
+        assert kinds["list"] == {"hits": 6, "misses": 4, "hit_rate": 0.6}
+        assert kinds["list_with_total"]["misses"] == 4
+    
+    @pytest.mark.asyncio
+    async def test_invalid_sort_is_not_cached(self, db_session):
+        """Test a statement that fails to build raises on every call"""
+        cache = StatementCache(max_entries=100)
+        repository = ProductRepositoryImpl(db_session, statement_cache=cache)
+        
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                await repository.list(order_by="stock")
+        assert cache.stats()["entries"] == 0
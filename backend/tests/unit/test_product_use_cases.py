@@ -2,14 +2,23 @@
 Unit tests for Product Use Cases
 """
 import pytest
+from decimal import Decimal
 from unittest.mock import AsyncMock
 from domain.entities.product import Product
 from domain.value_objects.price import Price
 from domain.value_objects.stock import Stock
 from application.use_cases.products.create_product import CreateProductUseCase
+from application.use_cases.products.bulk_create_products import BulkCreateProductsUseCase
 from application.use_cases.products.get_product import GetProductUseCase
+from application.use_cases.products.get_products import GetProductsUseCase
+from application.use_cases.products.get_product_facets import GetProductFacetsUseCase
 from application.use_cases.products.list_products import ListProductsUseCase
 from application.use_cases.products.update_product import UpdateProductUseCase
+from application.use_cases.products.reserve_stock import ReserveStockUseCase
+from application.use_cases.products.checkout import CheckoutUseCase
+from application.use_cases.products.set_stock_shards import SetStockShardsUseCase
+from application.use_cases.products.hold_stock import HoldStockUseCase
+from application.use_cases.products.release_stock_hold import ReleaseStockHoldUseCase
 from application.use_cases.products.delete_product import DeleteProductUseCase
 
 
@@ -75,6 +84,19 @@ class TestGetProductUseCase:
         assert result == sample_product
         mock_product_repository.get_by_id.assert_called_once_with(product_id)
     
+    @pytest.mark.asyncio
+    async def test_execute_counts_views_of_found_products(self, mock_product_repository, sample_product):
+        """Test on_view is told about found products only"""
+        viewed = []
+        mock_product_repository.get_by_id.side_effect = [sample_product, None]
+        use_case = GetProductUseCase(mock_product_repository, on_view=viewed.append)
+        
+        await use_case.execute(1)
+        with pytest.raises(Exception):
+            await use_case.execute(2)
+        
+        assert viewed == [sample_product.id]
+    
     @pytest.mark.asyncio
     async def test_execute_product_not_found(self, mock_product_repository):
         """Test getting non-existent product raises ProductNotFoundError"""
@@ -89,6 +111,74 @@ class TestGetProductUseCase:
             await use_case.execute(product_id)
 
 
+class TestBulkCreateProductsUseCase:
+    """Test cases for BulkCreateProductsUseCase"""
+    
+    @pytest.mark.asyncio
+    async def test_execute_reports_invalid_items(self, mock_product_repository, sample_product):
+        """Test valid items are created together and invalid ones reported by index"""
+        mock_product_repository.create_many.return_value = [sample_product]
+        items = [
+            {"name": " Lamp ", "price": "19.99", "stock": 3, "category": "home"},
+            {"name": "No price", "stock": 1, "category": "home"},
+            {"name": "Negative", "price": "5.00", "stock": -1, "category": "home"},
+        ]
+        
+        use_case = BulkCreateProductsUseCase(mock_product_repository)
+        result = await use_case.execute(items)
+        
+        assert result["items"] == [sample_product]
+        assert [error["index"] for error in result["errors"]] == [1, 2]
+        assert "price" in result["errors"][0]["error"]
+        products = mock_product_repository.create_many.call_args[0][0]
+        assert [p.name for p in products] == ["Lamp"]
+    
+    @pytest.mark.asyncio
+    async def test_execute_all_invalid_skips_repository(self, mock_product_repository):
+        """Test nothing is persisted when every item is invalid"""
+        use_case = BulkCreateProductsUseCase(mock_product_repository)
+        result = await use_case.execute([{"name": ""}])
+        
+        assert result["items"] == []
+        assert len(result["errors"]) == 1
+        mock_product_repository.create_many.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_execute_too_many_items_raises_error(self, mock_product_repository):
+        """Test the per-call item limit"""
+        use_case = BulkCreateProductsUseCase(mock_product_repository, max_items=2)
+        
+        with pytest.raises(ValueError):
+            await use_case.execute([{}, {}, {}])
+
+
+class TestGetProductsUseCase:
+    """Test cases for GetProductsUseCase"""
+    
+    @pytest.mark.asyncio
+    async def test_execute_fetches_in_one_call(self, mock_product_repository, sample_product):
+        """Test IDs are fetched with a single get_many call"""
+        mock_product_repository.get_many.return_value = [sample_product]
+        
+        use_case = GetProductsUseCase(mock_product_repository)
+        result = await use_case.execute([1, 2])
+        
+        assert result == [sample_product]
+        mock_product_repository.get_many.assert_called_once_with([1, 2])
+        mock_product_repository.get_by_id.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_execute_invalid_ids_raise_error(self, mock_product_repository):
+        """Test non-positive IDs and oversized requests are rejected"""
+        use_case = GetProductsUseCase(mock_product_repository)
+        
+        with pytest.raises(ValueError):
+            await use_case.execute([1, 0])
+        
+        with pytest.raises(ValueError):
+            await use_case.execute(list(range(1, 200)))
+
+
 class TestListProductsUseCase:
     """Test cases for ListProductsUseCase"""
     
@@ -99,8 +189,7 @@ class TestListProductsUseCase:
         
         filters = ProductFiltersDTO(category="electronics", is_active=True)
         mock_products = [sample_product]
-        mock_product_repository.list.return_value = mock_products
-        mock_product_repository.count.return_value = 1
+        mock_product_repository.list_with_total.return_value = (mock_products, 1)
         
         use_case = ListProductsUseCase(mock_product_repository)
         result = await use_case.execute(filters=filters, page=1, limit=20)
@@ -111,16 +200,15 @@ class TestListProductsUseCase:
         assert result["page"] == 1
         assert result["limit"] == 20
         assert result["total_pages"] == 1
-        mock_product_repository.list.assert_called_once()
-        mock_product_repository.count.assert_called_once()
+        mock_product_repository.list_with_total.assert_called_once()
+        mock_product_repository.count.assert_not_called()
     
     @pytest.mark.asyncio
     async def test_execute_no_filters(self, mock_product_repository):
         """Test listing products without filters"""
         from application.dto.product_dto import ProductFiltersDTO
         
-        mock_product_repository.list.return_value = []
-        mock_product_repository.count.return_value = 0
+        mock_product_repository.list_with_total.return_value = ([], 0)
         
         use_case = ListProductsUseCase(mock_product_repository)
         result = await use_case.execute(filters=ProductFiltersDTO(), page=1, limit=20)
@@ -135,8 +223,7 @@ class TestListProductsUseCase:
         from application.dto.product_dto import ProductFiltersDTO
         
         mock_products = [sample_product] * 5
-        mock_product_repository.list.return_value = mock_products
-        mock_product_repository.count.return_value = 25
+        mock_product_repository.list_with_total.return_value = (mock_products, 25)
         
         use_case = ListProductsUseCase(mock_product_repository)
         result = await use_case.execute(filters=ProductFiltersDTO(), page=2, limit=10)
@@ -145,6 +232,171 @@ class TestListProductsUseCase:
         assert result["limit"] == 10
         assert result["total"] == 25
         assert result["total_pages"] == 3  # 25 items / 10 per page = 3 pages
+    
+    @pytest.mark.asyncio
+    async def test_execute_returns_next_cursor_when_more_rows(self, mock_product_repository, sample_product):
+        """Test an extra fetched row produces next_cursor and is trimmed"""
+        from application.dto.product_dto import ProductFiltersDTO
+        from application.use_cases.products.list_products import decode_cursor
+        
+        mock_product_repository.list_with_total.return_value = ([sample_product] * 3, 10)
+        
+        use_case = ListProductsUseCase(mock_product_repository)
+        result = await use_case.execute(filters=ProductFiltersDTO(), page=1, limit=2, sort="price")
+        
+        assert len(result["items"]) == 2
+        assert mock_product_repository.list_with_total.call_args.kwargs["limit"] == 3
+        assert decode_cursor(result["next_cursor"]) == {"s": "price", "k": "99.99", "i": 1}
+    
+    @pytest.mark.asyncio
+    async def test_execute_with_cursor_seeks_after_position(self, mock_product_repository, sample_product):
+        """Test cursor is decoded into a keyset position for the repository"""
+        from application.dto.product_dto import ProductFiltersDTO
+        from application.use_cases.products.list_products import encode_cursor
+        
+        mock_product_repository.list_with_total.return_value = ([sample_product], 1)
+        cursor = encode_cursor("name", sample_product)
+        
+        use_case = ListProductsUseCase(mock_product_repository)
+        result = await use_case.execute(filters=ProductFiltersDTO(), limit=2, sort="name", cursor=cursor)
+        
+        assert mock_product_repository.list_with_total.call_args.kwargs["after"] == ("Test Product", 1)
+        assert result["page"] is None
+        assert result["next_cursor"] is None
+    
+    @pytest.mark.asyncio
+    async def test_execute_without_total_skips_count(self, mock_product_repository, sample_product):
+        """Test include_total=False uses a plain limit+1 list and reports has_more"""
+        from application.dto.product_dto import ProductFiltersDTO
+        
+        mock_product_repository.list.return_value = [sample_product] * 3
+        
+        use_case = ListProductsUseCase(mock_product_repository)
+        result = await use_case.execute(filters=ProductFiltersDTO(), limit=2, include_total=False)
+        
+        assert result["total"] is None
+        assert result["total_pages"] is None
+        assert result["has_more"] is True
+        assert len(result["items"]) == 2
+        mock_product_repository.list_with_total.assert_not_called()
+        mock_product_repository.count.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_execute_estimated_total(self, mock_product_repository, sample_product):
+        """Test total_mode=estimate uses statistics and skips the exact count"""
+        from application.dto.product_dto import ProductFiltersDTO
+        
+        mock_product_repository.estimate_count.return_value = 1000
+        mock_product_repository.list.return_value = [sample_product]
+        
+        use_case = ListProductsUseCase(mock_product_repository)
+        result = await use_case.execute(filters=ProductFiltersDTO(), limit=10, total_mode="estimate")
+        
+        assert result["total"] == 1000
+        assert result["total_mode"] == "estimate"
+        assert result["total_pages"] == 100
+        mock_product_repository.list_with_total.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_execute_estimate_unavailable_falls_back_to_exact(self, mock_product_repository, sample_product):
+        """Test missing estimate falls back to an exact total"""
+        from application.dto.product_dto import ProductFiltersDTO
+        
+        mock_product_repository.estimate_count.return_value = None
+        mock_product_repository.list_with_total.return_value = ([sample_product], 1)
+        
+        use_case = ListProductsUseCase(mock_product_repository)
+        result = await use_case.execute(filters=ProductFiltersDTO(search="x"), total_mode="estimate")
+        
+        assert result["total"] == 1
+        assert result["total_mode"] == "exact"
+    
+    @pytest.mark.asyncio
+    async def test_execute_invalid_cursor_raises_error(self, mock_product_repository):
+        """Test malformed or mismatched cursors raise ValueError"""
+        from application.dto.product_dto import ProductFiltersDTO
+        
+        use_case = ListProductsUseCase(mock_product_repository)
+        
+        with pytest.raises(ValueError):
+            await use_case.execute(filters=ProductFiltersDTO(), cursor="not-a-cursor")
+        
+        with pytest.raises(ValueError):
+            await use_case.execute(filters=ProductFiltersDTO(), sort="stock")
+    
+    @pytest.mark.asyncio
+    async def test_execute_sparse_fields(self, mock_product_repository):
+        """Test fields are passed down and sort-only columns trimmed from items"""
+        from application.dto.product_dto import ProductFiltersDTO
+        from application.use_cases.products.list_products import decode_cursor
+        
+        mock_product_repository.list_with_total.return_value = (
+            [{"id": 1, "name": "A", "price": Decimal("5.00")}, {"id": 2, "name": "B", "price": Decimal("7.50")}],
+            3
+        )
+        
+        use_case = ListProductsUseCase(mock_product_repository)
+        result = await use_case.execute(filters=ProductFiltersDTO(), limit=1, sort="price", fields=["name"])
+        
+        assert mock_product_repository.list_with_total.call_args.kwargs["fields"] == ["name"]
+        assert result["items"] == [{"id": 1, "name": "A"}]
+        assert decode_cursor(result["next_cursor"]) == {"s": "price", "k": "5.00", "i": 1}
+        
+        with pytest.raises(ValueError):
+            await use_case.execute(filters=ProductFiltersDTO(), fields=["password"])
+    
+    @pytest.mark.asyncio
+    async def test_execute_fuzzy_search(self, mock_product_repository, sample_product):
+        """Test fuzzy flag is passed with the search term and ranks by relevance"""
+        from application.dto.product_dto import ProductFiltersDTO
+        
+        mock_product_repository.list_with_total.return_value = ([sample_product], 1)
+        
+        use_case = ListProductsUseCase(mock_product_repository)
+        await use_case.execute(filters=ProductFiltersDTO(search="lpatop", fuzzy=True))
+        await use_case.execute(filters=ProductFiltersDTO(fuzzy=True))
+        
+        searched, unsearched = mock_product_repository.list_with_total.call_args_list
+        assert searched.kwargs["filters"] == {"search": "lpatop", "fuzzy": True}
+        assert searched.kwargs["order_by"] == "relevance"
+        assert unsearched.kwargs["filters"] == {}
+
+
+class TestGetProductFacetsUseCase:
+    """Test cases for GetProductFacetsUseCase"""
+    
+    @pytest.mark.asyncio
+    async def test_execute_builds_facets(self, mock_product_repository):
+        """Test repository counts are mapped to sorted categories and price ranges"""
+        from application.dto.product_dto import ProductFiltersDTO
+        
+        mock_product_repository.facets.return_value = {
+            "total": 6,
+            "in_stock": 4,
+            "categories": {"home": 2, "books": 2, "electronics": 4},
+            "price_buckets": [1, 5],
+        }
+        use_case = GetProductFacetsUseCase(mock_product_repository, [Decimal("50")])
+        
+        result = await use_case.execute(ProductFiltersDTO(category="electronics"))
+        
+        mock_product_repository.facets.assert_called_once_with({"category": "electronics"}, [Decimal("50")])
+        assert [(c.category, c.count) for c in result.categories] == [
+            ("electronics", 4), ("books", 2), ("home", 2)
+        ]
+        assert [(r.min_price, r.max_price, r.count) for r in result.price_ranges] == [
+            (Decimal("0"), Decimal("50"), 1), (Decimal("50"), None, 5)
+        ]
+        assert (result.total, result.in_stock) == (6, 4)
+    
+    @pytest.mark.asyncio
+    async def test_execute_unsorted_price_edges_raises_error(self, mock_product_repository):
+        """Test price range boundaries must be ascending"""
+        use_case = GetProductFacetsUseCase(mock_product_repository, [Decimal("100"), Decimal("50")])
+        
+        with pytest.raises(ValueError):
+            await use_case.execute()
+        mock_product_repository.facets.assert_not_called()
 
 
 class TestUpdateProductUseCase:
@@ -164,15 +416,30 @@ class TestUpdateProductUseCase:
             is_active=sample_update_product_dto.is_active,
         )
         
-        mock_product_repository.get_by_id.return_value = sample_product
-        mock_product_repository.update.return_value = updated_product
+        mock_product_repository.update_fields.return_value = updated_product
         
         use_case = UpdateProductUseCase(mock_product_repository)
         result = await use_case.execute(product_id, sample_update_product_dto)
         
         assert result == updated_product
-        mock_product_repository.get_by_id.assert_called_once_with(product_id)
-        mock_product_repository.update.assert_called_once()
+        mock_product_repository.get_by_id.assert_not_called()
+        mock_product_repository.update_fields.assert_called_once()
+        assert mock_product_repository.update_fields.call_args[0][0] == product_id
+    
+    @pytest.mark.asyncio
+    async def test_execute_expected_version(self, mock_product_repository, sample_product):
+        """Test the expected version comes from the caller, else from the DTO"""
+        from application.dto.product_dto import UpdateProductDTO
+        
+        mock_product_repository.update_fields.return_value = sample_product
+        use_case = UpdateProductUseCase(mock_product_repository)
+        
+        await use_case.execute(1, UpdateProductDTO(name="A", version=3))
+        await use_case.execute(1, UpdateProductDTO(name="A", version=3), expected_version=5)
+        await use_case.execute(1, UpdateProductDTO(name="A"))
+        
+        versions = [call.kwargs["expected_version"] for call in mock_product_repository.update_fields.call_args_list]
+        assert versions == [3, 5, None]
     
     @pytest.mark.asyncio
     async def test_execute_product_not_found(self, mock_product_repository, sample_update_product_dto):
@@ -180,14 +447,173 @@ class TestUpdateProductUseCase:
         from domain.exceptions.product_exceptions import ProductNotFoundError
         
         product_id = 999
-        mock_product_repository.get_by_id.return_value = None
+        mock_product_repository.update_fields.side_effect = ProductNotFoundError("not found")
         
         use_case = UpdateProductUseCase(mock_product_repository)
         
         with pytest.raises(ProductNotFoundError):
             await use_case.execute(product_id, sample_update_product_dto)
+    
+    @pytest.mark.asyncio
+    async def test_execute_passes_only_provided_fields(self, mock_product_repository):
+        """Test PATCH semantics: only provided fields reach the repository"""
+        from application.dto.product_dto import UpdateProductDTO
+        
+        use_case = UpdateProductUseCase(mock_product_repository)
+        await use_case.execute(1, UpdateProductDTO(stock=3, name=" Lamp "))
+        
+        changes = mock_product_repository.update_fields.call_args[0][1]
+        assert changes == {"name": "Lamp", "stock": Stock(3)}
+        
+        with pytest.raises(ValueError):
+            await use_case.execute(1, UpdateProductDTO())
+        with pytest.raises(ValueError):
+            await use_case.execute(1, UpdateProductDTO(name="   "))
+
+
+class TestReserveStockUseCase:
+    """Test cases for ReserveStockUseCase"""
+    
+    @pytest.mark.asyncio
+    async def test_execute_reserves_stock(self, mock_product_repository):
+        """Test the decrement is delegated to the repository in one call"""
+        mock_product_repository.decrement_stock.return_value = 7
+        use_case = ReserveStockUseCase(mock_product_repository)
+        
+        result = await use_case.execute(1, 3)
+        
+        mock_product_repository.decrement_stock.assert_called_once_with(1, 3)
+        mock_product_repository.get_by_id.assert_not_called()
+        assert (result.product_id, result.quantity, result.remaining_stock) == (1, 3, 7)
+    
+    @pytest.mark.asyncio
+    async def test_execute_insufficient_stock_propagates(self, mock_product_repository):
+        """Test InsufficientStock from the repository reaches the caller"""
+        from domain.exceptions.product_exceptions import InsufficientStock
+        
+        mock_product_repository.decrement_stock.side_effect = InsufficientStock("Only 1 items available")
+        use_case = ReserveStockUseCase(mock_product_repository)
+        
+        with pytest.raises(InsufficientStock):
+            await use_case.execute(1, 2)
+    
+    @pytest.mark.asyncio
+    async def test_execute_invalid_quantity_raises_error(self, mock_product_repository):
+        """Test non-positive quantities are rejected before touching the database"""
+        from domain.exceptions.product_exceptions import InvalidStockOperation
+        
+        use_case = ReserveStockUseCase(mock_product_repository)
+        
+        with pytest.raises(InvalidStockOperation):
+            await use_case.execute(1, 0)
+        with pytest.raises(ValueError):
+            await use_case.execute(0, 1)
+        mock_product_repository.decrement_stock.assert_not_called()
+
+
+class TestStockHoldUseCases:
+    """Test cases for HoldStockUseCase and ReleaseStockHoldUseCase"""
+    
+    @pytest.mark.asyncio
+    async def test_hold_uses_default_ttl(self, mock_product_repository):
+        """Test the hold expires after the default lifetime"""
+        from datetime import datetime, timedelta
+        from domain.entities.stock_hold import StockHold
+        
+        mock_product_repository.hold_stock.side_effect = lambda product_id, quantity, expires_at: StockHold(
+            id=4, product_id=product_id, quantity=quantity, expires_at=expires_at
+        )
+        use_case = HoldStockUseCase(mock_product_repository, default_ttl_seconds=600)
+        
+        before = datetime.now()
+        result = await use_case.execute(1, 2)
+        
+        assert (result.id, result.product_id, result.quantity) == (4, 1, 2)
+        assert before + timedelta(seconds=600) <= result.expires_at <= datetime.now() + timedelta(seconds=600)
+    
+    @pytest.mark.asyncio
+    async def test_hold_invalid_ttl_or_quantity_raises_error(self, mock_product_repository):
+        """Test lifetimes above the maximum and non-positive quantities are rejected"""
+        from domain.exceptions.product_exceptions import InvalidStockOperation
         
-        mock_product_repository.update.assert_not_called()
+        use_case = HoldStockUseCase(mock_product_repository, max_ttl_seconds=60)
+        
+        with pytest.raises(ValueError):
+            await use_case.execute(1, 1, ttl_seconds=61)
+        with pytest.raises(InvalidStockOperation):
+            await use_case.execute(1, 0)
+        mock_product_repository.hold_stock.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_release_missing_hold_raises_not_found(self, mock_product_repository):
+        """Test releasing a hold that no longer exists is reported"""
+        from domain.exceptions.product_exceptions import StockHoldNotFoundError
+        
+        mock_product_repository.release_holds.return_value = 0
+        use_case = ReleaseStockHoldUseCase(mock_product_repository)
+        
+        with pytest.raises(StockHoldNotFoundError):
+            await use_case.execute(7)
+        mock_product_repository.release_holds.assert_called_once_with([7])
+
+
+class TestCheckoutUseCase:
+    """Test cases for CheckoutUseCase"""
+    
+    @pytest.mark.asyncio
+    async def test_execute_merges_lines(self, mock_product_repository):
+        """Test repeated products are merged into one decrement per product"""
+        from application.dto.product_dto import CheckoutLineDTO
+        
+        mock_product_repository.decrement_stock_many.return_value = {2: 4, 1: 9}
+        use_case = CheckoutUseCase(mock_product_repository)
+        
+        result = await use_case.execute([
+            CheckoutLineDTO(product_id=2, quantity=1),
+            CheckoutLineDTO(product_id=1, quantity=1),
+            CheckoutLineDTO(product_id=2, quantity=2),
+        ])
+        
+        mock_product_repository.decrement_stock_many.assert_called_once_with({2: 3, 1: 1})
+        assert [(r.product_id, r.quantity, r.remaining_stock) for r in result.items] == [(2, 3, 4), (1, 1, 9)]
+    
+    @pytest.mark.asyncio
+    async def test_execute_too_many_lines_raises_error(self, mock_product_repository):
+        """Test baskets over the line limit are rejected before touching the database"""
+        from application.dto.product_dto import CheckoutLineDTO
+        
+        use_case = CheckoutUseCase(mock_product_repository, max_lines=2)
+        
+        with pytest.raises(ValueError):
+            await use_case.execute([CheckoutLineDTO(product_id=i, quantity=1) for i in range(1, 4)])
+        with pytest.raises(ValueError):
+            await use_case.execute([])
+        mock_product_repository.decrement_stock_many.assert_not_called()
+
+
+class TestSetStockShardsUseCase:
+    """Test cases for SetStockShardsUseCase"""
+    
+    @pytest.mark.asyncio
+    async def test_execute_sets_shards(self, mock_product_repository, sample_product):
+        """Test the shard count is passed to the repository"""
+        mock_product_repository.set_stock_shards.return_value = sample_product
+        use_case = SetStockShardsUseCase(mock_product_repository, max_shards=8)
+        
+        result = await use_case.execute(1, 8)
+        
+        assert result == sample_product
+        mock_product_repository.set_stock_shards.assert_called_once_with(1, 8)
+    
+    @pytest.mark.asyncio
+    async def test_execute_too_many_shards_raises_error(self, mock_product_repository):
+        """Test shard counts outside 0..max_shards are rejected"""
+        use_case = SetStockShardsUseCase(mock_product_repository, max_shards=8)
+        
+        for shards in (-1, 9):
+            with pytest.raises(ValueError):
+                await use_case.execute(1, shards)
+        mock_product_repository.set_stock_shards.assert_not_called()
 
 
 class TestDeleteProductUseCase:
@@ -197,14 +623,12 @@ class TestDeleteProductUseCase:
     async def test_execute_product_exists(self, mock_product_repository, sample_product):
         """Test deleting existing product"""
         product_id = 1
-        mock_product_repository.get_by_id.return_value = sample_product
-        mock_product_repository.delete.return_value = True
         
         use_case = DeleteProductUseCase(mock_product_repository)
         result = await use_case.execute(product_id)
         
-        assert result is True
-        mock_product_repository.get_by_id.assert_called_once_with(product_id)
+        assert result is None
+        mock_product_repository.get_by_id.assert_not_called()
         mock_product_repository.delete.assert_called_once_with(product_id)
     
     @pytest.mark.asyncio
@@ -213,14 +637,12 @@ class TestDeleteProductUseCase:
         from domain.exceptions.product_exceptions import ProductNotFoundError
         
         product_id = 999
-        mock_product_repository.get_by_id.return_value = None
+        mock_product_repository.delete.side_effect = ProductNotFoundError("not found")
         
         use_case = DeleteProductUseCase(mock_product_repository)
         
         with pytest.raises(ProductNotFoundError):
             await use_case.execute(product_id)
-        
-        mock_product_repository.delete.assert_not_called()
     
     @pytest.mark.asyncio
     async def test_execute_invalid_product_id_raises_error(self, mock_product_repository):
@@ -0,0 +1,108 @@
+"""
+Unit tests for per-request query counting and budgets
+"""
+import logging
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import Depends, FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from infrastructure.config.settings import Settings
+from infrastructure.database.query_counter import install_query_counter, track_queries
+from presentation.middleware.query_budget import (
+    QUERY_COUNT_HEADER,
+    QUERY_TIME_HEADER,
+    QueryBudgetExceeded,
+    QueryBudgetMiddleware,
+    query_budget,
+)
+
+
+@pytest_asyncio.fixture
+async def engine():
+    """In-memory engine with the query counter installed"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    install_query_counter(engine.sync_engine)
+    yield engine
+    await engine.dispose()
+
+
+def _app(engine, **settings) -> FastAPI:
+    """App whose /queries/{n} route runs n identical statements (budget 2)"""
+    app = FastAPI()
+    app.add_middleware(QueryBudgetMiddleware, settings=Settings(**settings))
+    
+    @app.get("/queries/{n}", dependencies=[Depends(query_budget(2))])
+    async def run_queries(n: int):
+        async with engine.connect() as conn:
+            for i in range(n):
+                await conn.execute(text("SELECT :i"), {"i": i})
+        return {"ran": n}
+    
+    return app
+
+
+async def _get(app: FastAPI, path: str) -> httpx.Response:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return await client.get(path)
+
+
+class TestQueryBudgetMiddleware:
+    """Test cases for QueryBudgetMiddleware"""
+    
+    @pytest.mark.asyncio
+    async def test_headers_report_count_and_time(self, engine):
+        """Test query count and DB time headers outside production"""
+        response = await _get(_app(engine, ENVIRONMENT="development"), "/queries/2")
+        
+        assert response.headers[QUERY_COUNT_HEADER] == "2"
+        assert float(response.headers[QUERY_TIME_HEADER]) > 0
+    
+    @pytest.mark.asyncio
+    async def test_no_headers_in_production(self, engine):
+        """Test production responses do not expose query statistics"""
+        response = await _get(_app(engine, ENVIRONMENT="production"), "/queries/1")
+        
+        assert response.status_code == 200
+        assert QUERY_COUNT_HEADER not in response.headers
+    
+    @pytest.mark.asyncio
+    async def test_budget_exceeded_logged(self, engine, caplog):
+        """Test log mode reports the route and count but serves the request"""
+        with caplog.at_level(logging.WARNING, logger="presentation.middleware.query_budget"):
+            response = await _get(_app(engine, QUERY_BUDGET_MODE="log"), "/queries/3")
+        
+        assert response.status_code == 200
+        assert "GET /queries/{n} ran 3 queries (budget 2)" in caplog.text
+    
+    @pytest.mark.asyncio
+    async def test_budget_exceeded_raises(self, engine):
+        """Test raise mode fails the request"""
+        with pytest.raises(QueryBudgetExceeded):
+            await _get(_app(engine, QUERY_BUDGET_MODE="raise"), "/queries/3")
+    
+    @pytest.mark.asyncio
+    async def test_repeated_statements_flagged(self, engine, caplog):
+        """Test a statement repeated past the threshold is reported as N+1"""
+        with caplog.at_level(logging.WARNING, logger="presentation.middleware.query_budget"):
+            await _get(_app(engine, QUERY_REPEAT_THRESHOLD=2), "/queries/2")
+        
+        assert "Possible N+1 in GET /queries/{n}: statement executed 2 times: SELECT ?" in caplog.text
+
+
+class TestQueryStats:
+    """Test cases for statement tracking outside requests"""
+    
+    @pytest.mark.asyncio
+    async def test_only_tracked_context_counted(self, engine):
+        """Test statements are recorded into the active context only"""
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            with track_queries(budget=1) as stats:
+                await conn.execute(text("SELECT 1"))
+                await conn.execute(text("SELECT 2"))
+        
+        assert stats.count == 2
+        assert stats.over_budget
+        assert stats.repeated(1) == [("SELECT 1", 1), ("SELECT 2", 1)]
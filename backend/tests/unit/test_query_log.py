@@ -0,0 +1,108 @@
+"""
+Unit tests for the slow query log
+"""
+import logging
+import pytest
+from decimal import Decimal
+from domain.entities.product import Product
+from domain.value_objects.price import Price
+from domain.value_objects.stock import Stock
+from infrastructure.database.query_log import SlowQueryLog, parameter_shape
+from infrastructure.database.sqlalchemy.repositories.product_repository_impl import ProductRepositoryImpl
+
+LOGGER = "infrastructure.database.query_log"
+
+
+async def _repository(db_session, log: SlowQueryLog) -> ProductRepositoryImpl:
+    """Repository on db_session with one product, slow query log installed"""
+    repository = ProductRepositoryImpl(db_session)
+    await repository.create(Product(
+        id=None, name="Laptop", price=Price(Decimal("10.00")), stock=Stock(1),
+        category="electronics", description=None, is_active=True
+    ))
+    log.install(db_session.get_bind())
+    return repository
+
+
+def _entries(caplog) -> list:
+    return [r.getMessage() for r in caplog.records if r.name == LOGGER]
+
+
+class TestSlowQueryLog:
+    """Test cases for SlowQueryLog"""
+    
+    @pytest.mark.asyncio
+    async def test_logs_caller_parameter_shape_and_plan(self, db_session, caplog):
+        """Test an entry names the repository method, hides values, has a plan"""
+        repository = await _repository(db_session, SlowQueryLog(threshold_ms=0, max_per_minute=100))
+        
+        with caplog.at_level(logging.WARNING, logger=LOGGER):
+            await repository.list(filters={"category": "secret-category"})
+        
+        entry, = _entries(caplog)
+        assert "ProductRepositoryImpl.list" in entry
+        assert "'category': 'str'" in entry
+        assert "secret-category" not in entry
+        assert "plan: " in entry
+    
+    @pytest.mark.asyncio
+    async def test_plan_captured_once_per_statement(self, db_session, caplog):
+        """Test a repeated statement is not explained again"""
+        repository = await _repository(db_session, SlowQueryLog(threshold_ms=0, max_per_minute=100))
+        
+        with caplog.at_level(logging.WARNING, logger=LOGGER):
+            await repository.count({"category": "a"})
+            await repository.count({"category": "b"})
+        
+        first, second = _entries(caplog)
+        assert "plan: " in first
+        assert "plan: " not in second
+    
+    @pytest.mark.asyncio
+    async def test_writes_are_not_explained(self, db_session, caplog):
+        """Test only read statements are re-run under EXPLAIN"""
+        repository = await _repository(db_session, SlowQueryLog(threshold_ms=0, max_per_minute=100))
+        product, = await repository.list()
+        
+        with caplog.at_level(logging.WARNING, logger=LOGGER):
+            await repository.update_fields(product.id, {"name": "Desk"})
+        
+        update = [entry for entry in _entries(caplog) if "UPDATE products" in entry]
+        assert update and "plan: " not in update[0]
+    
+    @pytest.mark.asyncio
+    async def test_fast_statements_not_logged(self, db_session, caplog):
+        """Test statements under the threshold are only timed"""
+        log = SlowQueryLog(threshold_ms=60_000, max_per_minute=100)
+        repository = await _repository(db_session, log)
+        
+        with caplog.at_level(logging.WARNING, logger=LOGGER):
+            await repository.list()
+        
+        assert _entries(caplog) == []
+        assert log.slow == 0
+    
+    @pytest.mark.asyncio
+    async def test_rate_limited(self, db_session, caplog):
+        """Test entries over the per-minute limit are counted, then reported"""
+        log = SlowQueryLog(threshold_ms=0, max_per_minute=2, explain=False)
+        repository = await _repository(db_session, log)
+        
+        with caplog.at_level(logging.WARNING, logger=LOGGER):
+            for _ in range(5):
+                await repository.count()
+            assert len(_entries(caplog)) == 2
+            
+            log._window_start -= 60
+            await repository.count()
+        
+        entries = _entries(caplog)
+        assert len(entries) == 3
+        assert entries[-1].endswith("(3 slow queries not logged)")
+    
+    def test_parameter_shape(self):
+        """Test parameters are described by type only"""
+        assert parameter_shape({"name": "x", "limit": 5}) == {"name": "str", "limit": "int"}
+        assert parameter_shape(("x", 1.5)) == ["str", "float"]
+        assert parameter_shape([{"id": 1}, {"id": 2}], executemany=True) == {"rows": 2, "shape": {"id": "int"}}
+        assert parameter_shape(("x", 1), names=["name", "limit"]) == {"name": "str", "limit": "int"}
@@ -0,0 +1,80 @@
+"""
+Unit tests for ResultCache
+"""
+import time
+from decimal import Decimal
+from infrastructure.cache.result_cache import ResultCache, normalize_filters
+
+
+class TestResultCache:
+    """Test cases for the in-process result cache"""
+    
+    def test_normalize_filters_equivalent_dicts(self):
+        """Test equivalent filter dicts produce the same key"""
+        a = normalize_filters({"min_price": Decimal("10.00"), "category": "home", "search": None})
+        b = normalize_filters({"category": "home", "min_price": Decimal("10")})
+        
+        assert a == b
+        assert normalize_filters(None) == normalize_filters({}) == ()
+    
+    def test_put_and_get(self):
+        """Test stored values are returned and counted as hits"""
+        cache = ResultCache(ttl_seconds=60, max_entries=10)
+        cache.put(("k",), 42)
+        
+        assert cache.get(("k",)) == 42
+        assert cache.get(("missing",)) is None
+        assert (cache.hits, cache.misses) == (1, 1)
+    
+    def test_expired_entries_are_dropped(self):
+        """Test entries past their TTL are not returned"""
+        cache = ResultCache(ttl_seconds=0.001, max_entries=10)
+        cache.put(("k",), 1)
+        
+        time.sleep(0.01)
+        assert cache.get(("k",)) is None
+    
+    def test_lru_eviction(self):
+        """Test least recently used entry is evicted when full"""
+        cache = ResultCache(ttl_seconds=60, max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+    
+    def test_invalidate_discards_stale_puts(self):
+        """Test results computed before an invalidation are not stored"""
+        cache = ResultCache(ttl_seconds=60, max_entries=10)
+        cache.put("a", 1)
+        generation = cache.generation_for("b")
+        cache.invalidate()
+        cache.put("b", 2, generation)
+        
+        assert cache.get("a") is None
+        assert cache.get("b") is None
+    
+    def test_scoped_invalidate(self):
+        """Test invalidating a scope keeps other entries and their pending puts"""
+        cache = ResultCache(ttl_seconds=60, max_entries=10)
+        cache.put(("facets", "a"), 1)
+        cache.put(("count", "a"), 2)
+        facets_generation = cache.generation_for(("facets", "b"))
+        count_generation = cache.generation_for(("count", "b"))
+        cache.invalidate("facets")
+        cache.put(("facets", "b"), 3, facets_generation)
+        cache.put(("count", "b"), 4, count_generation)
+        
+        assert cache.get(("facets", "a")) is None
+        assert cache.get(("facets", "b")) is None
+        assert cache.get(("count", "a")) == 2
+        assert cache.get(("count", "b")) == 4
+    
+    def test_zero_ttl_disables_cache(self):
+        """Test TTL of 0 stores nothing"""
+        cache = ResultCache(ttl_seconds=0, max_entries=10)
+        cache.put("a", 1)
+        
+        assert cache.get("a") is None
@@ -0,0 +1,61 @@
+"""
+Unit tests for StatementCache
+"""
+from infrastructure.database.statement_cache import StatementCache
+
+
+class TestStatementCache:
+    """Test cases for the shape-keyed statement cache"""
+    
+    def test_builds_once_per_shape(self):
+        """Test a shape is built on the first call only"""
+        cache = StatementCache(max_entries=10)
+        builds = []
+        
+        def build():
+            builds.append(1)
+            return object()
+        
+        first = cache.get_or_build("list", ("category",), build)
+        second = cache.get_or_build("list", ("category",), build)
+        
+        assert first is second
+        assert len(builds) == 1
+    
+    def test_kinds_are_separate(self):
+        """Test the same shape under another kind is another statement"""
+        cache = StatementCache(max_entries=10)
+        
+        assert cache.get_or_build("list", (), object) is not cache.get_or_build("count", (), object)
+    
+    def test_stats_per_kind(self):
+        """Test hits and misses are reported per query kind"""
+        cache = StatementCache(max_entries=10)
+        for shape in [("a",), ("a",), ("a",), ("b",)]:
+            cache.get_or_build("list", shape, object)
+        cache.get_or_build("count", (), object)
+        
+        stats = cache.stats()
+        assert stats["entries"] == 3
+        assert stats["kinds"]["list"] == {"hits": 2, "misses": 2, "hit_rate": 0.5}
+        assert stats["kinds"]["count"]["hit_rate"] == 0.0
+    
+    def test_evicts_least_recently_used(self):
+        """Test the oldest unused shape is dropped when full"""
+        cache = StatementCache(max_entries=2)
+        a = cache.get_or_build("list", ("a",), object)
+        cache.get_or_build("list", ("b",), object)
+        cache.get_or_build("list", ("a",), object)
+        cache.get_or_build("list", ("c",), object)
+        
+        assert cache.get_or_build("list", ("a",), object) is a
+        assert cache.stats()["kinds"]["list"]["misses"] == 3
+        cache.get_or_build("list", ("b",), object)
+        assert cache.stats()["kinds"]["list"]["misses"] == 4
+    
+    def test_zero_size_disables_caching(self):
+        """Test max_entries=0 builds every time"""
+        cache = StatementCache(max_entries=0)
+        
+        assert cache.get_or_build("list", (), object) is not cache.get_or_build("list", (), object)
+        assert cache.stats()["entries"] == 0
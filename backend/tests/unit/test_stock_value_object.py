@@ -68,4 +68,13 @@ class TestStockOperations:
         assert stock2 > stock1
         assert stock1 <= stock2
         assert stock2 >= stock1
-
+    
+    def test_held_stock_is_not_available(self):
+        """Test held units count as on hand but not as available"""
+        stock = Stock(0, held=3)
+        
+        assert stock.is_available() is False
+        assert stock.on_hand == 3
+        assert (stock + 2).held == 3
+        with pytest.raises(ValueError, match="Held stock cannot be negative"):
+            Stock(1, held=-1)
@@ -0,0 +1,79 @@
+"""
+Unit tests for the in-process trigram index
+"""
+import pytest
+from infrastructure.search.trigram_index import TrigramIndex, trigrams
+
+
+def _index() -> TrigramIndex:
+    """Index with a few product names"""
+    index = TrigramIndex()
+    index.load([
+        (1, "Wireless Headphones"),
+        (2, "Apple iPhone 15"),
+        (3, "Coffee Maker"),
+        (4, "Phone Case"),
+    ])
+    return index
+
+
+class TestTrigramIndex:
+    """Test cases for TrigramIndex"""
+    
+    def test_trigrams_are_padded_per_word(self):
+        """Test words are lower-cased and padded like pg_trgm"""
+        assert trigrams("Shoe") == {"  s", " sh", "sho", "hoe", "oe "}
+    
+    def test_misspelled_names_are_found(self):
+        """Test typos still match the intended product"""
+        index = _index()
+        
+        assert index.search("hedphones")[0][0] == 1
+        assert index.search("iphnoe")[0][0] == 2
+    
+    def test_results_are_ranked_by_similarity(self):
+        """Test closer names rank first and scores are descending"""
+        results = _index().search("phone")
+        
+        assert [product_id for product_id, _ in results][:2] == [4, 2]
+        assert [score for _, score in results] == sorted((score for _, score in results), reverse=True)
+    
+    def test_threshold_and_limit(self):
+        """Test unrelated names are dropped and limit is respected"""
+        index = _index()
+        
+        assert index.search("xyzzy") == []
+        assert len(index.search("phone", limit=1)) == 1
+    
+    def test_add_and_remove(self):
+        """Test the index follows writes"""
+        index = _index()
+        
+        index.remove(1)
+        index.add(5, "Studio Headphones")
+        
+        assert index.search("hedphones")[0][0] == 5
+        assert 1 not in [product_id for product_id, _ in index.search("hedphones")]
+        assert len(index) == 4
+    
+    def test_needs_refresh(self):
+        """Test refresh is needed before loading and after the interval"""
+        assert TrigramIndex().needs_refresh()
+        assert not _index().needs_refresh()
+        assert TrigramIndex(refresh_seconds=-1).needs_refresh()
+    
+    @pytest.mark.asyncio
+    async def test_refresh_serves_previous_contents(self):
+        """Test searches use the old contents until a rebuild finishes, keeping writes made meanwhile"""
+        index = _index()
+        rebuild = index.refresh([(5, "Coffee Grinder")])
+        index.add(6, "Coffee Mug")
+        
+        assert not index.needs_refresh()
+        assert sorted(product_id for product_id, _ in index.search("cofee")) == [3, 6]
+        
+        await rebuild
+        
+        assert sorted(product_id for product_id, _ in index.search("cofee")) == [5, 6]
+        assert index.search("headphones") == []
+        assert not index.needs_refresh()
@@ -0,0 +1,139 @@
+"""
+Unit tests for ViewCounter (write-coalescing product views with a journal)
+"""
+import json
+import os
+import subprocess
+import pytest
+import pytest_asyncio
+from decimal import Decimal
+from domain.entities.product import Product
+from domain.value_objects.price import Price
+from domain.value_objects.stock import Stock
+from infrastructure.database.view_counter import ViewCounter
+from infrastructure.database.sqlalchemy.repositories.product_repository_impl import ProductRepositoryImpl
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    """Session factory on a fresh in-memory SQLite database shared by its sessions"""
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import StaticPool
+    from infrastructure.database.sqlalchemy.models import Base
+    from infrastructure.database.sqlalchemy.search import create_search_index
+    
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(create_search_index)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with factory() as session:
+        await ProductRepositoryImpl(session).create_many([
+            Product(
+                id=None,
+                name=f"Product {i}",
+                price=Price(Decimal("10.00")),
+                stock=Stock(5),
+                category="electronics",
+                description=None,
+                is_active=True,
+            )
+            for i in range(3)
+        ])
+    yield factory
+    await engine.dispose()
+
+
+async def _popularity(session_factory) -> dict:
+    """{product ID: popularity} of every product"""
+    async with session_factory() as session:
+        products = await ProductRepositoryImpl(session).list(limit=10)
+    return {product.id: product.popularity for product in products}
+
+
+def _dead_pid() -> int:
+    """ID of a process that has exited"""
+    process = subprocess.Popen(["true"])
+    process.wait()
+    return process.pid
+
+
+class TestViewCounter:
+    """Test cases for ViewCounter"""
+    
+    @pytest.mark.asyncio
+    async def test_flush_coalesces_increments(self, session_factory):
+        """Test increments are summed per product and written in one flush"""
+        counter = ViewCounter(session_factory, flush_seconds=60, flush_threshold=100, journal_seconds=1)
+        for product_id in (1, 2, 1, 1):
+            counter.increment(product_id)
+        
+        assert await _popularity(session_factory) == {1: 0, 2: 0, 3: 0}
+        assert await counter.flush() == 4
+        assert await counter.flush() == 0
+        counter.increment(2, 5)
+        await counter.flush()
+        
+        assert await _popularity(session_factory) == {1: 3, 2: 6, 3: 0}
+        assert (counter.flushes, counter.flushed_views) == (2, 9)
+    
+    def test_threshold_requests_early_flush(self):
+        """Test the background flush is woken once enough products are buffered"""
+        counter = ViewCounter(None, flush_seconds=60, flush_threshold=2, journal_seconds=1)
+        
+        counter.increment(1)
+        counter.increment(1)
+        assert not counter._threshold_reached.is_set()
+        counter.increment(2)
+        assert counter._threshold_reached.is_set()
+    
+    @pytest.mark.asyncio
+    async def test_journal_tracks_unwritten_views(self, session_factory, tmp_path):
+        """Test the journal holds the buffered views and is removed once they are written"""
+        counter = ViewCounter(
+            session_factory, flush_seconds=60, flush_threshold=100, journal_seconds=1, journal_dir=str(tmp_path)
+        )
+        journal_path = tmp_path / f"views-{os.getpid()}.json"
+        counter.increment(1, 2)
+        counter.increment(3)
+        
+        await counter.write_journal()
+        assert json.loads(journal_path.read_text()) == {"1": 2, "3": 1}
+        
+        await counter.flush()
+        assert not journal_path.exists()
+    
+    @pytest.mark.asyncio
+    async def test_recover_claims_journals_of_dead_processes(self, session_factory, tmp_path):
+        """Test views journaled by a crashed process are flushed, those of live ones left alone"""
+        dead, alive = _dead_pid(), os.getppid()
+        (tmp_path / f"views-{dead}.json").write_text(json.dumps({"1": 4, "2": 1}))
+        (tmp_path / f"views-{alive}.json").write_text(json.dumps({"3": 9}))
+        counter = ViewCounter(
+            session_factory, flush_seconds=60, flush_threshold=100, journal_seconds=1, journal_dir=str(tmp_path)
+        )
+        
+        assert counter.recover() == 5
+        assert sorted(os.listdir(tmp_path)) == sorted([f"views-{alive}.json", f"views-{os.getpid()}.json"])
+        await counter.flush()
+        
+        assert await _popularity(session_factory) == {1: 4, 2: 1, 3: 0}
+        assert os.listdir(tmp_path) == [f"views-{alive}.json"]
+    
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_views(self, tmp_path):
+        """Test views survive a failed flush, in memory and in the journal"""
+        def broken_session():
+            raise RuntimeError("database down")
+        
+        counter = ViewCounter(
+            broken_session, flush_seconds=60, flush_threshold=100, journal_seconds=1, journal_dir=str(tmp_path)
+        )
+        counter.increment(1)
+        
+        with pytest.raises(RuntimeError):
+            await counter.flush()
+        await counter.write_journal()
+        
+        assert counter.pending() == {1: 1}
+        assert json.loads((tmp_path / f"views-{os.getpid()}.json").read_text()) == {"1": 1}